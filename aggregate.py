@@ -0,0 +1,130 @@
+"""Merges the results of sharded jobs into one Slack message and one tagging report."""
+import logging
+import os
+from pathlib import Path
+from typing import Any, Optional
+
+from artifact_writer.artifact_writer import ArtifactWriter
+from diff_parser.repo_commit_change import RepoCommitChange
+from git_util.git_util import GitUtil
+from github_util.pull_request import PullRequest
+from message_formatter.message_formatter import MessageFormatter
+from notification_state.notification_state import NotificationState
+from notification_state.state_storage import FileStateStorage, GitNoteStateStorage
+from notifier.notifier import DEFAULT_TIMEOUT, NotificationError, Notifier
+from notifier.notifier_group import create_notifier
+
+logging.basicConfig(
+    format='%(asctime)s [%(levelname)8s] %(message)s (%(filename)s:%(lineno)s)',
+    level=logging.INFO
+)
+logger = logging.getLogger(__name__)
+
+_CHANGE_FIELDS = ('repository', 'old_commit', 'new_commit', 'pull_requests', 'tagged', 'position', 'notified')
+
+
+def get_shard_artifact_files(paths: str) -> list[str]:
+    """
+    Get the artifact files of the shards, expanding directories to the files they contain.
+
+    :param paths: newline separated paths of artifact files or directories containing them
+    :return: sorted list of artifact files
+    """
+    artifact_files = []
+    for path in (Path(line.strip()) for line in paths.splitlines() if line.strip()):
+        artifact_files.extend(sorted(str(file) for file in path.rglob('*') if file.is_file()) if path.is_dir()
+                              else [str(path)])
+    return artifact_files
+
+
+def aggregate(artifact_files: list[str], slack_notifier: Notifier, environment_name: str,
+              artifact_writer: Optional[ArtifactWriter] = None,
+              notification_state: Optional[NotificationState] = None) -> None:
+    """
+    Merge the artifacts written by the shards of main.py into one Slack message and one tagging report.
+
+    The records are ordered by their position among all changes, so the message is the same as the one an
+    unsharded run would send. Changes which the shards found notified by a previous run are only reported. The
+    shards do not send a message, so the changes are recorded as notified here, for a re-run of the shards to mark.
+
+    :param artifact_files: paths of the artifacts written by the shards
+    :param slack_notifier: Notifier to send the message
+    :param environment_name: Name of the environment being updated
+    :param artifact_writer: Optionally write the merged results as the tagging report
+    :param notification_state: Optionally record the changes which were notified, to skip them when the job is re-run
+    :raises NotificationError: if the message could not be delivered to a sink
+    :return: None
+    """
+    records: list[dict[str, Any]] = []
+    for artifact_file in artifact_files:
+        records.extend(ArtifactWriter.read_records(artifact_file))
+    records.sort(key=lambda record: record.get('position', 0))
+    logger.info(f'merging {len(records)} records from {len(artifact_files)} shards')
+
+    fallback_count = 0
+    tag_results = {True: 0, False: 0}
+    changes: list[RepoCommitChange] = []
+    repo_results: list[tuple[str, list[PullRequest], Optional[str]]] = []
+    for record in records:
+        change = RepoCommitChange(repository=record['repository'], old_commit=record['old_commit'],
+                                  new_commit=record['new_commit'])
+        pull_requests = [PullRequest(**pull_request) for pull_request in record['pull_requests']]
+        changes.append(change)
+        if record.get('notified'):
+            logger.info(f'skipping repo:{change.repository} which was notified by a previous run')
+        else:
+            if record.get('compare_url'):
+                fallback_count += 1
+            repo_results.append((change.repository, pull_requests, record.get('compare_url')))
+
+        if record['tagged'] is not None:
+            tag_results[record['tagged']] += 1
+        if artifact_writer:
+            fields = {key: value for key, value in record.items() if key not in _CHANGE_FIELDS}
+            artifact_writer.write_change(change, pull_requests, record['tagged'], **fields)
+
+    for summary in MessageFormatter.get_summaries(repo_results):
+        slack_notifier.add_message_block(summary)
+
+    if slack_notifier.has_messages():
+        slack_notifier.add_message_block(MessageFormatter.get_message_header(environment_name), at_beginning=True)
+        if fallback_count:
+            slack_notifier.add_message_block(MessageFormatter.get_fallback_summary(fallback_count))
+        notification_error = None
+        try:
+            slack_notifier.send_message()
+        except NotificationError as e:
+            if not e.delivered:
+                raise
+            logger.error(f'{e}, recording the changes as notified as it was delivered to: {", ".join(e.delivered)}')
+            notification_error = e
+
+        if notification_state:
+            for change in changes:
+                notification_state.set_notified(change)
+            notification_state.save()
+        if notification_error:
+            raise notification_error
+
+    logger.info(f'tagged {tag_results[True]} commits, {tag_results[False]} could not be tagged')
+
+
+if __name__ == '__main__':
+    with ArtifactWriter(artifact_file=os.getenv('ARTIFACT_FILE'),
+                        markdown_file=os.getenv('GITHUB_STEP_SUMMARY') if os.getenv('JOB_SUMMARY') == 'true' else None,
+                        environment_name=os.getenv('ENVIRONMENT')) as writer:
+        notifier = create_notifier(slack_webhooks=os.getenv('SLACK_WEBHOOK'),
+                                   teams_webhooks=os.getenv('TEAMS_WEBHOOK'),
+                                   webhook_urls=os.getenv('WEBHOOK_URL'),
+                                   timeout=float(os.getenv('NOTIFY_TIMEOUT') or DEFAULT_TIMEOUT),
+                                   retries=int(os.getenv('NOTIFY_RETRIES') or 2))
+        state_storage = None
+        if os.getenv('STATE_FILE'):
+            state_storage = FileStateStorage(os.getenv('STATE_FILE'))
+        elif os.getenv('STATE_GIT_NOTES') == 'true':
+            state_storage = GitNoteStateStorage(GitUtil())
+        aggregate(artifact_files=get_shard_artifact_files(os.getenv('SHARD_ARTIFACTS', '')),
+                  slack_notifier=notifier,
+                  environment_name=os.getenv('ENVIRONMENT'),
+                  artifact_writer=writer,
+                  notification_state=NotificationState(state_storage, os.getenv('ENVIRONMENT')) if state_storage else None)
@@ -0,0 +1 @@
+"""Package for artifact_writer."""
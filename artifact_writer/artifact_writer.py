@@ -0,0 +1,150 @@
+"""Provides functionality to write the release notes as artifacts for downstream steps."""
+import dataclasses
+import json
+import logging
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Iterator, Optional, TextIO, Type, Union
+
+from typing_extensions import Self
+
+from diff_parser.repo_commit_change import RepoCommitChange
+from github_util.pull_request import PullRequest
+from message_formatter.message_formatter import MessageFormatter
+
+logger = logging.getLogger(__name__)
+
+
+class ArtifactWriter:
+    """Provides functionality to write the release notes as artifacts for downstream steps."""
+
+    @staticmethod
+    def read_records(artifact_file: str) -> Iterator[dict[str, Any]]:
+        """
+        Read the records of an artifact written by an ArtifactWriter.
+
+        :param artifact_file: path of the JSON or NDJSON file to read
+        :return: records of the artifact
+        """
+        with Path(artifact_file).open() as stream:
+            if Path(artifact_file).suffix not in ('.ndjson', '.jsonl'):
+                yield from json.load(stream)
+                return
+            for line in stream:
+                if line.strip():
+                    yield json.loads(line)
+
+    def __init__(self: Self, artifact_file: Optional[str] = None, markdown_file: Optional[str] = None,
+                 environment_name: str = '') -> None:
+        """
+        Initialize the ArtifactWriter.
+
+        Files ending in .ndjson or .jsonl are written as newline delimited JSON, any other file is written as a
+        JSON array. The Markdown file is appended to so it can point to the GitHub job summary.
+
+        :param artifact_file: path of the JSON or NDJSON file to write
+        :param markdown_file: path of the Markdown file to append to
+        :param environment_name: Name of the environment being updated
+        """
+        self._artifact_file = artifact_file
+        self._markdown_file = markdown_file
+        self._environment_name = environment_name
+        self._ndjson = bool(artifact_file) and Path(artifact_file).suffix in ('.ndjson', '.jsonl')
+        self._artifact_stream: Optional[TextIO] = None
+        self._markdown_stream: Optional[TextIO] = None
+        self._records = 0
+
+    def __enter__(self: Self) -> Self:
+        """
+        Open the artifact files.
+
+        :return: ArtifactWriter
+        """
+        self.open()
+        return self
+
+    def __exit__(self: Self, exc_type: Optional[Type[BaseException]], exc_val: Optional[BaseException],
+                 exc_tb: Optional[TracebackType]) -> None:
+        """
+        Close the artifact files.
+
+        :return: None
+        """
+        self.close()
+
+    def has_artifact_file(self: Self) -> bool:
+        """
+        Check if the results are written to an artifact file.
+
+        :return: True if an artifact file is configured, False otherwise
+        """
+        return bool(self._artifact_file)
+
+    def open(self: Self) -> None:
+        """
+        Open the artifact file and write its header.
+
+        The Markdown file is only opened when the first change is written, so a run without any change does not add
+        an empty heading to the job summary.
+
+        :return: None
+        """
+        if self._artifact_file:
+            logger.info(f'writing release notes artifact to {self._artifact_file}')
+            Path(self._artifact_file).parent.mkdir(parents=True, exist_ok=True)
+            self._artifact_stream = Path(self._artifact_file).open('w')
+            if not self._ndjson:
+                self._artifact_stream.write('[')
+
+    def write_change(self: Self, change: RepoCommitChange, pull_requests: list[PullRequest],
+                     tagged: Optional[bool] = None, **fields: Union[str, int]) -> None:
+        """
+        Write the result for a single repository change.
+
+        The record is written immediately so that the artifact is usable even if a later change fails.
+
+        :param change: repository commit change
+        :param pull_requests: pull requests resolved for the change
+        :param tagged: result of tagging the new commit, None if no tag was requested
+        :param fields: additional fields to add to the record
+        :return: None
+        """
+        if self._artifact_stream:
+            record = {
+                **fields,
+                **dataclasses.asdict(change),
+                'pull_requests': [dataclasses.asdict(pull_request) for pull_request in pull_requests],
+                'tagged': tagged
+            }
+            if self._ndjson:
+                self._artifact_stream.write(f'{json.dumps(record)}\n')
+            else:
+                self._artifact_stream.write(f'{"," if self._records else ""}\n{json.dumps(record)}')
+            self._artifact_stream.flush()
+            self._records += 1
+
+        if self._markdown_file:
+            if not self._markdown_stream:
+                logger.info(f'writing release notes summary to {self._markdown_file}')
+                self._markdown_stream = Path(self._markdown_file).open('a')
+                self._markdown_stream.write(MessageFormatter.get_markdown_header(self._environment_name))
+            self._markdown_stream.write(MessageFormatter.get_repo_pull_request_markdown(change.repository,
+                                                                                        pull_requests))
+            self._markdown_stream.flush()
+
+    def close(self: Self) -> None:
+        """
+        Finish and close the artifact files.
+
+        :return: None
+        """
+        if self._artifact_stream:
+            if not self._ndjson:
+                self._artifact_stream.write('\n]\n')
+            self._artifact_stream.close()
+            self._artifact_stream = None
+            logger.info(f'wrote {self._records} records to {self._artifact_file}')
+
+        if self._markdown_stream:
+            self._markdown_stream.close()
+            self._markdown_stream = None
@@ -0,0 +1,101 @@
+"""Provides tests for the ArtifactWriter."""
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from typing_extensions import Self
+
+from artifact_writer.artifact_writer import ArtifactWriter
+from diff_parser.repo_commit_change import RepoCommitChange
+from github_util.pull_request import PullRequest
+
+
+class TestArtifactWriter(unittest.TestCase):
+    """Provides tests for the ArtifactWriter."""
+
+    def setUp(self: Self) -> None:
+        """Set up a temporary directory for the artifacts."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = Path(self.directory.name)
+        self.change = RepoCommitChange(repository='test-repo-1', old_commit='abc11', new_commit='abc12')
+        self.pull_requests = [PullRequest(title='Pull Request 1', number=1, url='https://foo.com/1')]
+        self.expected_record = {
+            'file_name': 'dev.tfvars',
+            'repository': 'test-repo-1',
+            'old_commit': 'abc11',
+            'new_commit': 'abc12',
+            'pull_requests': [{'title': 'Pull Request 1', 'number': 1, 'url': 'https://foo.com/1'}],
+            'tagged': True
+        }
+
+    def tearDown(self: Self) -> None:
+        """Remove the temporary directory."""
+        self.directory.cleanup()
+
+    def test_write_change_with_json(self: Self) -> None:
+        """A JSON file should contain an array of every record."""
+        with ArtifactWriter(artifact_file=str(self.path / 'notes.json')) as writer:
+            writer.write_change(self.change, self.pull_requests, True, file_name='dev.tfvars')
+            writer.write_change(self.change, self.pull_requests, True, file_name='dev.tfvars')
+            self.assertTrue(writer.has_artifact_file())
+
+        self.assertEqual([self.expected_record, self.expected_record],
+                         json.loads((self.path / 'notes.json').read_text()))
+
+    def test_write_change_with_json_and_no_records(self: Self) -> None:
+        """A JSON file without any records should contain an empty array."""
+        with ArtifactWriter(artifact_file=str(self.path / 'notes.json')):
+            pass
+
+        self.assertEqual([], json.loads((self.path / 'notes.json').read_text()))
+
+    def test_write_change_with_ndjson(self: Self) -> None:
+        """An NDJSON file should contain one record per line and be readable before the writer is closed."""
+        with ArtifactWriter(artifact_file=str(self.path / 'notes.ndjson')) as writer:
+            writer.write_change(self.change, self.pull_requests, True, file_name='dev.tfvars')
+            lines = (self.path / 'notes.ndjson').read_text().splitlines()
+            self.assertEqual([self.expected_record], [json.loads(line) for line in lines])
+
+    def test_write_change_with_markdown(self: Self) -> None:
+        """The Markdown summary should be appended to the existing file."""
+        markdown_file = self.path / 'summary.md'
+        markdown_file.write_text('existing\n')
+
+        with ArtifactWriter(markdown_file=str(markdown_file), environment_name='Dev') as writer:
+            writer.write_change(self.change, self.pull_requests)
+
+        self.assertEqual(
+            'existing\n'
+            '## The Dev environment has been updated\n\n'
+            '### test-repo-1\n'
+            '- [Pull Request 1](https://foo.com/1) #1\n\n',
+            markdown_file.read_text()
+        )
+
+    def test_write_change_with_markdown_and_no_changes(self: Self) -> None:
+        """The Markdown summary should not get a heading when no change is written."""
+        markdown_file = self.path / 'summary.md'
+        markdown_file.write_text('existing\n')
+
+        with ArtifactWriter(markdown_file=str(markdown_file), environment_name='Dev'):
+            pass
+
+        self.assertEqual('existing\n', markdown_file.read_text())
+
+    def test_write_change_without_files(self: Self) -> None:
+        """Nothing should be written when no files are configured."""
+        with ArtifactWriter() as writer:
+            writer.write_change(self.change, self.pull_requests)
+            self.assertFalse(writer.has_artifact_file())
+        self.assertEqual([], list(self.path.iterdir()))
+
+    def test_read_records(self: Self) -> None:
+        """The records written to JSON and NDJSON files should be read back."""
+        for file_name in ('notes.json', 'shards/notes.ndjson'):
+            with ArtifactWriter(artifact_file=str(self.path / file_name)) as writer:
+                writer.write_change(self.change, self.pull_requests, True, file_name='dev.tfvars')
+                writer.write_change(self.change, self.pull_requests, True, file_name='dev.tfvars')
+
+            self.assertEqual([self.expected_record, self.expected_record],
+                             list(ArtifactWriter.read_records(str(self.path / file_name))))
@@ -0,0 +1,113 @@
+"""Generates release notes for the historical commits of the environment repository."""
+import logging
+import os
+from typing import Iterator, Optional
+
+from git import Commit
+
+from artifact_writer.artifact_writer import ArtifactWriter
+from diff_parser.diff_parser import DiffParser
+from diff_parser.repo_commit_change import RepoCommitChange
+from git_util.git_util import GitUtil
+from git_util.path_filter import PathFilter
+from github_util.app_token_provider import AppTokenProvider
+from github_util.github_util import GitHubUtil, STRATEGY_COMMIT
+from reference_index.reference_index import ReferenceIndex
+
+logging.basicConfig(
+    format='%(asctime)s [%(levelname)8s] %(message)s (%(filename)s:%(lineno)s)',
+    level=logging.INFO
+)
+logger = logging.getLogger(__name__)
+
+
+def _get_indexed_changes(git_util: GitUtil, commits: list[Commit],
+                         file_pattern: str) -> Iterator[tuple[Commit, str, RepoCommitChange]]:
+    """
+    Get the changes of each commit by comparing the reference indexes of the commit and its parent.
+
+    The commits are indexed oldest first, so each index is built from the previous one and only the files which
+    changed in a commit are read and parsed. A commit without a parent is only indexed as the base of the next
+    commit, as there is nothing to compare it with, like the diffs skip it.
+
+    :param git_util: GitUtil for the environment repository
+    :param commits: commits to get the changes of, most recent first
+    :param file_pattern: Regex pattern(s) to filter files, separated by newlines
+    :return: iterator of the commit, the file name and the change, most recent commit first
+    """
+    commit_changes = []
+    previous_index = None
+    for commit in reversed(commits):
+        parent = commit.parents[0].hexsha if commit.parents else None
+        parent_index = previous_index if previous_index and previous_index.commit == parent \
+            else ReferenceIndex.build(git_util, parent, file_pattern, previous_index)
+        previous_index = ReferenceIndex.build(git_util, commit.hexsha, file_pattern, parent_index)
+        if not parent:
+            logger.info(f'skipping commit without a parent: {commit.hexsha}')
+            continue
+        commit_changes.append([(commit, file_name, change) for file_name, change in previous_index.get_changes(parent_index)])
+
+    for changes in reversed(commit_changes):
+        yield from changes
+
+
+def backfill(git_util: GitUtil, github_util: GitHubUtil, file_pattern: str, output_file: str,
+             max_count: Optional[int] = None, since: Optional[str] = None, until: Optional[str] = None,
+             use_reference_index: bool = False) -> None:
+    """
+    Generate release notes for past commits of the environment repository and write them to a file.
+
+    All commits are parsed first so the changes can be resolved together, which means a range or merge commit
+    shared by several deploys is only looked up once. With the reference index, the changes are found by comparing
+    the indexes of consecutive commits instead of diffing and parsing each changed file.
+
+    :param git_util: GitUtil for the environment repository
+    :param github_util: GitHubUtil to resolve pull requests
+    :param file_pattern: Regex pattern(s) to filter files, separated by newlines
+    :param output_file: path of the JSON or NDJSON file to write
+    :param max_count: maximum number of commits to process
+    :param since: only process commits more recent than this date
+    :param until: only process commits older than this date
+    :param use_reference_index: find the changes by comparing reference indexes
+    :return: None
+    """
+    path_filter = PathFilter(file_pattern)
+    deploys: list[tuple[str, str, str, RepoCommitChange]] = []
+
+    commits = git_util.get_commits(max_count=max_count, since=since, until=until)
+    if use_reference_index:
+        for commit, file_name, change in _get_indexed_changes(git_util, commits, file_pattern):
+            deploys.append((commit.hexsha, commit.committed_datetime.isoformat(), file_name, change))
+    else:
+        for commit in commits:
+            for file_diff in git_util.get_file_diffs_from_commit(commit, path_filter):
+                for change in DiffParser.get_file_repo_commit_changes(file_diff):
+                    deploys.append((commit.hexsha, commit.committed_datetime.isoformat(), file_diff.file_name, change))
+
+    logger.info(f'found {len(deploys)} changes to resolve')
+    pull_requests = github_util.get_pull_requests_for_changes([change for *_, change in deploys])
+
+    with ArtifactWriter(artifact_file=output_file) as writer:
+        for (commit, committed_date, file_name, change), change_pull_requests in zip(deploys, pull_requests):
+            writer.write_change(change, change_pull_requests, commit=commit, committed_date=committed_date,
+                                file_name=file_name)
+
+
+if __name__ == '__main__':
+    token_provider = None
+    if os.getenv('APP_ID'):
+        token_provider = AppTokenProvider(app_id=os.getenv('APP_ID'),
+                                          private_key=os.getenv('APP_PRIVATE_KEY'),
+                                          installation_id=os.getenv('APP_INSTALLATION_ID'),
+                                          organization_name=os.getenv('ORGANIZATION'))
+    backfill(git_util=GitUtil(),
+             github_util=GitHubUtil(access_token=os.getenv('TOKEN'),
+                                    organization_name=os.getenv('ORGANIZATION'),
+                                    strategy=os.getenv('LOOKUP_STRATEGY') or STRATEGY_COMMIT,
+                                    token_provider=token_provider),
+             file_pattern=os.getenv('FILE_PATTERN'),
+             output_file=os.getenv('OUTPUT_FILE', 'release-notes.json'),
+             max_count=int(os.getenv('MAX_COMMITS') or 0) or None,
+             since=os.getenv('SINCE'),
+             until=os.getenv('UNTIL'),
+             use_reference_index=os.getenv('REFERENCE_INDEX') == 'true')
@@ -0,0 +1 @@
+"""Package for commit_store."""
@@ -0,0 +1,117 @@
+"""Stores commit hashes compactly, as 20 bytes each instead of a 40 character string."""
+import re
+import sys
+from collections.abc import Sequence
+from typing import Iterable, Iterator, Union
+
+from typing_extensions import Self
+
+_FULL_HASH = re.compile(r'[0-9a-f]{40}')
+_HASH_BYTES = 20
+_PLACEHOLDER = bytes(_HASH_BYTES)
+
+
+class CommitStore(Sequence):
+    """
+    Stores commit hashes compactly, as 20 bytes each instead of a 40 character string.
+
+    Full SHA-1 hashes are packed into one bytearray, which costs 20 bytes per hash where a list of strings costs
+    about 97 bytes (the string and its pointer). Other refs, such as short hashes or tags, are kept as strings on
+    the side. Hashes are decoded back to strings when they are read.
+    """
+
+    def __init__(self: Self, commits: Iterable[str] = ()) -> None:
+        """
+        Initialize the CommitStore.
+
+        :param commits: commit hashes to store
+        """
+        self._hashes = bytearray()
+        self._others: dict[int, str] = {}
+        self.extend(commits)
+
+    def append(self: Self, commit: str) -> None:
+        """
+        Add a commit hash to the end of the store.
+
+        :param commit: commit hash or other ref
+        :return: None
+        """
+        if _FULL_HASH.fullmatch(commit):
+            self._hashes += bytes.fromhex(commit)
+        else:
+            self._others[len(self)] = commit
+            self._hashes += _PLACEHOLDER
+
+    def extend(self: Self, commits: Iterable[str]) -> None:
+        """
+        Add commit hashes to the end of the store.
+
+        :param commits: commit hashes or other refs
+        :return: None
+        """
+        for commit in commits:
+            self.append(commit)
+
+    def __len__(self: Self) -> int:
+        """
+        Count the stored commits.
+
+        :return: number of commits
+        """
+        return len(self._hashes) // _HASH_BYTES
+
+    def __getitem__(self: Self, index: Union[int, slice]) -> Union[str, list[str]]:
+        """
+        Get a commit hash by its position, or a list of commit hashes for a slice.
+
+        :param index: position or slice
+        :raises IndexError: if the position is out of range
+        :return: commit hash, or list of commit hashes
+        """
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('commit store index out of range')
+        if index in self._others:
+            return self._others[index]
+        return self._hashes[index * _HASH_BYTES:(index + 1) * _HASH_BYTES].hex()
+
+    def __iter__(self: Self) -> Iterator[str]:
+        """
+        Iterate over the commit hashes in the order they were added.
+
+        :return: iterator of commit hashes
+        """
+        for index in range(len(self)):
+            yield self[index]
+
+    def __sizeof__(self: Self) -> int:
+        """
+        Get the memory held by the store, including the packed hashes and the other refs.
+
+        :return: size in bytes
+        """
+        return object.__sizeof__(self) + sys.getsizeof(self._hashes) + sys.getsizeof(self._others) + \
+            sum(sys.getsizeof(commit) for commit in self._others.values())
+
+    def __eq__(self: Self, other: object) -> bool:
+        """
+        Compare the commit hashes with another store or list.
+
+        :param other: store or list of commit hashes
+        :return: True if the same commit hashes are stored in the same order
+        """
+        if isinstance(other, (CommitStore, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self: Self) -> str:
+        """
+        Represent the store as its commit hashes.
+
+        :return: representation
+        """
+        return f'CommitStore({list(self)!r})'
@@ -0,0 +1,110 @@
+"""Provides tests for CommitStore and the memory footprint of the result records."""
+import logging
+import pickle
+import sys
+import tracemalloc
+import unittest
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from typing_extensions import Self
+
+from commit_store.commit_store import CommitStore
+from diff_parser.repo_commit_change import RepoCommitChange
+from github_util.pull_request import PullRequest
+
+logger = logging.getLogger(__name__)
+
+_SHA_1 = '0123456789abcdef0123456789abcdef01234567'
+_SHA_2 = 'fedcba9876543210fedcba9876543210fedcba98'
+
+
+@dataclass
+class _PlainRepoCommitChange:
+    """The result record as a plain dataclass, to compare the footprint against."""
+
+    repository: str
+    old_commit: str = ''
+    new_commit: str = ''
+
+
+@dataclass
+class _PlainPullRequest:
+    """The result record as a plain dataclass, to compare the footprint against."""
+
+    title: str
+    number: int
+    url: str
+
+
+class TestCommitStore(unittest.TestCase):
+    """Provides tests for CommitStore and the memory footprint of the result records."""
+
+    @staticmethod
+    def _get_memory(reference_count: int, change_type: Callable[..., Any], pull_request_type: Callable[..., Any],
+                    commits_type: Callable[..., Any]) -> int:
+        """
+        Get the memory held by the records of a backfill with one pull request per change.
+
+        :param reference_count: number of pull request references
+        :param change_type: class of the change records
+        :param pull_request_type: class of the pull request records
+        :param commits_type: class holding the merge commit hashes
+        :return: memory in bytes
+        """
+        tracemalloc.start()
+        results = []
+        for index in range(reference_count):
+            repository = f'service-{index % 500}'
+            change = change_type(repository=repository, old_commit=f'{index:040x}', new_commit=f'{index + 1:040x}')
+            pull_request = pull_request_type(title=f'Fix {index}', number=index,
+                                             url=f'https://github.com/org/{repository}/pull/{index}')
+            results.append((change, [pull_request]))
+        merge_commits = commits_type(f'{index:040x}' for index in range(reference_count))
+        memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del results, merge_commits
+        return memory
+
+    def test_append_and_get(self: Self) -> None:
+        """Full hashes and other refs should be read back in the order they were added."""
+        store = CommitStore([_SHA_1, 'abc12'])
+        store.append(_SHA_2)
+
+        self.assertEqual(3, len(store))
+        self.assertEqual([_SHA_1, 'abc12', _SHA_2], list(store))
+        self.assertEqual(_SHA_2, store[-1])
+        self.assertEqual(['abc12', _SHA_2], store[1:])
+        self.assertIn(_SHA_2, store)
+        self.assertEqual(CommitStore([_SHA_1, 'abc12', _SHA_2]), store)
+        with self.assertRaises(IndexError):
+            store[3]
+
+    def test_full_hashes_should_take_20_bytes(self: Self) -> None:
+        """Full hashes should be packed as 20 bytes each."""
+        store = CommitStore(f'{index:040x}' for index in range(1000))
+        self.assertLess(sys.getsizeof(store), 1000 * 21)
+        self.assertEqual(f'{999:040x}', store[999])
+
+    def test_records_should_be_frozen_and_hashable(self: Self) -> None:
+        """The records should have no per instance dict, be hashable and keep their field values when pickled."""
+        change = RepoCommitChange(repository=''.join(('test-', 'repo-1')), old_commit='abc11', new_commit='abc12')
+        pull_request = PullRequest(title='Pull Request 123', number=123, url='https://foo.com/test_repo_1')
+
+        self.assertFalse(hasattr(change, '__dict__'))
+        self.assertIs(sys.intern('test-repo-1'), change.repository)
+        self.assertEqual(1, len({pull_request, PullRequest('Pull Request 123', 123, 'https://foo.com/test_repo_1')}))
+        self.assertEqual((change, pull_request), pickle.loads(pickle.dumps((change, pull_request))))
+        with self.assertRaises(AttributeError):
+            change.new_commit = 'abc13'
+
+    def test_memory_per_million_pull_request_references(self: Self) -> None:
+        """The compact records should take less memory than plain dataclasses and lists of hashes."""
+        reference_count = 20_000
+        plain = self._get_memory(reference_count, _PlainRepoCommitChange, _PlainPullRequest, list)
+        compact = self._get_memory(reference_count, RepoCommitChange, PullRequest, CommitStore)
+        per_million = 1_000_000 // reference_count
+        logger.info(f'memory per million pull request references: {plain * per_million / 2 ** 20:.0f} MiB with plain '
+                    f'records, {compact * per_million / 2 ** 20:.0f} MiB with compact records')
+
+        self.assertLess(compact, plain * 0.8)
@@ -1,9 +1,10 @@
 """Provides functionality for parsing git diffs."""
 import logging
 import re
-from typing import Optional, Iterator, List
+from typing import Iterable, Iterator, Optional
 
 from diff_parser.repo_commit_change import RepoCommitChange
+from git_util.file_diff import FileDiff
 
 logger = logging.getLogger(__name__)
 
@@ -12,33 +13,62 @@ class DiffParser:
     """Provides functionality for parsing git diffs."""
 
     @staticmethod
-    def get_repo_commit_changes(unified_diff: Iterator[str]) -> List[RepoCommitChange]:
+    def get_file_repo_commit_changes(file_diff: FileDiff) -> Iterator[RepoCommitChange]:
+        """
+        Get the repo and commit changes of a changed file.
+
+        The change of a submodule was already read from the tree entries, so its empty diff is not parsed.
+
+        :param file_diff: diff of the changed file
+        :return: iterator of changes
+        """
+        if file_diff.submodule_change:
+            return iter([file_diff.submodule_change])
+        return DiffParser.get_repo_commit_changes(file_diff.unified_diff)
+
+    @staticmethod
+    def get_repo_commit_changes(unified_diff: Iterator[str]) -> Iterator[RepoCommitChange]:
         """
         Parse the diff string to get the repo and commit changes.
 
         :param unified_diff: unified diff string
-        :return: list of changes
+        :return: iterator of changes
         """
-        changes: dict[str, RepoCommitChange] = {}
+        commits: dict[str, list[str]] = {}
 
         for line in unified_diff:
             repo = DiffParser._parse_repo_name(line)
             if not repo:
                 continue
-            if not changes.get(repo):
-                changes[repo] = RepoCommitChange(repository=repo)
+            old_and_new = commits.setdefault(repo, ['', ''])
 
             if line.startswith('+'):
-                changes[repo].new_commit = DiffParser._parse_commit(line)
+                old_and_new[1] = DiffParser._parse_commit(line)
 
             if line.startswith('-'):
-                changes[repo].old_commit = DiffParser._parse_commit(line)
+                old_and_new[0] = DiffParser._parse_commit(line)
 
-        for repo, change in changes.items():
-            if not change.new_commit:
+        for repo, (old_commit, new_commit) in commits.items():
+            if not new_commit:
                 continue
-            logger.info(f'found change: repo:{repo} old-commit:{change.old_commit} new-commit:{change.new_commit}')
-            yield change
+            logger.info(f'found change: repo:{repo} old-commit:{old_commit} new-commit:{new_commit}')
+            yield RepoCommitChange(repository=repo, old_commit=old_commit, new_commit=new_commit)
+
+    @staticmethod
+    def get_repo_commits(lines: Iterable[str]) -> dict[str, str]:
+        """
+        Parse the full content of a file to get the commit each repository is pinned to.
+
+        :param lines: lines of the file
+        :return: commit of each repository
+        """
+        repo_commits = {}
+        for line in lines:
+            repo = DiffParser._parse_repo_name(line)
+            commit = DiffParser._parse_commit(line) if repo else None
+            if commit:
+                repo_commits[repo] = commit
+        return repo_commits
 
     @staticmethod
     def _parse_repo_name(line: str) -> Optional[str]:
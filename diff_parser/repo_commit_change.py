@@ -1,11 +1,32 @@
 """Represents a pull request."""
+import sys
 from dataclasses import dataclass
+from typing import Any
 
+from typing_extensions import Self
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class RepoCommitChange:
-    """Represents a change for a repository and commit."""
+    """
+    Represents a change for a repository and commit.
+
+    The record is slotted and frozen, so it has no per instance dict and can be hashed. The repository name is
+    interned, so the changes of a repository share one string.
+    """
 
     repository: str
     old_commit: str = ''
     new_commit: str = ''
+
+    def __post_init__(self: Self) -> None:
+        """Intern the repository name."""
+        object.__setattr__(self, 'repository', sys.intern(self.repository))
+
+    def __reduce__(self: Self) -> tuple[Any, ...]:
+        """
+        Pickle the change as its field values only.
+
+        :return: class and field values
+        """
+        return RepoCommitChange, (self.repository, self.old_commit, self.new_commit)
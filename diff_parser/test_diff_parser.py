@@ -3,6 +3,7 @@ import pytest
 
 from diff_parser.diff_parser import DiffParser
 from diff_parser.repo_commit_change import RepoCommitChange
+from git_util.file_diff import FileDiff
 
 
 def test_get_repo_commit_changes() -> None:
@@ -35,6 +36,28 @@ def test_get_repo_commit_changes() -> None:
     ]
 
 
+def test_get_file_repo_commit_changes() -> None:
+    """Validate the change of a submodule is used without parsing the diff."""
+    submodule_change = RepoCommitChange(repository='service-a', old_commit='abc11', new_commit='abc12')
+    file_diff = FileDiff(file_name='services/service-a', unified_diff=iter(['+not = "parsed:abc99"']),
+                         submodule_change=submodule_change)
+    assert list(DiffParser.get_file_repo_commit_changes(file_diff)) == [submodule_change]
+
+    file_diff = FileDiff(file_name='dev.tfvars', unified_diff=iter(['+test_repo_1 = "123.foo.com/test-repo-1:abc12"']))
+    assert list(DiffParser.get_file_repo_commit_changes(file_diff)) == [
+        RepoCommitChange(repository='test-repo-1', old_commit='', new_commit='abc12')
+    ]
+
+
+def test_get_repo_commits() -> None:
+    """Validate the commit of each repository is parsed from the full content of a file."""
+    assert DiffParser.get_repo_commits([
+        'test_repo_1 = "123.foo.com/test-repo-1:abc11"',
+        'foo         = "bar"',
+        'test_repo_2 = "123.foo.com/bar/test-repo-2:abc21"'
+    ]) == {'test-repo-1': 'abc11', 'test-repo-2': 'abc21'}
+
+
 @pytest.mark.parametrize('test_input,expected', [
     ('test_repo_1 = "123.foo.com/bar/test-repo-1:abc123"', 'test-repo-1'),
     ('test_repo_1 = "123.foo.com/test-repo-1:abc123"', 'test-repo-1'),
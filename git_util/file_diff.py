@@ -1,6 +1,8 @@
 """Represents a git diff for a single file."""
 from dataclasses import dataclass
-from typing import Iterator
+from typing import Iterator, Optional
+
+from diff_parser.repo_commit_change import RepoCommitChange
 
 
 @dataclass
@@ -9,3 +11,4 @@ class FileDiff:
 
     file_name: str
     unified_diff: Iterator[str]
+    submodule_change: Optional[RepoCommitChange] = None
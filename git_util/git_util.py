@@ -1,16 +1,35 @@
 """Provides functionality to interact with the local git repository."""
 import difflib
 import logging
-import re
-from typing import List
+import os
+import tempfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterator, List, Optional, Union
 
-from git import Repo, Diff
+from git import Repo, Diff, Commit, Blob, GitCommandError
 from typing_extensions import Self
 
+from diff_parser.repo_commit_change import RepoCommitChange
 from git_util.file_diff import FileDiff
+from git_util.path_filter import PathFilter
 
 logger = logging.getLogger(__name__)
 
+# identity used for the commits git creates when writing notes, since runners usually have no git identity
+_NOTES_IDENTITY = {
+    'GIT_AUTHOR_NAME': 'release-notes-notifier',
+    'GIT_AUTHOR_EMAIL': 'release-notes-notifier@users.noreply.github.com',
+    'GIT_COMMITTER_NAME': 'release-notes-notifier',
+    'GIT_COMMITTER_EMAIL': 'release-notes-notifier@users.noreply.github.com'
+}
+
+# mode of the tree entries of submodules, which point to a commit in another repository instead of a blob
+_GITLINK_MODE = 0o160000
+
+# commits between two commits can have older committer dates, for example when they were rebased
+_DEEPEN_MARGIN = timedelta(days=1)
+
 
 class GitUtil:
     """Provides functionality to interact with the local git repository."""
@@ -20,14 +39,72 @@ class GitUtil:
         """
         Get a FileDiff from a git.Diff object.
 
+        Submodules have no blob to diff. Their change is read from the commit hashes of the tree entries instead,
+        without reading any object.
+
         :param diff: git.Diff object
         :return: FileDiff
         """
+        if _GITLINK_MODE in (diff.a_mode, diff.b_mode):
+            return FileDiff(
+                file_name=diff.b_path,
+                unified_diff=iter([]),
+                submodule_change=GitUtil._get_submodule_change(diff)
+            )
+
         return FileDiff(
             file_name=diff.b_path,
-            unified_diff=difflib.unified_diff(diff.b_blob.data_stream.read().decode('utf-8').splitlines(),
-                                              diff.a_blob.data_stream.read().decode('utf-8').splitlines())
+            unified_diff=GitUtil._get_unified_diff(diff)
+        )
+
+    @staticmethod
+    def _get_submodule_change(diff: Diff) -> Optional[RepoCommitChange]:
+        """
+        Get the change of a submodule from the tree entries of a git.Diff object.
+
+        The diff compares the new commit (a) to the old commit (b). The repository is named after the last
+        component of the submodule path.
+
+        :param diff: git.Diff object of a submodule
+        :return: repository commit change, None if the submodule was removed
+        """
+        if diff.a_mode != _GITLINK_MODE:
+            logger.info(f'skipping removed submodule: {diff.b_path}')
+            return None
+
+        change = RepoCommitChange(
+            repository=Path(diff.a_path).name,
+            old_commit=diff.b_blob.hexsha if diff.b_mode == _GITLINK_MODE else '',
+            new_commit=diff.a_blob.hexsha
         )
+        logger.info(f'found submodule change: repo:{change.repository} old-commit:{change.old_commit} '
+                    f'new-commit:{change.new_commit}')
+        return change
+
+    @staticmethod
+    def _get_unified_diff(diff: Diff) -> Iterator[str]:
+        """
+        Get the unified diff of a git.Diff object.
+
+        The blobs are only read once the diff is iterated and are released as soon as it is exhausted, so only
+        one file is held in memory at a time.
+
+        :param diff: git.Diff object
+        :return: unified diff lines
+        """
+        yield from difflib.unified_diff(GitUtil._read_blob_lines(diff.b_blob), GitUtil._read_blob_lines(diff.a_blob))
+
+    @staticmethod
+    def _read_blob_lines(blob: Optional[Blob]) -> List[str]:
+        """
+        Read the lines of a blob.
+
+        :param blob: git blob, None if the file does not exist on this side of the diff
+        :return: list of lines
+        """
+        if not blob:
+            return []
+        return blob.data_stream.read().decode('utf-8').splitlines()
 
     def __init__(self: Self, repo: Repo = None) -> None:
         """
@@ -41,25 +118,274 @@ class GitUtil:
         else:
             self.repo = repo
 
-    def get_file_diffs_from_last_commit(self: Self, file_name_pattern_filter: str) -> List[FileDiff]:
+    def get_file_diffs_from_last_commit(self: Self,
+                                        file_name_pattern_filter: Union[str, List[str], PathFilter]) -> Iterator[FileDiff]:
         """
-        Get a list of file diffs from the last git commit.
+        Get the file diffs from the last git commit.
 
-        :param file_name_pattern_filter: Regex pattern to filter file names
-        :return: list of FileDiffs
+        :param file_name_pattern_filter: Regex pattern(s) or PathFilter to filter file names
+        :return: iterator of FileDiffs
         """
-        file_diffs: List[FileDiff] = []
+        self._fetch_missing_parent(self.repo.head.commit)
+        return self._get_file_diffs(self.repo.head.commit, 'HEAD~1', file_name_pattern_filter)
 
-        for item in self.repo.head.commit.diff('HEAD~1', create_patch=True):
+    def get_file_diffs_from_commit(self: Self, commit: Commit,
+                                   file_name_pattern_filter: Union[str, List[str], PathFilter]) -> Iterator[FileDiff]:
+        """
+        Get the file diffs between a git commit and its first parent.
+
+        :param commit: git commit object
+        :param file_name_pattern_filter: Regex pattern(s) or PathFilter to filter file names
+        :return: iterator of FileDiffs
+        """
+        if not commit.parents:
+            logger.info(f'skipping commit without a parent: {commit.hexsha}')
+            return iter([])
+        return self._get_file_diffs(commit, commit.parents[0], file_name_pattern_filter)
+
+    def get_file_diffs_since(self: Self, base: str,
+                             file_name_pattern_filter: Union[str, List[str], PathFilter]) -> Iterator[FileDiff]:
+        """
+        Get the file diffs between an earlier commit and the last git commit, covering every commit in between.
+
+        :param base: hash of the earlier commit
+        :param file_name_pattern_filter: Regex pattern(s) or PathFilter to filter file names
+        :return: iterator of FileDiffs
+        """
+        self._fetch_missing_commit(base)
+        return self._get_file_diffs(self.repo.head.commit, base, file_name_pattern_filter)
+
+    def is_ancestor(self: Self, ancestor: str, descendant: str) -> bool:
+        """
+        Check if a commit is an ancestor of another, deepening a shallow clone only as far as needed.
+
+        In a shallow clone the possible ancestor is fetched, and the history of the descendant is deepened back to
+        a day before the possible ancestor was committed. Only the commits are fetched, without their trees or
+        blobs, so the cost stays with the commits between the two instead of the whole history.
+
+        :param ancestor: hash of the possible ancestor
+        :param descendant: hash of the possible descendant
+        :return: True if ancestor is an ancestor of, or the same commit as, descendant
+        """
+        if ancestor == descendant:
+            return True
+        if self.repo.git.rev_parse('--is-shallow-repository') == 'true' and not self._is_ancestor(ancestor, descendant):
+            self._fetch_missing_commit(ancestor)
+            committed_at = datetime.fromtimestamp(int(self.repo.git.show('-s', '--format=%ct', ancestor)), timezone.utc)
+            since = (committed_at - _DEEPEN_MARGIN).strftime('%Y-%m-%d %H:%M:%S +0000')
+            remote = self.repo.remote()
+            logger.info(f'deepening the history of {descendant} since {since} from {remote.name} for shallow clone')
+            try:
+                self.repo.git.fetch('--no-tags', '--filter=tree:0', f'--shallow-since={since}', remote.name, descendant)
+            except GitCommandError as e:
+                logger.info(f'unable to deepen the history of {descendant}: {e}')
+            self.repo.git.clear_cache()
+        return self._is_ancestor(ancestor, descendant)
+
+    def _is_ancestor(self: Self, ancestor: str, descendant: str) -> bool:
+        """
+        Check if a commit is an ancestor of another within the history which was fetched.
+
+        :param ancestor: hash of the possible ancestor
+        :param descendant: hash of the possible descendant
+        :return: True if ancestor is an ancestor of descendant
+        """
+        try:
+            self.repo.git.merge_base('--is-ancestor', ancestor, descendant)
+        except GitCommandError:
+            return False
+        return True
+
+    def get_remote_ref(self: Self, ref: str) -> Optional[str]:
+        """
+        Get the commit a ref points to on the remote.
+
+        :param ref: full name of the ref
+        :return: commit hash, None if the ref does not exist
+        """
+        output = self.repo.git.ls_remote(self.repo.remote().name, ref)
+        return output.split()[0] if output else None
+
+    def push_ref(self: Self, ref: str, commit: str, expected: Optional[str]) -> bool:
+        """
+        Point a ref on the remote to a commit, only if it still points to the expected commit.
+
+        :param ref: full name of the ref
+        :param commit: commit hash to point the ref to, empty to delete the ref
+        :param expected: commit hash the ref is expected to point to, None if it is expected not to exist
+        :return: True if the ref was updated, False if it changed in the meantime
+        """
+        try:
+            self.repo.git.push(f'--force-with-lease={ref}:{expected or ""}', self.repo.remote().name, f'{commit}:{ref}')
+        except GitCommandError as e:
+            logger.info(f'unable to update {ref} to {commit}: {e}')
+            return False
+        return True
+
+    def get_commits(self: Self, max_count: Optional[int] = None, since: Optional[str] = None,
+                    until: Optional[str] = None) -> List[Commit]:
+        """
+        Get the commits of the current branch, most recent first.
+
+        :param max_count: maximum number of commits to return
+        :param since: only return commits more recent than this date
+        :param until: only return commits older than this date
+        :return: list of git commits
+        """
+        options = {'max_count': max_count, 'since': since, 'until': until}
+        options = {key: value for key, value in options.items() if value}
+        logger.info(f'getting commits from local repository: {options}')
+        return list(self.repo.iter_commits('HEAD', **options))
+
+    def get_last_commit_hashes(self: Self) -> tuple[str, Optional[str]]:
+        """
+        Get the hashes of the last git commit and its first parent, fetching the parent for a shallow clone.
+
+        :return: hash of the last commit and of its parent, None if it has no parent
+        """
+        commit = self.repo.head.commit
+        self._fetch_missing_parent(commit)
+        return commit.hexsha, commit.parents[0].hexsha if commit.parents else None
+
+    def get_tree_entries(self: Self, commit: str,
+                         file_name_pattern_filter: Union[str, List[str], PathFilter]) -> Iterator[tuple[str, str, bool]]:
+        """
+        Get the files of a commit matching the filter with their object hashes, without reading any file.
+
+        The pathspecs of the filter are passed to git, so only the matching directories of the tree are walked.
+
+        :param commit: commit hash or ref
+        :param file_name_pattern_filter: Regex pattern(s) or PathFilter to filter file names
+        :return: iterator of the path, the object hash and whether the entry is a submodule, for each file
+        """
+        path_filter = PathFilter.create(file_name_pattern_filter)
+        # ls-tree only matches literal path prefixes, so the tree is diffed against the empty tree to apply the
+        # pathspecs in git, listing every file as added
+        empty_tree = self.repo.git.hash_object('-t', 'tree', os.devnull)
+        output = self.repo.git.diff_tree('-r', '-z', '--no-renames', empty_tree, commit, '--', *path_filter.pathspecs)
+        entries = output.split('\0')
+        for info, path in zip(entries[0::2], entries[1::2]):
+            _, mode, _, object_hash, _ = info.split()
+            if path_filter.matches(path):
+                yield path, object_hash, int(mode, 8) == _GITLINK_MODE
+
+    def read_blob_lines(self: Self, object_hash: str) -> List[str]:
+        """
+        Read the lines of a blob by its hash.
+
+        :param object_hash: hash of the blob
+        :return: list of lines
+        """
+        return self._read_blob_lines(Blob(self.repo, bytes.fromhex(object_hash)))
+
+    def read_note(self: Self, notes_ref: str, commit: str = 'HEAD') -> Optional[str]:
+        """
+        Read the git note attached to a commit, the last one by default, fetching the notes ref from the remote first.
+
+        :param notes_ref: name of the notes ref
+        :param commit: commit or ref the note is attached to
+        :return: content of the note, or None if there is no note
+        """
+        remote = self.repo.remote()
+        try:
+            self.repo.git.fetch(remote.name, f'+refs/notes/{notes_ref}:refs/notes/{notes_ref}')
+        except GitCommandError as e:
+            logger.info(f'unable to fetch notes ref {notes_ref}: {e}')
+
+        try:
+            return self.repo.git.notes('--ref', notes_ref, 'show', commit)
+        except GitCommandError:
+            logger.info(f'no note found in {notes_ref} for {commit}')
+            return None
+
+    def write_note(self: Self, notes_ref: str, content: str) -> None:
+        """
+        Attach a git note to the last commit, replacing any existing note, and push the notes ref to the remote.
+
+        The content is passed on stdin, as a note the size of a large state or index exceeds the argument size limit.
+
+        :param notes_ref: name of the notes ref
+        :param content: content of the note
+        :return: None
+        """
+        remote = self.repo.remote()
+        with tempfile.TemporaryFile() as stream:
+            stream.write(content.encode('utf-8'))
+            stream.seek(0)
+            self.repo.git.notes('--ref', notes_ref, 'add', '--force', '--file', '-', 'HEAD', istream=stream,
+                                env=_NOTES_IDENTITY)
+        try:
+            self.repo.git.push(remote.name, f'refs/notes/{notes_ref}')
+        except GitCommandError as e:
+            logger.warning(f'unable to push notes ref {notes_ref}: {e}')
+
+    def _is_shallow_commit(self: Self, commit: Commit) -> bool:
+        """
+        Check if the commit is at the boundary of a shallow clone, meaning its parents have not been fetched.
+
+        :param commit: git commit object
+        :return: True if the parents of the commit are missing
+        """
+        if self.repo.git.rev_parse('--is-shallow-repository') != 'true':
+            return False
+        shallow_file = Path(self.repo.git_dir) / 'shallow'
+        return shallow_file.exists() and commit.hexsha in shallow_file.read_text().split()
+
+    def _fetch_missing_parent(self: Self, commit: Commit) -> None:
+        """
+        Fetch the parent of the commit if it is missing from a shallow clone.
+
+        Only the parent commit and its trees are fetched. Blobs are left out and are fetched lazily by git when
+        the changed files matching the pattern are read.
+
+        :param commit: git commit object
+        :return: None
+        """
+        if not self._is_shallow_commit(commit):
+            return
+
+        remote = self.repo.remote()
+        logger.info(f'fetching parent of commit {commit.hexsha} from {remote.name} for shallow clone')
+        self.repo.git.fetch('--no-tags', '--depth=2', '--filter=blob:none', remote.name, commit.hexsha)
+
+        # restart the persistent git processes so they pick up the new objects and promisor remote config
+        self.repo.git.clear_cache()
+
+    def _fetch_missing_commit(self: Self, commit: str) -> None:
+        """
+        Fetch a commit and its trees if it is missing from a shallow clone. Blobs are fetched lazily.
+
+        :param commit: commit hash
+        :return: None
+        """
+        try:
+            self.repo.git.cat_file('-e', f'{commit}^{{commit}}')
+        except GitCommandError:
+            remote = self.repo.remote()
+            logger.info(f'fetching commit {commit} from {remote.name}')
+            self.repo.git.fetch('--no-tags', '--depth=1', '--filter=blob:none', remote.name, commit)
+            self.repo.git.clear_cache()
+
+    def _get_file_diffs(self: Self, commit: Commit, other: Union[Commit, str],
+                        file_name_pattern_filter: Union[str, List[str], PathFilter]) -> Iterator[FileDiff]:
+        """
+        Get the file diffs between a git commit and another commit, one file at a time.
+
+        :param commit: git commit object
+        :param other: commit or ref to compare against
+        :param file_name_pattern_filter: Regex pattern(s) or PathFilter to filter file names
+        :return: iterator of FileDiffs
+        """
+        path_filter = PathFilter.create(file_name_pattern_filter)
+
+        for item in commit.diff(other, paths=path_filter.pathspecs or None):
             if not item or not item.b_path:
                 continue
 
             logger.info(f'found changed file: {item.b_path}')
 
-            if re.match(file_name_pattern_filter, item.b_path) is None:
+            if not path_filter.matches(item.b_path):
                 logger.info(f'skipping file: {item.b_path}')
                 continue
 
-            file_diffs.append(self._get_file_diff_from_git_diff(item))
-
-        return file_diffs
+            yield self._get_file_diff_from_git_diff(item)
@@ -0,0 +1,102 @@
+"""Filters file paths using regex patterns which are pushed down to git as pathspecs where possible."""
+import logging
+import re
+from typing import List, Optional, Union
+
+from typing_extensions import Self
+
+logger = logging.getLogger(__name__)
+
+_REGEX_SPECIAL_CHARACTERS = set(r'.^$*+?{}[]\|()')
+_QUANTIFIERS = set('*+?{')
+# characters with a meaning in git pathspecs, which are escaped when they are literal in the regex
+_GLOB_SPECIAL_CHARACTERS = set('*?[\\')
+
+
+class PathFilter:
+    """Filters file paths using regex patterns which are pushed down to git as pathspecs where possible."""
+
+    @staticmethod
+    def create(patterns: Union[str, List[str], 'PathFilter']) -> 'PathFilter':
+        """
+        Create a PathFilter, reusing it if one is provided already.
+
+        :param patterns: regex pattern, newline separated regex patterns, list of regex patterns or a PathFilter
+        :return: PathFilter
+        """
+        if isinstance(patterns, PathFilter):
+            return patterns
+        return PathFilter(patterns)
+
+    @staticmethod
+    def _to_pathspec(pattern: str) -> Optional[str]:
+        """
+        Translate a regex pattern to a git pathspec which matches at least every path the regex matches.
+
+        Only simple patterns made of literal characters, '.', '.*' and '.+' can be translated. The regex is
+        applied with re.match, so it is anchored at the start and the pathspec only ends there if the regex ends
+        with '$'. Git pathspecs without magic let '*' and '?' match '/', like '.*' and '.' in the regex. Escaped
+        characters which git reads as a glob, such as '[', stay escaped in the pathspec.
+
+        Example: '.*dev.*.tfvars' becomes '*dev*?tfvars*'
+
+        :param pattern: regex pattern
+        :return: git pathspec or None if the pattern can not be translated
+        """
+        pathspec = ''
+        position = 1 if pattern.startswith('^') else 0
+
+        while position < len(pattern):
+            character = pattern[position]
+            following = pattern[position + 1] if position + 1 < len(pattern) else ''
+
+            if character == '$' and position == len(pattern) - 1:
+                return pathspec or None
+            if character == '.' and following in ('*', '+'):
+                pathspec += '*' if following == '*' else '?*'
+                position += 2
+                continue
+            if character == '\\' and following and not following.isalnum():
+                pathspec += '\\' + following if following in _GLOB_SPECIAL_CHARACTERS else following
+                position += 1
+            elif character == '.':
+                pathspec += '?'
+            elif character not in _REGEX_SPECIAL_CHARACTERS:
+                pathspec += character
+            else:
+                return None
+
+            position += 1
+            if position < len(pattern) and pattern[position] in _QUANTIFIERS:
+                return None
+
+        return pathspec if pathspec.endswith('*') else f'{pathspec}*'
+
+    def __init__(self: Self, patterns: Union[str, List[str]]) -> None:
+        """
+        Initialize the PathFilter.
+
+        :param patterns: regex pattern, newline separated regex patterns or list of regex patterns
+        """
+        if isinstance(patterns, str):
+            patterns = patterns.splitlines()
+        patterns = [pattern.strip() for pattern in patterns if pattern and pattern.strip()]
+
+        self._regexes = [re.compile(pattern) for pattern in patterns]
+
+        pathspecs = [self._to_pathspec(pattern) for pattern in patterns]
+        if None in pathspecs:
+            logger.info('file pattern can not be translated to git pathspecs, filtering every changed file')
+            pathspecs = []
+        self.pathspecs: List[str] = pathspecs
+
+    def matches(self: Self, path: str) -> bool:
+        """
+        Check if the path matches any of the regex patterns.
+
+        :param path: file path
+        :return: True if the path matches, or if there are no patterns
+        """
+        if not self._regexes:
+            return True
+        return any(regex.match(path) for regex in self._regexes)
@@ -1,15 +1,55 @@
 """Provides unit tests for the GitUtil class."""
+import tempfile
+import tracemalloc
 import unittest
+from pathlib import Path
 from unittest.mock import MagicMock
 
+from git import GitCommandError, Repo
 from typing_extensions import Self
 
+from diff_parser.diff_parser import DiffParser
+from diff_parser.repo_commit_change import RepoCommitChange
 from git_util.git_util import GitUtil
 
 
 class TestGitUtil(unittest.TestCase):
     """Provides unit tests for the GitUtil class."""
 
+    @staticmethod
+    def _get_large_git_diff(index: int) -> MagicMock:
+        """
+        Get a git diff for a large file whose blobs are only created when they are read.
+
+        :param index: number of the file
+        :return: git diff
+        """
+        content = ''.join(f'config_{line} = "{line}"\n' for line in range(10000))
+        content += 'image = "123.foo.com/test-repo-1:abc{0}"\n'
+        diff = MagicMock()
+        diff.b_path = f'terraform/env/dev-{index}.tfvars'
+        diff.b_blob.data_stream.read.side_effect = lambda: content.format(1).encode('utf-8')
+        diff.a_blob.data_stream.read.side_effect = lambda: content.format(2).encode('utf-8')
+        return diff
+
+    def _get_peak_memory(self: Self, file_count: int) -> int:
+        """
+        Get the peak memory used to parse every change from a commit with large files.
+
+        :param file_count: number of changed files in the commit
+        :return: peak memory in bytes
+        """
+        repo = MagicMock()
+        repo.head.commit.diff.return_value = [self._get_large_git_diff(index) for index in range(file_count)]
+
+        tracemalloc.start()
+        for file_diff in GitUtil(repo).get_file_diffs_from_last_commit('.*dev.*.tfvars'):
+            for _ in DiffParser.get_repo_commit_changes(file_diff.unified_diff):
+                pass
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return peak
+
     def test_get_file_diff_from_git_diff(self: Self) -> None:
         """Validate the _get_file_diff_from_git_diff method is successful."""
         diff = MagicMock()
@@ -46,7 +86,7 @@ class TestGitUtil(unittest.TestCase):
         repo.head.commit.diff.return_value = [git_diff_file_1, git_diff_file_2]
 
         git_util = GitUtil(repo)
-        file_diffs = git_util.get_file_diffs_from_last_commit('.*dev.*.tfvars')
+        file_diffs = list(git_util.get_file_diffs_from_last_commit('.*dev.*.tfvars'))
         self.assertEqual(len(file_diffs), 2)
 
         self.assertEqual(file_diffs[0].file_name, 'terraform/env/dev-1.tfvars')
@@ -85,7 +125,7 @@ class TestGitUtil(unittest.TestCase):
             MagicMock(b_path='foo.tfvars')
         ]
         git_util = GitUtil(repo)
-        file_diffs = git_util.get_file_diffs_from_last_commit('.*dev.*.tfvars')
+        file_diffs = list(git_util.get_file_diffs_from_last_commit('.*dev.*.tfvars'))
         self.assertEqual(len(file_diffs), 1)
 
     def test_get_file_diffs_from_last_commit_with_invalid_file(self: Self) -> None:
@@ -93,7 +133,7 @@ class TestGitUtil(unittest.TestCase):
         repo = MagicMock()
         repo.head.commit.diff.return_value = [None]
         git_util = GitUtil(repo)
-        file_diffs = git_util.get_file_diffs_from_last_commit('.*dev.*.tfvars')
+        file_diffs = list(git_util.get_file_diffs_from_last_commit('.*dev.*.tfvars'))
         self.assertEqual(len(file_diffs), 0)
 
     def test_get_file_diffs_from_last_commit_with_invalid_file_path(self: Self) -> None:
@@ -103,5 +143,269 @@ class TestGitUtil(unittest.TestCase):
             MagicMock(b_path=None)
         ]
         git_util = GitUtil(repo)
-        file_diffs = git_util.get_file_diffs_from_last_commit('.*dev.*.tfvars')
+        file_diffs = list(git_util.get_file_diffs_from_last_commit('.*dev.*.tfvars'))
         self.assertEqual(len(file_diffs), 0)
+
+    def test_get_file_diffs_from_commit(self: Self) -> None:
+        """Validate the commit is compared against its first parent."""
+        git_diff_file = MagicMock()
+        git_diff_file.b_path = 'terraform/env/dev-1.tfvars'
+        commit = MagicMock()
+        commit.diff.return_value = [git_diff_file]
+
+        file_diffs = list(GitUtil(MagicMock()).get_file_diffs_from_commit(commit, '.*dev.*.tfvars'))
+        self.assertEqual(len(file_diffs), 1)
+        commit.diff.assert_called_once_with(commit.parents[0], paths=['*dev*?tfvars*'])
+
+    def test_get_file_diffs_from_commit_without_parent(self: Self) -> None:
+        """The root commit should be skipped."""
+        commit = MagicMock(parents=[])
+        self.assertEqual([], list(GitUtil(MagicMock()).get_file_diffs_from_commit(commit, '.*dev.*.tfvars')))
+        commit.diff.assert_not_called()
+
+    def test_get_commits(self: Self) -> None:
+        """Validate only the provided options are passed to git."""
+        repo = MagicMock()
+        repo.iter_commits.return_value = iter(['commit-2', 'commit-1'])
+        self.assertEqual(['commit-2', 'commit-1'], GitUtil(repo).get_commits(max_count=2))
+        repo.iter_commits.assert_called_once_with('HEAD', max_count=2)
+
+    def test_get_file_diffs_from_last_commit_with_shallow_clone(self: Self) -> None:
+        """The missing parent commit should be fetched without blobs."""
+        repo = MagicMock()
+        repo.head.commit.hexsha = 'abc123'
+        repo.head.commit.diff.return_value = []
+        repo.git.rev_parse.return_value = 'true'
+        repo.remote.return_value.name = 'origin'
+
+        with tempfile.TemporaryDirectory() as git_dir:
+            (Path(git_dir) / 'shallow').write_text('abc123\n')
+            repo.git_dir = git_dir
+            list(GitUtil(repo).get_file_diffs_from_last_commit('.*dev.*.tfvars'))
+
+        repo.git.fetch.assert_called_once_with('--no-tags', '--depth=2', '--filter=blob:none', 'origin', 'abc123')
+        repo.git.clear_cache.assert_called_once()
+
+    def test_get_file_diffs_from_last_commit_with_shallow_clone_and_parent(self: Self) -> None:
+        """Nothing should be fetched when the parent commit is already available."""
+        repo = MagicMock()
+        repo.head.commit.hexsha = 'abc123'
+        repo.head.commit.diff.return_value = []
+        repo.git.rev_parse.return_value = 'true'
+
+        with tempfile.TemporaryDirectory() as git_dir:
+            (Path(git_dir) / 'shallow').write_text('def456\n')
+            repo.git_dir = git_dir
+            list(GitUtil(repo).get_file_diffs_from_last_commit('.*dev.*.tfvars'))
+
+        repo.git.fetch.assert_not_called()
+
+    def test_get_file_diffs_from_last_commit_with_full_clone(self: Self) -> None:
+        """Nothing should be fetched when the repository is not shallow."""
+        repo = MagicMock()
+        repo.head.commit.diff.return_value = []
+        repo.git.rev_parse.return_value = 'false'
+        list(GitUtil(repo).get_file_diffs_from_last_commit('.*dev.*.tfvars'))
+        repo.git.fetch.assert_not_called()
+
+    def test_get_file_diffs_from_last_commit_with_bounded_memory(self: Self) -> None:
+        """The peak memory should not grow with the number of changed files."""
+        single_file_peak = self._get_peak_memory(file_count=1)
+        many_files_peak = self._get_peak_memory(file_count=5)
+        self.assertLess(many_files_peak, single_file_peak * 2)
+
+    def test_get_file_diff_from_git_diff_with_new_file(self: Self) -> None:
+        """A file without a blob on one side of the diff should be treated as empty."""
+        diff = MagicMock()
+        diff.b_path = 'test.txt'
+        diff.b_blob = None
+        diff.a_blob.data_stream.read.return_value = b'hello\n'
+
+        self.assertEqual(['--- \n', '+++ \n', '@@ -0,0 +1 @@\n', '+hello'],
+                         list(GitUtil._get_file_diff_from_git_diff(diff).unified_diff))
+
+    def test_get_file_diffs_from_last_commit_with_submodules(self: Self) -> None:
+        """The changes of submodules should be read from the tree entries without reading any blob."""
+        identity = {
+            'GIT_AUTHOR_NAME': 'test',
+            'GIT_AUTHOR_EMAIL': 'test@example.com',
+            'GIT_COMMITTER_NAME': 'test',
+            'GIT_COMMITTER_EMAIL': 'test@example.com'
+        }
+        with tempfile.TemporaryDirectory() as git_dir:
+            repo = Repo.init(git_dir)
+            for name, commit in (('service-a', '1' * 40), ('service-b', '3' * 40)):
+                repo.git.update_index('--add', '--cacheinfo', f'160000,{commit},services/{name}')
+            repo.git.commit('--message', 'add services', env=identity)
+            for name, commit in (('service-a', '2' * 40), ('service-c', '4' * 40)):
+                repo.git.update_index('--add', '--cacheinfo', f'160000,{commit},services/{name}')
+            repo.git.update_index('--force-remove', 'services/service-b')
+            repo.git.commit('--message', 'update services', env=identity)
+
+            file_diffs = list(GitUtil(repo).get_file_diffs_from_last_commit('services/.*'))
+
+        self.assertEqual(['services/service-a', 'services/service-b', 'services/service-c'],
+                         [file_diff.file_name for file_diff in file_diffs])
+        self.assertEqual(
+            [
+                RepoCommitChange(repository='service-a', old_commit='1' * 40, new_commit='2' * 40),
+                None,
+                RepoCommitChange(repository='service-c', old_commit='', new_commit='4' * 40)
+            ],
+            [file_diff.submodule_change for file_diff in file_diffs]
+        )
+        self.assertEqual([], [line for file_diff in file_diffs for line in file_diff.unified_diff])
+
+    def test_get_tree_entries(self: Self) -> None:
+        """The files matching the filter should be listed with their object hashes from the tree."""
+        repo = MagicMock()
+        repo.git.hash_object.return_value = 'empty'
+        repo.git.diff_tree.return_value = (
+            ':000000 100644 000 aaa A\x00dev.tfvars\x00:000000 100644 000 bbb A\x00dev.md\x00'
+            ':000000 160000 000 ccc A\x00dev/service a\x00'
+        )
+
+        self.assertEqual([('dev.tfvars', 'aaa', False), ('dev/service a', 'ccc', True)],
+                         list(GitUtil(repo).get_tree_entries('env1', 'dev.*tfvars\ndev/')))
+        repo.git.diff_tree.assert_called_once_with('-r', '-z', '--no-renames', 'empty', 'env1', '--', 'dev*tfvars*', 'dev/*')
+
+    def test_get_tree_entries_with_pathspecs(self: Self) -> None:
+        """Only the files matching the pathspecs should be listed from the tree of a commit."""
+        identity = {
+            'GIT_AUTHOR_NAME': 'test',
+            'GIT_AUTHOR_EMAIL': 'test@example.com',
+            'GIT_COMMITTER_NAME': 'test',
+            'GIT_COMMITTER_EMAIL': 'test@example.com'
+        }
+        with tempfile.TemporaryDirectory() as git_dir:
+            repo = Repo.init(git_dir)
+            for path in ['dev.tfvars', 'env/dev/main.tfvars', 'dev[1].tfvars', 'prod.tfvars', 'README.md']:
+                Path(git_dir, path).parent.mkdir(parents=True, exist_ok=True)
+                Path(git_dir, path).write_text('test\n')
+            repo.git.add('.')
+            repo.git.commit('--message', 'add files', env=identity)
+
+            entries = list(GitUtil(repo).get_tree_entries('HEAD', '.*dev.*.tfvars'))
+            bracket_entries = list(GitUtil(repo).get_tree_entries('HEAD', r'dev\[1\]\.tfvars'))
+            every_entry = list(GitUtil(repo).get_tree_entries('HEAD', ''))
+
+        self.assertEqual(['dev.tfvars', 'dev[1].tfvars', 'env/dev/main.tfvars'], [path for path, *_ in entries])
+        self.assertEqual(['dev[1].tfvars'], [path for path, *_ in bracket_entries])
+        self.assertEqual(5, len(every_entry))
+
+    def test_read_note(self: Self) -> None:
+        """The notes ref should be fetched before reading the note of the last commit."""
+        repo = MagicMock()
+        repo.remote.return_value.name = 'origin'
+        repo.git.notes.return_value = '{}'
+
+        self.assertEqual('{}', GitUtil(repo).read_note('test-ref'))
+        repo.git.fetch.assert_called_once_with('origin', '+refs/notes/test-ref:refs/notes/test-ref')
+        repo.git.notes.assert_called_once_with('--ref', 'test-ref', 'show', 'HEAD')
+
+        GitUtil(repo).read_note('test-ref', 'HEAD~1')
+        self.assertEqual(('--ref', 'test-ref', 'show', 'HEAD~1'), repo.git.notes.call_args.args)
+
+    def test_read_note_without_note(self: Self) -> None:
+        """None should be returned when there is no notes ref or note."""
+        repo = MagicMock()
+        repo.git.fetch.side_effect = GitCommandError('fetch')
+        repo.git.notes.side_effect = GitCommandError('notes')
+        self.assertIsNone(GitUtil(repo).read_note('test-ref'))
+
+    def test_write_note(self: Self) -> None:
+        """The note should be added to the last commit and pushed, even if the push fails."""
+        repo = MagicMock()
+        repo.remote.return_value.name = 'origin'
+        repo.git.push.side_effect = GitCommandError('push')
+
+        GitUtil(repo).write_note('test-ref', '{}')
+        self.assertEqual(('--ref', 'test-ref', 'add', '--force', '--file', '-', 'HEAD'),
+                         repo.git.notes.call_args.args)
+        repo.git.push.assert_called_once_with('origin', 'refs/notes/test-ref')
+
+    def test_write_note_with_large_content(self: Self) -> None:
+        """A note larger than the argument size limit should be written and read back."""
+        identity = {
+            'GIT_AUTHOR_NAME': 'test',
+            'GIT_AUTHOR_EMAIL': 'test@example.com',
+            'GIT_COMMITTER_NAME': 'test',
+            'GIT_COMMITTER_EMAIL': 'test@example.com'
+        }
+        content = '{"records":"' + 'a' * 200 * 1024 + '"}'
+        with tempfile.TemporaryDirectory() as git_dir:
+            Repo.init(f'{git_dir}/remote.git', bare=True)
+            repo = Repo.init(f'{git_dir}/repo')
+            repo.create_remote('origin', f'{git_dir}/remote.git')
+            repo.git.commit('--allow-empty', '--message', 'update', env=identity)
+
+            GitUtil(repo).write_note('test-ref', content)
+
+            self.assertEqual(content, GitUtil(repo).read_note('test-ref'))
+            remote_note = Repo(f'{git_dir}/remote.git').git.notes('--ref', 'test-ref', 'show', repo.head.commit.hexsha)
+            self.assertEqual(content, remote_note)
+
+    def test_get_file_diffs_since(self: Self) -> None:
+        """A missing earlier commit should be fetched before diffing the last commit against it."""
+        repo = MagicMock()
+        repo.head.commit.diff.return_value = []
+        repo.git.cat_file.side_effect = GitCommandError('cat-file')
+        repo.remote.return_value.name = 'origin'
+
+        list(GitUtil(repo).get_file_diffs_since('env1', '.*dev.*.tfvars'))
+        repo.git.fetch.assert_called_once_with('--no-tags', '--depth=1', '--filter=blob:none', 'origin', 'env1')
+        self.assertEqual('env1', repo.head.commit.diff.call_args.args[0])
+
+    def test_is_ancestor(self: Self) -> None:
+        """Commits in the fetched history should be compared without fetching anything."""
+        repo = MagicMock()
+        repo.git.rev_parse.return_value = 'false'
+        repo.git.merge_base.side_effect = [None, GitCommandError('merge-base')]
+
+        self.assertTrue(GitUtil(repo).is_ancestor('env1', 'env2'))
+        self.assertFalse(GitUtil(repo).is_ancestor('env2', 'env1'))
+        self.assertTrue(GitUtil(repo).is_ancestor('env1', 'env1'))
+        repo.git.merge_base.assert_called_with('--is-ancestor', 'env2', 'env1')
+        repo.git.fetch.assert_not_called()
+
+    def test_is_ancestor_with_shallow_clone(self: Self) -> None:
+        """A shallow clone should only be deepened back to about when the possible ancestor was committed."""
+        repo = MagicMock()
+        repo.git.rev_parse.return_value = 'true'
+        repo.remote.return_value.name = 'origin'
+        repo.git.merge_base.side_effect = [GitCommandError('merge-base'), None]
+        repo.git.show.return_value = '1704880800'
+
+        self.assertTrue(GitUtil(repo).is_ancestor('env1', 'env2'))
+        repo.git.cat_file.assert_called_once_with('-e', 'env1^{commit}')
+        repo.git.show.assert_called_once_with('-s', '--format=%ct', 'env1')
+        repo.git.fetch.assert_called_once_with('--no-tags', '--filter=tree:0', '--shallow-since=2024-01-09 10:00:00 +0000',
+                                               'origin', 'env2')
+
+    def test_push_ref(self: Self) -> None:
+        """The ref should only be pushed when it still points to the expected commit on the remote."""
+        repo = MagicMock()
+        repo.remote.return_value.name = 'origin'
+        repo.git.push.side_effect = [None, GitCommandError('push')]
+
+        self.assertTrue(GitUtil(repo).push_ref('refs/release-notes/dev/lease', 'env2', 'env1'))
+        repo.git.push.assert_called_with('--force-with-lease=refs/release-notes/dev/lease:env1', 'origin',
+                                         'env2:refs/release-notes/dev/lease')
+        self.assertFalse(GitUtil(repo).push_ref('refs/release-notes/dev/lease', 'env2', None))
+        repo.git.push.assert_called_with('--force-with-lease=refs/release-notes/dev/lease:', 'origin',
+                                         'env2:refs/release-notes/dev/lease')
+
+        repo.git.push.side_effect = None
+        self.assertTrue(GitUtil(repo).push_ref('refs/release-notes/dev/lease', '', 'env2'))
+        repo.git.push.assert_called_with('--force-with-lease=refs/release-notes/dev/lease:env2', 'origin',
+                                         ':refs/release-notes/dev/lease')
+
+    def test_get_remote_ref(self: Self) -> None:
+        """The commit of a ref on the remote should be returned, or None if the ref does not exist."""
+        repo = MagicMock()
+        repo.remote.return_value.name = 'origin'
+        repo.git.ls_remote.side_effect = ['env1\trefs/release-notes/dev/lease', '']
+
+        self.assertEqual('env1', GitUtil(repo).get_remote_ref('refs/release-notes/dev/lease'))
+        self.assertIsNone(GitUtil(repo).get_remote_ref('refs/release-notes/dev/done'))
+        repo.git.ls_remote.assert_called_with('origin', 'refs/release-notes/dev/done')
@@ -0,0 +1,56 @@
+"""Provide tests for the PathFilter."""
+from typing import Optional
+
+import pytest
+
+from git_util.path_filter import PathFilter
+
+
+@pytest.mark.parametrize('test_input,expected', [
+    ('.*dev.*.tfvars', '*dev*?tfvars*'),
+    (r'^terraform/env/dev\.tfvars$', 'terraform/env/dev.tfvars'),
+    ('terraform/.+/qa.tfvars', 'terraform/?*/qa?tfvars*'),
+    ('.*', '*'),
+    (r'.*dev\[1\]\.tfvars', r'*dev\[1].tfvars*'),
+    (r'.*dev\*\?\\.tfvars', r'*dev\*\?\\?tfvars*'),
+    ('.*dev-[0-9].tfvars', None),
+    ('.*(dev|qa).tfvars', None),
+    ('.*dev?.tfvars', None),
+    (r'.*dev\d.tfvars', None),
+    ('.*dev{2}.tfvars', None),
+    ('$', None),
+])
+def test_to_pathspec(test_input: str, expected: Optional[str]) -> None:
+    """Validate the _to_pathspec method translates simple patterns and rejects the others."""
+    assert PathFilter._to_pathspec(test_input) == expected
+
+
+def test_path_filter_with_multiple_patterns() -> None:
+    """Validate newline separated patterns are all pushed down and matched."""
+    path_filter = PathFilter('.*dev.*.tfvars\nservices/.*\n')
+    assert path_filter.pathspecs == ['*dev*?tfvars*', 'services/*']
+    assert path_filter.matches('terraform/env/dev-1.tfvars')
+    assert path_filter.matches('services/foo')
+    assert not path_filter.matches('terraform/env/qa.tfvars')
+
+
+def test_path_filter_with_regex_fallback() -> None:
+    """Validate no pathspecs are used when any pattern can not be translated."""
+    path_filter = PathFilter(['.*dev.*.tfvars', '.*(qa|uat).tfvars'])
+    assert path_filter.pathspecs == []
+    assert path_filter.matches('terraform/env/uat.tfvars')
+    assert not path_filter.matches('terraform/env/prod.tfvars')
+
+
+def test_path_filter_without_patterns() -> None:
+    """Validate every path matches when there are no patterns."""
+    path_filter = PathFilter('')
+    assert path_filter.pathspecs == []
+    assert path_filter.matches('main.tf')
+
+
+def test_create_with_path_filter() -> None:
+    """Validate an existing PathFilter is reused."""
+    path_filter = PathFilter('.*')
+    assert PathFilter.create(path_filter) is path_filter
+    assert PathFilter.create('.*').pathspecs == ['*']
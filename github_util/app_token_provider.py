@@ -0,0 +1,166 @@
+"""Provides GitHub App installation tokens, cached until shortly before they expire."""
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+import jwt
+import requests
+from github import Auth
+from typing_extensions import Self
+
+from github_util.github_rest_client import GITHUB_API_URL
+
+logger = logging.getLogger(__name__)
+
+# refresh the installation token before it expires so that it does not expire during a request
+_EXPIRY_MARGIN_SECONDS = 300
+# GitHub rejects app tokens (JWT) which are valid for more than 10 minutes
+_JWT_LIFETIME_SECONDS = 540
+# allow for clock drift between the runner and GitHub
+_JWT_BACKDATE_SECONDS = 60
+
+
+class AppTokenProvider:
+    """
+    Provides GitHub App installation tokens, cached until shortly before they expire.
+
+    Installation tokens have higher rate limits than a personal access token. The JWT exchange is only done when
+    there is no cached token or it is about to expire, and one provider can be shared by every GitHub client.
+    """
+
+    def __init__(self: Self, app_id: str, private_key: str, installation_id: Optional[str] = None,
+                 organization_name: Optional[str] = None, base_url: str = GITHUB_API_URL,
+                 request_timeout: Optional[int] = None, session: Optional[requests.Session] = None,
+                 clock: Callable[[], float] = time.time) -> None:
+        """
+        Initialize the AppTokenProvider.
+
+        :param app_id: ID of the GitHub App
+        :param private_key: PEM encoded private key of the GitHub App
+        :param installation_id: ID of the installation, looked up from the organization when not provided
+        :param organization_name: Name of the GitHub organization the app is installed in
+        :param base_url: URL of the GitHub REST API
+        :param request_timeout: timeout in seconds for each request to GitHub
+        :param session: Optionally inject a requests session
+        :param clock: Optionally inject a clock returning the current time in seconds since the epoch
+        """
+        self.app_id = app_id
+        self.private_key = private_key
+        self.installation_id = installation_id
+        self.organization_name = organization_name
+        self.base_url = base_url.rstrip('/')
+        self.request_timeout = request_timeout
+        self.session = session or requests.Session()
+        self.clock = clock
+        self.exchange_count = 0
+        self._token: Optional[str] = None
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+
+    def get_token(self: Self) -> str:
+        """
+        Get an installation token, exchanging a new JWT for one only if the cached token is about to expire.
+
+        :raises requests.RequestException: if the token can not be created
+        :return: installation token
+        """
+        with self._lock:
+            if not self._token or self.clock() >= self._expires_at - _EXPIRY_MARGIN_SECONDS:
+                self._token, self._expires_at = self._create_installation_token()
+            return self._token
+
+    def _create_installation_token(self: Self) -> tuple[str, float]:
+        """
+        Exchange a JWT of the app for an installation token.
+
+        :raises requests.RequestException: if the token can not be created
+        :return: installation token and the time it expires at
+        """
+        app_jwt = self._create_jwt()
+        installation_id = self._get_installation_id(app_jwt)
+
+        logger.info(f'creating installation token for GitHub App:{self.app_id} installation:{installation_id}')
+        response = self.session.post(f'{self.base_url}/app/installations/{installation_id}/access_tokens',
+                                     headers=self._get_headers(app_jwt), timeout=self.request_timeout)
+        response.raise_for_status()
+        self.exchange_count += 1
+
+        content = response.json()
+        expires_at = datetime.strptime(content['expires_at'], '%Y-%m-%dT%H:%M:%SZ').replace(tzinfo=timezone.utc)
+        return content['token'], expires_at.timestamp()
+
+    def _get_installation_id(self: Self, app_jwt: str) -> str:
+        """
+        Get the installation ID, looking up the installation of the app in the organization if needed.
+
+        :param app_jwt: JWT of the app
+        :raises requests.RequestException: if the installation can not be found
+        :return: installation ID
+        """
+        if not self.installation_id:
+            logger.info(f'getting installation of GitHub App:{self.app_id} in organization:{self.organization_name}')
+            response = self.session.get(f'{self.base_url}/orgs/{self.organization_name}/installation',
+                                        headers=self._get_headers(app_jwt), timeout=self.request_timeout)
+            response.raise_for_status()
+            self.installation_id = str(response.json()['id'])
+        return self.installation_id
+
+    def _create_jwt(self: Self) -> str:
+        """
+        Create a short-lived JWT signed with the private key of the app.
+
+        :return: JWT
+        """
+        now = int(self.clock())
+        payload = {
+            'iat': now - _JWT_BACKDATE_SECONDS,
+            'exp': now + _JWT_LIFETIME_SECONDS,
+            'iss': str(self.app_id)
+        }
+        return jwt.encode(payload, self.private_key, algorithm='RS256')
+
+    @staticmethod
+    def _get_headers(app_jwt: str) -> dict[str, str]:
+        """
+        Get the headers to authenticate as the app.
+
+        :param app_jwt: JWT of the app
+        :return: request headers
+        """
+        return {
+            'Accept': 'application/vnd.github+json',
+            'Authorization': f'Bearer {app_jwt}',
+            'X-GitHub-Api-Version': '2022-11-28'
+        }
+
+
+class AppTokenAuth(Auth.Auth):
+    """Authenticates PyGithub requests with the installation tokens of an AppTokenProvider."""
+
+    def __init__(self: Self, token_provider: AppTokenProvider) -> None:
+        """
+        Initialize the AppTokenAuth.
+
+        :param token_provider: provider of the installation tokens
+        """
+        self.token_provider = token_provider
+
+    @property
+    def token_type(self: Self) -> str:
+        """
+        Get the type of the token used in the Authorization header.
+
+        :return: token type
+        """
+        return 'token'
+
+    @property
+    def token(self: Self) -> str:
+        """
+        Get the current installation token.
+
+        :return: installation token
+        """
+        return self.token_provider.get_token()
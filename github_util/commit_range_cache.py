@@ -0,0 +1,111 @@
+"""Caches the merge commits of compared ranges and composes new ranges from cached ranges which chain together."""
+from collections import deque
+from typing import Optional
+
+from typing_extensions import Self
+
+from commit_store.commit_store import CommitStore
+
+LINEAR_STATUSES = ('ahead', 'identical')
+
+
+class CommitRangeCache:
+    """
+    Caches the merge commits of compared ranges and composes new ranges from cached ranges which chain together.
+
+    A range is linear when the compare status is 'ahead' or 'identical', meaning base is an ancestor of head.
+    Linear ranges chain: if A..B and B..C are linear then the merge commits of A..C are those of A..B followed by
+    those of B..C. Ranges which are not linear are only returned for an exact match. The merge commits of each range
+    are kept in a CommitStore, so a backfill comparing many ranges keeps 20 bytes per merge commit.
+    """
+
+    def __init__(self: Self) -> None:
+        """Initialize the CommitRangeCache."""
+        self._ranges: dict[str, dict[str, dict[str, tuple[str, CommitStore]]]] = {}
+        self._reverse_ranges: dict[str, dict[str, set[str]]] = {}
+
+    def put(self: Self, repo_name: str, base: str, head: str, status: str, merge_commits: list[str]) -> None:
+        """
+        Add a compared range to the cache.
+
+        :param repo_name: name of the repository
+        :param base: base ref of the range
+        :param head: head ref of the range
+        :param status: compare status of the range (ahead, behind, diverged or identical)
+        :param merge_commits: merge commit hashes in the range, oldest first
+        :return: None
+        """
+        self._ranges.setdefault(repo_name, {}).setdefault(base, {})[head] = (status, CommitStore(merge_commits))
+        self._reverse_ranges.setdefault(repo_name, {}).setdefault(head, set()).add(base)
+
+    def get(self: Self, repo_name: str, base: str, head: str) -> Optional[list[str]]:
+        """
+        Get the merge commits of a range, composing it from chained cached ranges if needed.
+
+        :param repo_name: name of the repository
+        :param base: base ref of the range
+        :param head: head ref of the range
+        :return: merge commit hashes, or None if the range can not be built from the cache
+        """
+        cached = self._ranges.get(repo_name, {}).get(base, {}).get(head)
+        if cached:
+            return list(cached[1])
+        return self._walk(repo_name, base, forward=True).get(head)
+
+    def get_longest_prefix(self: Self, repo_name: str, base: str) -> Optional[tuple[str, list[str]]]:
+        """
+        Get the cached chain of linear ranges starting at base which contains the most merge commits.
+
+        :param repo_name: name of the repository
+        :param base: base ref of the range
+        :return: ref where the chain ends and the merge commits of the chain, or None if nothing is cached
+        """
+        return self._get_longest(self._walk(repo_name, base, forward=True))
+
+    def get_longest_suffix(self: Self, repo_name: str, head: str) -> Optional[tuple[str, list[str]]]:
+        """
+        Get the cached chain of linear ranges ending at head which contains the most merge commits.
+
+        :param repo_name: name of the repository
+        :param head: head ref of the range
+        :return: ref where the chain starts and the merge commits of the chain, or None if nothing is cached
+        """
+        return self._get_longest(self._walk(repo_name, head, forward=False))
+
+    @staticmethod
+    def _get_longest(chains: dict[str, list[str]]) -> Optional[tuple[str, list[str]]]:
+        """
+        Get the chain containing the most merge commits.
+
+        :param chains: merge commits of the chain to each reachable ref
+        :return: ref and merge commits of the longest chain, or None if there are no chains
+        """
+        if not chains:
+            return None
+        return max(chains.items(), key=lambda chain: len(chain[1]))
+
+    def _walk(self: Self, repo_name: str, start: str, forward: bool) -> dict[str, list[str]]:
+        """
+        Find every ref reachable from start through cached linear ranges.
+
+        :param repo_name: name of the repository
+        :param start: ref to start from
+        :param forward: walk from base to head when True, from head to base when False
+        :return: merge commits of the chain between start and each reachable ref, oldest first
+        """
+        ranges = self._ranges.get(repo_name, {})
+        chains: dict[str, list[str]] = {start: []}
+        queue = deque([start])
+
+        while queue:
+            ref = queue.popleft()
+            neighbours = ranges.get(ref, {}) if forward else self._reverse_ranges.get(repo_name, {}).get(ref, set())
+            for neighbour in neighbours:
+                status, merge_commits = ranges[ref][neighbour] if forward else ranges[neighbour][ref]
+                if neighbour in chains or status not in LINEAR_STATUSES:
+                    continue
+                chains[neighbour] = chains[ref] + list(merge_commits) if forward else list(merge_commits) + chains[ref]
+                queue.append(neighbour)
+
+        del chains[start]
+        return chains
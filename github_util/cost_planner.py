@@ -0,0 +1,125 @@
+"""Estimates the API cost of the pull request lookup strategies to pick the cheapest one for a range."""
+import logging
+import math
+from dataclasses import dataclass
+from typing import Optional
+
+from typing_extensions import Self
+
+logger = logging.getLogger(__name__)
+
+STRATEGY_AUTO = 'auto'
+STRATEGY_COMMIT = 'commit'
+STRATEGY_MERGE_WINDOW = 'merge-window'
+
+ENDPOINT_REPO = 'GET /repos/{owner}/{repo}'
+ENDPOINT_COMPARE = 'GET /repos/{owner}/{repo}/compare/{base}...{head}'
+ENDPOINT_COMMIT = 'GET /repos/{owner}/{repo}/commits/{sha}'
+ENDPOINT_COMMIT_PULLS = 'GET /repos/{owner}/{repo}/commits/{sha}/pulls'
+ENDPOINT_GIT_COMMIT = 'GET /repos/{owner}/{repo}/git/commits/{sha}'
+ENDPOINT_PULLS = 'GET /repos/{owner}/{repo}/pulls'
+ENDPOINT_SEARCH_ISSUES = 'GET /search/issues'
+ENDPOINT_TAG_REF = 'GET /repos/{owner}/{repo}/git/ref/tags/{tag}'
+ENDPOINT_WRITE_TAG_REF = 'PATCH or POST /repos/{owner}/{repo}/git/refs/tags/{tag}'
+
+
+@dataclass
+class RangeEstimate:
+    """Represents what is known about a range before its pull requests are looked up."""
+
+    merge_commits: int
+    uncached_merge_commits: int
+    repo_cached: bool
+    base_date_cached: bool
+    # closed pull requests updated since the base commit, which the merge window lists, when they were counted
+    updated_pull_requests: Optional[int] = None
+
+
+class CostPlanner:
+    """
+    Estimates the API cost of the pull request lookup strategies to pick the cheapest one for a range.
+
+    The commit strategy costs one lookup per merge commit whose pull requests are not cached. The merge window
+    strategy costs the repository and the base commit date, when they are not cached, and one call per page of
+    the closed pull requests updated since the base commit. That depends on how busy the repository is rather than
+    on the range, so the merge window is only estimated, and chosen, once those pull requests were counted.
+    """
+
+    def __init__(self: Self, lean_client: bool = True, page_size: int = 100) -> None:
+        """
+        Initialize the CostPlanner.
+
+        :param lean_client: True if the pull requests of a commit are listed without loading the commit first
+        :param page_size: number of pull requests per page when listing them
+        """
+        self.lean_client = lean_client
+        self.page_size = page_size
+
+    def estimate_endpoints(self: Self, range_estimate: RangeEstimate) -> dict[str, dict[str, int]]:
+        """
+        Estimate the API calls to each endpoint which each strategy needs to find the pull requests of a range.
+
+        :param range_estimate: what is known about the range
+        :return: estimated API calls to each endpoint for each strategy which can be estimated
+        """
+        commits = range_estimate.uncached_merge_commits
+        commit_endpoints = {ENDPOINT_COMMIT_PULLS: commits} if self.lean_client else {
+            ENDPOINT_COMMIT: commits,
+            ENDPOINT_COMMIT_PULLS: commits
+        }
+
+        estimates = {STRATEGY_COMMIT: {endpoint: calls for endpoint, calls in commit_endpoints.items() if calls}}
+        if range_estimate.updated_pull_requests is not None:
+            merge_window_endpoints = {}
+            if commits:
+                merge_window_endpoints = {
+                    ENDPOINT_REPO: 0 if range_estimate.repo_cached else 1,
+                    ENDPOINT_GIT_COMMIT: 0 if range_estimate.base_date_cached else 1,
+                    ENDPOINT_PULLS: max(1, math.ceil(range_estimate.updated_pull_requests / self.page_size))
+                }
+            estimates[STRATEGY_MERGE_WINDOW] = {
+                endpoint: calls for endpoint, calls in merge_window_endpoints.items() if calls
+            }
+        return estimates
+
+    def is_worth_counting(self: Self, range_estimate: RangeEstimate) -> bool:
+        """
+        Check if counting the pull requests the merge window would list can pay off.
+
+        The merge window costs at least the count and one page, and the repository and base commit date when they
+        are not cached, so it is only counted when the per commit lookups cost more than that.
+
+        :param range_estimate: what is known about the range
+        :return: True if the merge window might be cheaper than the per commit lookups
+        """
+        least_merge_window_calls = 2 + (not range_estimate.repo_cached) + (not range_estimate.base_date_cached)
+        return self.estimate(range_estimate)[STRATEGY_COMMIT] > least_merge_window_calls
+
+    def estimate(self: Self, range_estimate: RangeEstimate) -> dict[str, int]:
+        """
+        Estimate the API calls each strategy needs to find the pull requests of a range.
+
+        :param range_estimate: what is known about the range
+        :return: estimated API calls for each strategy which can be estimated
+        """
+        return {
+            strategy: sum(endpoints.values())
+            for strategy, endpoints in self.estimate_endpoints(range_estimate).items()
+        }
+
+    def choose(self: Self, range_estimate: RangeEstimate, rate_limit_remaining: Optional[int] = None) -> tuple[str, int]:
+        """
+        Choose the cheapest strategy for a range, preferring per commit lookups when they cost the same.
+
+        :param range_estimate: what is known about the range
+        :param rate_limit_remaining: API calls left in the current rate limit window, if known
+        :return: cheapest strategy and its estimated API calls
+        """
+        estimates = self.estimate(range_estimate)
+        strategy = min(estimates, key=lambda name: (estimates[name], name != STRATEGY_COMMIT))
+        logger.info(f'estimated API calls for {range_estimate.merge_commits} merge commits '
+                    f'({range_estimate.uncached_merge_commits} not cached): {estimates}, choosing {strategy}')
+        if rate_limit_remaining is not None and estimates[strategy] > rate_limit_remaining:
+            logger.warning(f'estimated {estimates[strategy]} API calls exceed the {rate_limit_remaining} calls '
+                           'left in the rate limit')
+        return strategy, estimates[strategy]
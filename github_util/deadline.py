@@ -0,0 +1,66 @@
+"""Provides an overall time budget for the GitHub API calls."""
+import time
+from typing import Callable, Optional
+
+from typing_extensions import Self
+
+
+class DeadlineExceededError(Exception):
+    """Raised when the time budget has run out."""
+
+
+class RequestFailedError(DeadlineExceededError):
+    """Raised when a request to GitHub timed out or failed with an error which may pass, handled like the deadline."""
+
+
+class Deadline:
+    """Provides an overall time budget for the GitHub API calls."""
+
+    def __init__(self: Self, seconds: Optional[float] = None, clock: Callable[[], float] = time.monotonic) -> None:
+        """
+        Initialize the Deadline, starting the clock.
+
+        :param seconds: time budget in seconds, None for no limit
+        :param clock: function returning the current time in seconds
+        """
+        self._clock = clock
+        self._expires_at = clock() + seconds if seconds else None
+
+    def remaining(self: Self) -> Optional[float]:
+        """
+        Get the remaining time budget.
+
+        :return: remaining seconds, None if there is no limit
+        """
+        if self._expires_at is None:
+            return None
+        return max(0.0, self._expires_at - self._clock())
+
+    def get_timeout(self: Self, request_timeout: Optional[float]) -> Optional[float]:
+        """
+        Get the timeout of a request, capped at the remaining time budget.
+
+        :param request_timeout: timeout in seconds for each request, None for no limit
+        :return: timeout in seconds, None if there is no limit
+        """
+        remaining = self.remaining()
+        if remaining is None:
+            return request_timeout
+        return min(request_timeout, remaining) if request_timeout else remaining
+
+    def expired(self: Self) -> bool:
+        """
+        Check if the time budget has run out.
+
+        :return: True if the deadline has passed
+        """
+        return self.remaining() == 0.0
+
+    def check(self: Self) -> None:
+        """
+        Raise an error if the time budget has run out.
+
+        :return: None
+        """
+        if self.expired():
+            raise DeadlineExceededError('the deadline for GitHub API calls has passed')
@@ -0,0 +1,141 @@
+"""Provides a lean client for the few GitHub REST endpoints used to resolve pull requests."""
+import logging
+from typing import Any, Iterator, Optional, Protocol
+
+import requests
+from requests.adapters import HTTPAdapter
+from typing_extensions import Self
+from urllib3.util.retry import Retry
+
+from github_util.deadline import Deadline
+from github_util.pull_request import PullRequest
+
+logger = logging.getLogger(__name__)
+
+GITHUB_API_URL = 'https://api.github.com'
+# retries of a request which failed on the server, rate limits are not waited for so the deadline is kept
+_RETRIES = 2
+
+
+class TokenProvider(Protocol):
+    """Provides a token to authenticate each request, for example an installation token of a GitHub App."""
+
+    def get_token(self: Self) -> str:
+        """
+        Get a valid token.
+
+        :return: token
+        """
+
+
+class GitHubRestClient:
+    """
+    Provides a lean client for the few GitHub REST endpoints used to resolve pull requests.
+
+    PyGithub loads a full object before each nested call, for example the repository before a compare and the
+    commit, including every file patch, before listing its pull requests. This client calls the nested endpoints
+    directly over one keep-alive session with gzip, and only parses the fields which are needed. Server errors are
+    retried twice, and rate limits raise an error instead of waiting for the limit to reset.
+    """
+
+    def __init__(self: Self, access_token: str, base_url: str = GITHUB_API_URL,
+                 request_timeout: Optional[int] = None, session: Optional[requests.Session] = None,
+                 token_provider: Optional[TokenProvider] = None, deadline: Optional[Deadline] = None) -> None:
+        """
+        Initialize the GitHubRestClient.
+
+        :param access_token: GitHub personal access token
+        :param base_url: URL of the GitHub REST API
+        :param request_timeout: timeout in seconds for each request to GitHub
+        :param session: Optionally inject a requests session
+        :param token_provider: Optionally get the token for each request from a provider instead of the access token
+        :param deadline: Optionally cap the timeout of each request at the remaining time budget
+        """
+        self.base_url = base_url.rstrip('/')
+        self.request_timeout = request_timeout
+        self.session = session or requests.Session()
+        retry = Retry(total=_RETRIES, backoff_factor=0.5, status_forcelist=(500, 502, 503, 504),
+                      respect_retry_after_header=False, raise_on_status=False)
+        self.session.mount(self.base_url, HTTPAdapter(max_retries=retry))
+        self.session.headers.update({
+            'Accept': 'application/vnd.github+json',
+            'Accept-Encoding': 'gzip',
+            'X-GitHub-Api-Version': '2022-11-28'
+        })
+        self.access_token = access_token
+        self.token_provider = token_provider
+        self.deadline = deadline or Deadline()
+        self.request_count = 0
+        self.bytes_received = 0
+        self.rate_limit_remaining: Optional[int] = None
+
+    def compare(self: Self, owner: str, repo_name: str, base: str, head: str) -> tuple[str, list[str]]:
+        """
+        Compare two git refs and get the merge commit hashes between them.
+
+        :param owner: owner of the repository
+        :param repo_name: name of the repository
+        :param base: base ref to compare from
+        :param head: head ref to compare to
+        :raises requests.RequestException: if a request fails
+        :return: compare status and list of merge commit hashes, oldest first
+        """
+        status = ''
+        merge_commits = []
+        for page in self._get_pages(f'/repos/{owner}/{repo_name}/compare/{base}...{head}'):
+            status = status or page['status']
+            merge_commits.extend(commit['sha'] for commit in page['commits'] if len(commit['parents']) > 1)
+        return status, merge_commits
+
+    def get_commit_pull_requests(self: Self, owner: str, repo_name: str, commit: str) -> list[PullRequest]:
+        """
+        Get the pull requests associated with a commit, without loading the commit itself.
+
+        :param owner: owner of the repository
+        :param repo_name: name of the repository
+        :param commit: commit hash
+        :raises requests.RequestException: if a request fails
+        :return: list of pull requests
+        """
+        return [
+            PullRequest(title=pr['title'], number=pr['number'], url=pr['html_url'])
+            for page in self._get_pages(f'/repos/{owner}/{repo_name}/commits/{commit}/pulls')
+            for pr in page
+        ]
+
+    def _get_pages(self: Self, path: str) -> Iterator[Any]:
+        """
+        Get every page of a REST endpoint, following the next links.
+
+        :param path: path of the endpoint
+        :raises requests.RequestException: if a request fails
+        :raises DeadlineExceededError: if the deadline passes before every page is received
+        :return: parsed JSON of each page
+        """
+        url = f'{self.base_url}{path}'
+        params = {'per_page': 100}
+        while url:
+            self.deadline.check()
+            token = self.token_provider.get_token() if self.token_provider else self.access_token
+            response = self.session.get(url, params=params, headers={'Authorization': f'Bearer {token}'},
+                                        timeout=self.deadline.get_timeout(self.request_timeout))
+            self._count(response)
+            response.raise_for_status()
+            yield response.json()
+            url = response.links.get('next', {}).get('url')
+            params = None
+
+    def _count(self: Self, response: requests.Response) -> None:
+        """
+        Count a request and the bytes received over the wire for it, before decompression, and keep the rate limit.
+
+        :param response: response of the request
+        :return: None
+        """
+        body_bytes = response.raw.tell() if response.raw else len(response.content)
+        self.request_count += 1
+        self.bytes_received += body_bytes
+        if response.headers.get('X-RateLimit-Remaining'):
+            self.rate_limit_remaining = int(response.headers['X-RateLimit-Remaining'])
+        logger.info(f'GET {response.url} {response.status_code}: {body_bytes} bytes '
+                    f'({self.bytes_received} bytes in {self.request_count} requests)')
@@ -1,16 +1,50 @@
 """Provides functionality for interfacing with GitHub repositories."""
 import logging
-from typing import Optional
+import math
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, Optional
 
 from github import Github, Auth, UnknownObjectException, GithubException
 from github.Commit import Commit
+from github.PullRequest import PullRequest as GithubPullRequest
 from github.Repository import Repository
+from requests import RequestException
 from typing_extensions import Self
+from urllib3.util.retry import Retry
 
+from diff_parser.repo_commit_change import RepoCommitChange
+from github_util.app_token_provider import AppTokenAuth, AppTokenProvider
+from github_util.commit_range_cache import CommitRangeCache, LINEAR_STATUSES
+from github_util.cost_planner import CostPlanner, RangeEstimate, STRATEGY_AUTO, STRATEGY_COMMIT, STRATEGY_MERGE_WINDOW, \
+    ENDPOINT_COMPARE, ENDPOINT_GIT_COMMIT, ENDPOINT_REPO, ENDPOINT_SEARCH_ISSUES, ENDPOINT_TAG_REF, ENDPOINT_WRITE_TAG_REF
+from github_util.deadline import Deadline, RequestFailedError
+from github_util.github_rest_client import GitHubRestClient
 from github_util.pull_request import PullRequest
 
 logger = logging.getLogger(__name__)
 
+# number of pull requests per page when listing them
+_PAGE_SIZE = 100
+# pull requests are only updated after they are merged, but allow for clock skew between git and GitHub
+_MERGE_WINDOW_MARGIN = timedelta(hours=1)
+# retries of a failed request to GitHub, instead of the 10 retries and rate limit waits PyGithub makes by default
+_RETRIES = 2
+# statuses of a lookup for a repository, commit or range which does not exist, which retrying would not change
+_NOT_FOUND_STATUSES = (404, 422)
+
+
+@dataclass
+class _MergeWindow:
+    """Represents the closed pull requests of a repository listed so far, most recently updated first."""
+
+    pulls: Iterator[tuple[int, GithubPullRequest]]
+    # pull request of each merge commit listed so far
+    merged: dict[str, PullRequest] = field(default_factory=dict)
+    # update time of the last pull request listed
+    listed_until: Optional[datetime] = None
+    exhausted: bool = False
+
 
 class GitHubUtil:
     """Provides functionality for interfacing with GitHub repositories."""
@@ -30,20 +64,59 @@ class GitHubUtil:
             logger.warning(f'unable to find repo commit: {repo}:{commit} error:{e}')
             return None
 
-    def __init__(self: Self, access_token: str, organization_name: str, github_session: Github = None) -> None:
+    def __init__(self: Self, access_token: str, organization_name: str, github_session: Github = None,
+                 request_timeout: Optional[int] = None, deadline: Optional[Deadline] = None,
+                 strategy: str = STRATEGY_COMMIT, rest_client: Optional[GitHubRestClient] = None,
+                 token_provider: Optional[AppTokenProvider] = None) -> None:
         """
         Initialize the GitHub utility.
 
+        When no session is injected, a lean REST client is also created to compare refs and to list the pull
+        requests of commits, so that repositories and commits do not have to be loaded for those calls. Both use
+        the installation tokens of the token provider when one is given, instead of the access token. Failed
+        requests are retried a bounded number of times. The lean client caps the timeout of each request at the time
+        left before the deadline. PyGithub does not allow a timeout per request, so its timeout is capped once at the
+        deadline when the session is created, and a request with its retries can take up to three timeouts.
+
         :param access_token: GitHub personal access token
         :param organization_name: Name of the GitHub organization
         :param github_session: authenticated session to GitHub
+        :param request_timeout: timeout in seconds for each request to GitHub
+        :param deadline: overall time budget for resolving pull requests
+        :param strategy: how to find the pull requests of a range, per merge commit or by listing merged pull requests
+        :param rest_client: Optionally inject a lean REST client
+        :param token_provider: Optionally authenticate as a GitHub App installation
         """
+        self.deadline = deadline or Deadline()
         if not github_session:
-            logger.info('logging in to GitHub using access token')
-            self.github_session = Github(auth=Auth.Token(access_token))
+            logger.info(f'logging in to GitHub using {"GitHub App" if token_provider else "access token"}')
+            timeout = self.deadline.get_timeout(request_timeout)
+            options = {'timeout': math.ceil(timeout)} if timeout else {}
+            options['per_page'] = _PAGE_SIZE
+            # a bounded retry without waiting for the rate limit to reset, so a slow endpoint can not outlast the deadline
+            # by more than the retries of one request
+            options['retry'] = Retry(total=_RETRIES, backoff_factor=0.5, status_forcelist=(500, 502, 503, 504))
+            auth = AppTokenAuth(token_provider) if token_provider else Auth.Token(access_token)
+            self.github_session = Github(auth=auth, **options)
+            rest_client = rest_client or GitHubRestClient(access_token, request_timeout=request_timeout,
+                                                          token_provider=token_provider, deadline=self.deadline)
         else:
             self.github_session = github_session
 
+        self.rest_client = rest_client
+        self.organization_name = organization_name
+        self.strategy = strategy
+        self.cost_planner = CostPlanner(lean_client=bool(rest_client), page_size=_PAGE_SIZE)
+        self.api_calls = 0
+        self._search_calls = 0
+        self._planned_repos: set[str] = set()
+        self._repos: dict[str, Optional[Repository]] = {}
+        self._commit_ranges = CommitRangeCache()
+        self._commit_pull_requests: dict[tuple[str, str], list[PullRequest]] = {}
+        self._range_pull_requests: dict[tuple[str, str, str], list[PullRequest]] = {}
+        self._commit_dates: dict[tuple[str, str], Optional[datetime]] = {}
+        self._merge_windows: dict[str, _MergeWindow] = {}
+
         logger.info(f'getting GitHub organization: {organization_name}')
         self.organization = self.github_session.get_organization(organization_name)
 
@@ -54,82 +127,515 @@ class GitHubUtil:
         :param repo_name: name of the repository
         :return: GitHub repository
         """
+        if repo_name in self._repos:
+            return self._repos[repo_name]
+
+        self.api_calls += 1
         try:
-            return self.organization.get_repo(repo_name)
+            repo = self.organization.get_repo(repo_name)
         except (UnknownObjectException, GithubException) as e:
             logger.warning(f'unable to find repository: {repo_name} error:{e}')
-            return None
+            repo = None
+        self._repos[repo_name] = repo
+        return repo
+
+    def get_compare_url(self: Self, repo_name: str, base: str, head: str) -> str:
+        """
+        Get the URL of the GitHub page comparing two git refs, without calling the API.
+
+        :param repo_name: name of the repository
+        :param base: base ref to compare from
+        :param head: head ref to compare to
+        :return: compare URL
+        """
+        return f'{self.organization.html_url}/{repo_name}/compare/{base}...{head}'
 
     def get_pull_requests_between_refs(self: Self, repo_name: str, base: str, head: str) -> list[PullRequest]:
         """
         Compare two git refs and get a list of pull requests between them.
 
+        The pull requests of each range are kept, so an identical range, for example the same service in several
+        files, is only resolved once. With the auto strategy the range is compared first, and the cheapest strategy
+        is chosen from the number of merge commits and what is already cached. The estimated and actual API calls
+        are logged.
+
         :param repo_name: name of the repository
         :param base: base ref to compare from
         :param head: head ref to compare to
+        :raises DeadlineExceededError: if the deadline passes before the pull requests are resolved
+        :raises RequestFailedError: if a request times out, can not connect, is rate limited or fails on the server
         :return: list of pull requests
         """
-        repo = self.get_repo(repo_name)
-        if not repo:
+        commit_range = (repo_name, base, head)
+        if commit_range in self._range_pull_requests:
+            logger.info(f'using pull requests already resolved for {base}...{head} in repo:{repo_name}')
+            return self._range_pull_requests[commit_range]
+
+        self.deadline.check()
+        try:
+            pull_requests = self._resolve_pull_requests_between_refs(repo_name, base, head)
+        except RequestException as e:
+            raise RequestFailedError(f'request to GitHub for repo:{repo_name} failed: {e}') from e
+
+        self._range_pull_requests[commit_range] = pull_requests
+        return pull_requests
+
+    def _resolve_pull_requests_between_refs(self: Self, repo_name: str, base: str, head: str) -> list[PullRequest]:
+        """
+        Get the pull requests between two git refs with the configured strategy, or the cheapest one with auto.
+
+        :param repo_name: name of the repository
+        :param base: base ref to compare from
+        :param head: head ref to compare to
+        :return: list of pull requests
+        """
+        if not self.rest_client and not self.get_repo(repo_name):
             return []
 
-        pull_requests: list[PullRequest] = []
+        if self.strategy != STRATEGY_AUTO:
+            return self._get_pull_requests_with_strategy(repo_name, base, head, self.strategy)
+
+        strategy, estimated_calls = self.cost_planner.choose(self._estimate_range(repo_name, base, head, count=True),
+                                                             self._get_known_rate_limit_remaining())
+        api_calls = self.api_calls
+        try:
+            return self._get_pull_requests_with_strategy(repo_name, base, head, strategy)
+        finally:
+            logger.info(f'resolved {base}...{head} in repo:{repo_name} using {strategy}: '
+                        f'estimated {estimated_calls} API calls, made {self.api_calls - api_calls}')
+
+    def plan_pull_requests_between_refs(self: Self, repo_name: str, base: str, head: str) -> tuple[str, dict[str, int]]:
+        """
+        Estimate the API calls to get the pull requests between two git refs, without looking them up.
+
+        Only the refs are compared to count the merge commits, and the compare calls are included in the estimate.
+
+        :param repo_name: name of the repository
+        :param base: base ref to compare from
+        :param head: head ref to compare to
+        :return: strategy which would be used and the estimated API calls to each endpoint
+        """
+        api_calls = self.api_calls
+        search_calls = self._search_calls
+        repo_loaded = repo_name in self._repos
+        base_date_loaded = (repo_name, base) in self._commit_dates
+        range_estimate = self._estimate_range(repo_name, base, head, count=self.strategy != STRATEGY_COMMIT)
+        strategy = self.strategy
+        if strategy == STRATEGY_AUTO:
+            strategy = self.cost_planner.choose(range_estimate, self._get_known_rate_limit_remaining())[0]
+
+        # without the lean REST client the repository is loaded to compare the refs, and to count pull requests
+        endpoints = {
+            ENDPOINT_REPO: 1 if not repo_loaded and repo_name in self._repos else 0,
+            ENDPOINT_GIT_COMMIT: 1 if not base_date_loaded and (repo_name, base) in self._commit_dates else 0,
+            ENDPOINT_SEARCH_ISSUES: self._search_calls - search_calls
+        }
+        endpoints[ENDPOINT_COMPARE] = self.api_calls - api_calls - sum(endpoints.values())
+        for endpoint, calls in self.cost_planner.estimate_endpoints(range_estimate).get(strategy, {}).items():
+            endpoints[endpoint] = endpoints.get(endpoint, 0) + calls
+        return strategy, {endpoint: calls for endpoint, calls in endpoints.items() if calls}
+
+    def plan_tag_commit(self: Self, repo_name: str) -> dict[str, int]:
+        """
+        Estimate the API calls to tag a commit in a repository, without tagging it.
+
+        :param repo_name: name of the repository
+        :return: estimated API calls to each endpoint
+        """
+        endpoints = {ENDPOINT_TAG_REF: 1, ENDPOINT_WRITE_TAG_REF: 1}
+        if repo_name not in self._repos and repo_name not in self._planned_repos:
+            self._planned_repos.add(repo_name)
+            endpoints[ENDPOINT_REPO] = 1
+        return endpoints
+
+    def get_rate_limit_remaining(self: Self) -> Optional[int]:
+        """
+        Get the API calls left in the current rate limit window, checking the rate limit does not count against it.
+
+        :return: API calls left, or None if the rate limit can not be read
+        """
+        remaining = self._get_known_rate_limit_remaining()
+        if remaining is not None:
+            return remaining
+        try:
+            return self.github_session.get_rate_limit().core.remaining
+        except GithubException as e:
+            logger.warning(f'unable to get the rate limit error:{e}')
+            return None
+
+    def _get_known_rate_limit_remaining(self: Self) -> Optional[int]:
+        """
+        Get the API calls left in the current rate limit window reported by the last response, without a request.
+
+        :return: API calls left, or None if no response reported it yet
+        """
+        return self.rest_client.rate_limit_remaining if self.rest_client else None
+
+    def _estimate_range(self: Self, repo_name: str, base: str, head: str, count: bool = False) -> RangeEstimate:
+        """
+        Compare two git refs and collect what is known about the range to estimate the cost of the strategies.
+
+        :param repo_name: name of the repository
+        :param base: base ref to compare from
+        :param head: head ref to compare to
+        :param count: count the pull requests the merge window would list, when it might be cheaper
+        :return: what is known about the range
+        """
+        merge_commits = self._get_merge_commit_hashes(repo_name, base, head)
+        range_estimate = RangeEstimate(
+            merge_commits=len(merge_commits),
+            uncached_merge_commits=len([
+                commit for commit in merge_commits if (repo_name, commit) not in self._commit_pull_requests
+            ]),
+            repo_cached=repo_name in self._repos,
+            base_date_cached=(repo_name, base) in self._commit_dates
+        )
+        if count and (self.strategy == STRATEGY_MERGE_WINDOW or self.cost_planner.is_worth_counting(range_estimate)):
+            range_estimate.updated_pull_requests = self._count_updated_pull_requests(repo_name, base)
+            range_estimate.repo_cached = repo_name in self._repos
+            range_estimate.base_date_cached = (repo_name, base) in self._commit_dates
+        return range_estimate
+
+    def _count_updated_pull_requests(self: Self, repo_name: str, base: str) -> Optional[int]:
+        """
+        Count the closed pull requests into the default branch updated since the base commit with one search.
+
+        These are the pull requests the merge window lists, so they give the number of pages it costs.
+
+        :param repo_name: name of the repository
+        :param base: base ref of the range
+        :return: number of pull requests, or None if they can not be counted
+        """
+        repo = self.get_repo(repo_name)
+        base_date = self._get_commit_date(repo, base) if repo else None
+        if not base_date:
+            return None
+
+        self.deadline.check()
+        self.api_calls += 1
+        self._search_calls += 1
+        since = (base_date - _MERGE_WINDOW_MARGIN).astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+        query = f'repo:{repo.full_name} is:pr is:closed base:{repo.default_branch} updated:>={since}'
+        try:
+            count = self.github_session.search_issues(query).totalCount
+        except GithubException as e:
+            logger.warning(f'unable to count the pull requests updated since {since} in repo:{repo_name} error:{e}')
+            return None
+        logger.info(f'{count} pull requests into {repo.default_branch} were updated since {since} in repo:{repo_name}')
+        return count
+
+    def _get_pull_requests_with_strategy(self: Self, repo_name: str, base: str, head: str,
+                                         strategy: str) -> list[PullRequest]:
+        """
+        Get the pull requests between two git refs using a strategy.
+
+        :param repo_name: name of the repository
+        :param base: base ref to compare from
+        :param head: head ref to compare to
+        :param strategy: how to find the pull requests, per merge commit or by listing merged pull requests
+        :return: list of pull requests
+        """
+        if strategy == STRATEGY_MERGE_WINDOW:
+            pull_requests = self._get_pull_requests_by_merge_window(repo_name, base, head)
+            if pull_requests is not None:
+                return pull_requests
+
+        pull_requests = []
 
-        for commit in self._compare_and_get_merge_commit_hashes(repo, base, head):
-            for pull_request in self._get_pull_requests_for_commit(repo, commit):
+        for commit in self._get_merge_commit_hashes(repo_name, base, head):
+            for pull_request in self._get_pull_requests_for_commit(repo_name, commit):
                 if pull_request not in pull_requests:
                     pull_requests.append(pull_request)
 
         return pull_requests
 
-    def _get_pull_requests_for_commit(self: Self, repo: Repository, commit: str) -> list[PullRequest]:
+    def get_pull_requests_for_changes(self: Self, changes: list[RepoCommitChange]) -> list[list[PullRequest]]:
         """
-        Get pull requests associated with a commit.
+        Get the pull requests for many repository changes at once.
+
+        Identical ranges are only resolved once and the ranges are grouped by repository, so that repositories
+        and merge commits shared between the changes are only looked up once.
+
+        :param changes: list of repository commit changes
+        :return: list of pull requests for each change, in the same order as the changes
+        """
+        ranges = sorted({(change.repository, change.old_commit, change.new_commit) for change in changes})
+        logger.info(f'resolving {len(ranges)} unique ranges for {len(changes)} changes')
+
+        pull_requests = {commit_range: self.get_pull_requests_between_refs(*commit_range) for commit_range in ranges}
+        return [pull_requests[(change.repository, change.old_commit, change.new_commit)] for change in changes]
+
+    def _get_pull_requests_by_merge_window(self: Self, repo_name: str, base: str,
+                                           head: str) -> Optional[list[PullRequest]]:
+        """
+        Get the pull requests between two git refs by listing the pull requests merged into the default branch.
+
+        The closed pull requests are listed once per repository, most recently updated first, until they were last
+        updated before the base commit, and matched locally against the merge commits of the range. This costs one
+        call per page instead of two calls per merge commit. Listing stops early once every merge commit is matched,
+        and a later range of the same repository continues where the listing stopped. Merge commits which are not
+        matched, for example merged into a release branch, are looked up per commit.
+
+        :param repo_name: name of the repository
+        :param base: base ref to compare from
+        :param head: head ref to compare to
+        :raises RequestFailedError: if listing the pull requests is rate limited or fails on the server
+        :return: list of pull requests, or None if the merge window can not be determined
+        """
+        merge_commits = self._get_merge_commit_hashes(repo_name, base, head)
+        if not merge_commits:
+            return []
+
+        repo = self.get_repo(repo_name)
+        if not repo:
+            return None
+
+        base_date = self._get_commit_date(repo, base)
+        if not base_date:
+            return None
+
+        window = self._merge_windows.get(repo_name)
+        if not window:
+            pulls = repo.get_pulls(state='closed', sort='updated', direction='desc', base=repo.default_branch)
+            window = self._merge_windows[repo_name] = _MergeWindow(pulls=enumerate(pulls))
+        since = base_date - _MERGE_WINDOW_MARGIN
+        remaining = set(merge_commits) - window.merged.keys()
+        if remaining:
+            logger.info(f'listing pull requests merged into {repo.default_branch} since {base_date} in repo:{repo.name}')
+        while remaining and not window.exhausted and (window.listed_until is None or window.listed_until >= since):
+            self.deadline.check()
+            try:
+                index, pr = next(window.pulls)
+            except StopIteration:
+                window.exhausted = True
+                break
+            except GithubException as e:
+                del self._merge_windows[repo_name]
+                if e.status in _NOT_FOUND_STATUSES:
+                    logger.warning(f'unable to list pull requests in repo:{repo.name} error:{e}')
+                    return None
+                raise RequestFailedError(f'listing pull requests in repo:{repo.name} failed: {e}') from e
+            if index % _PAGE_SIZE == 0:
+                self.api_calls += 1
+            window.listed_until = pr.updated_at
+            if pr.merge_commit_sha:
+                window.merged[pr.merge_commit_sha] = PullRequest(title=pr.title, number=pr.number, url=pr.html_url)
+                remaining.discard(pr.merge_commit_sha)
+
+        found: dict[str, PullRequest] = {}
+        for commit in merge_commits:
+            if commit in window.merged:
+                found[commit] = window.merged[commit]
+                logger.info(f'found pull request: {repo.name} - #{found[commit].number} {found[commit].title}')
+                self._commit_pull_requests[(repo_name, commit)] = [found[commit]]
+
+        remaining = set(merge_commits) - found.keys()
+        if remaining:
+            logger.warning(f'{len(remaining)} merge commits were not merged into {repo.default_branch} within the '
+                           f'window, looking up their pull requests per commit in repo:{repo.name}')
+
+        pull_requests: list[PullRequest] = []
+        for commit in merge_commits:
+            commit_pull_requests = [found[commit]] if commit in found else self._get_pull_requests_for_commit(repo_name, commit)
+            pull_requests.extend(pull_request for pull_request in commit_pull_requests if pull_request not in pull_requests)
+        return pull_requests
+
+    def _get_commit_date(self: Self, repo: Repository, commit: str) -> Optional[datetime]:
+        """
+        Get the committer date of a commit using the git data API, which does not load the changed files.
 
         :param repo: GitHub repository
+        :param commit: commit hash
+        :return: committer date, or None if the commit can not be found
+        """
+        commit_key = (repo.name, commit)
+        if commit_key not in self._commit_dates:
+            self.deadline.check()
+            self.api_calls += 1
+            try:
+                self._commit_dates[commit_key] = repo.get_git_commit(commit).committer.date
+            except (UnknownObjectException, GithubException) as e:
+                logger.warning(f'unable to find git commit: {repo.name}:{commit} error:{e}')
+                self._commit_dates[commit_key] = None
+        return self._commit_dates[commit_key]
+
+    def _get_merge_commit_hashes(self: Self, repo_name: str, base: str, head: str) -> list[str]:
+        """
+        Get the merge commit hashes between two git refs, reusing cached ranges where possible.
+
+        When cached ranges chain from base to head no API call is made. When a cached chain only covers the start
+        or the end of the range, only the missing piece is compared and the two are joined if it is linear. The start
+        is preferred, and when the missing piece is not linear the whole range is compared, so at most two compare
+        calls are made.
+
+        :param repo_name: name of the repository
+        :param base: base ref to compare from
+        :param head: head ref to compare to
+        :return: list of git commit hashes
+        """
+        if not base or not head:
+            return []
+
+        merge_commits = self._commit_ranges.get(repo_name, base, head)
+        if merge_commits is not None:
+            logger.info(f'found {len(merge_commits)} cached merge commits between {base} and {head} in {repo_name}')
+            return merge_commits
+
+        composed = None
+        prefix = self._commit_ranges.get_longest_prefix(repo_name, base)
+        suffix = None if prefix else self._commit_ranges.get_longest_suffix(repo_name, head)
+        if prefix:
+            ref, prefix_commits = prefix
+            status, missing_commits = self._compare_and_cache(repo_name, ref, head)
+            composed = prefix_commits + missing_commits if status in LINEAR_STATUSES else None
+        elif suffix:
+            ref, suffix_commits = suffix
+            status, missing_commits = self._compare_and_cache(repo_name, base, ref)
+            composed = missing_commits + suffix_commits if status in LINEAR_STATUSES else None
+        if composed is not None:
+            return self._cache_composed_range(repo_name, base, head, composed)
+
+        return self._compare_and_cache(repo_name, base, head)[1]
+
+    def _compare_and_cache(self: Self, repo_name: str, base: str, head: str) -> tuple[Optional[str], list[str]]:
+        """
+        Compare two git refs and add the result to the range cache.
+
+        :param repo_name: name of the repository
+        :param base: base ref to compare from
+        :param head: head ref to compare to
+        :return: compare status and list of git commit hashes
+        """
+        self.deadline.check()
+        if self.rest_client:
+            status, merge_commits = self._compare_with_rest_client(repo_name, base, head)
+        else:
+            self.api_calls += 1
+            status, merge_commits = self._compare_and_get_merge_commit_hashes(self.get_repo(repo_name), base, head)
+        if status:
+            self._commit_ranges.put(repo_name, base, head, status, merge_commits)
+        return status, merge_commits
+
+    def _compare_with_rest_client(self: Self, repo_name: str, base: str, head: str) -> tuple[Optional[str], list[str]]:
+        """
+        Compare two git refs with the lean REST client and get a list of merge commit hashes between them.
+
+        :param repo_name: name of the repository
+        :param base: base ref to compare from
+        :param head: head ref to compare to
+        :return: compare status (None if the compare failed) and list of git commit hashes
+        """
+        logger.info(f'Comparing {base} and {head} for repo:{repo_name}')
+        request_count = self.rest_client.request_count
+        try:
+            status, commits = self.rest_client.compare(self.organization_name, repo_name, base, head)
+        except RequestException as e:
+            if not self._is_not_found(e):
+                raise
+            logger.warning(f'unable to compare {base} and {head} in repo:{repo_name} error:{e}')
+            return None, []
+        finally:
+            self.api_calls += self.rest_client.request_count - request_count
+        logger.info(f'found {len(commits)} merge commits between {base} and {head} in {repo_name}')
+        return status, commits
+
+    @staticmethod
+    def _is_not_found(error: RequestException) -> bool:
+        """
+        Check if a request of the lean REST client failed because what it looked up does not exist.
+
+        Other errors, such as timeouts, rate limits and server errors, may pass and are not treated as an empty
+        result.
+
+        :param error: error of the request
+        :return: True if the repository, commit or range was not found
+        """
+        return error.response is not None and error.response.status_code in _NOT_FOUND_STATUSES
+
+    def _cache_composed_range(self: Self, repo_name: str, base: str, head: str, merge_commits: list[str]) -> list[str]:
+        """
+        Add a range built from cached ranges to the range cache.
+
+        :param repo_name: name of the repository
+        :param base: base ref of the range
+        :param head: head ref of the range
+        :param merge_commits: merge commit hashes of the range, oldest first
+        :return: list of git commit hashes
+        """
+        merge_commits = list(dict.fromkeys(merge_commits))
+        logger.info(f'composed {len(merge_commits)} merge commits between {base} and {head} in {repo_name} '
+                    'from cached ranges')
+        self._commit_ranges.put(repo_name, base, head, LINEAR_STATUSES[0], merge_commits)
+        return merge_commits
+
+    def _get_pull_requests_for_commit(self: Self, repo_name: str, commit: str) -> list[PullRequest]:
+        """
+        Get pull requests associated with a commit.
+
+        :param repo_name: name of the repository
         :param commit: commit to find pull requests for
+        :raises DeadlineExceededError: if the deadline has passed
         :return: list of pull requests
         """
-        logger.info(f'getting pull requests for commit:{commit} in repo:{repo.name}')
-        commit = self.get_repo_commit(repo, commit)
-        if not commit:
-            return []
+        commit_key = (repo_name, commit)
+        if commit_key in self._commit_pull_requests:
+            return self._commit_pull_requests[commit_key]
 
-        pull_requests = []
-        for pr in commit.get_pulls():
-            logger.info(f'found pull request: {repo.name} - #{pr.number} {pr.title}')
-            pull_requests.append(PullRequest(title=pr.title, number=pr.number, url=pr.html_url))
+        self.deadline.check()
+        logger.info(f'getting pull requests for commit:{commit} in repo:{repo_name}')
+        if self.rest_client:
+            request_count = self.rest_client.request_count
+            try:
+                pull_requests = self.rest_client.get_commit_pull_requests(self.organization_name, repo_name, commit)
+            except RequestException as e:
+                if not self._is_not_found(e):
+                    raise
+                logger.warning(f'unable to find repo commit: {repo_name}:{commit} error:{e}')
+                return []
+            finally:
+                self.api_calls += self.rest_client.request_count - request_count
+        else:
+            self.api_calls += 2
+            repo_commit = self.get_repo_commit(self.get_repo(repo_name), commit)
+            if not repo_commit:
+                return []
+            pull_requests = [
+                PullRequest(title=pr.title, number=pr.number, url=pr.html_url) for pr in repo_commit.get_pulls()
+            ]
+
+        for pull_request in pull_requests:
+            logger.info(f'found pull request: {repo_name} - #{pull_request.number} {pull_request.title}')
+        self._commit_pull_requests[commit_key] = pull_requests
         return pull_requests
 
-    def tag_commit(self: Self, repo_name: str, commit: str, tag: str) -> None:
+    def tag_commit(self: Self, repo_name: str, commit: str, tag: str) -> bool:
         """
         Tag a commit in a repository.
 
         :param repo_name: name of the repository
         :param commit: commit sha
         :param tag: name of the tag to apply to the commit
+        :return: true or false if the commit was tagged successfully
         """
         logger.info(f'tagging commit:{commit} in repo:{repo_name} with tag:{tag}')
         repo = self.get_repo(repo_name)
         if not repo:
-            return
+            return False
 
-        if not self._update_git_tag(repo, commit, tag):
-            self._create_git_tag(repo, commit, tag)
+        return self._update_git_tag(repo, commit, tag) or self._create_git_tag(repo, commit, tag)
 
     @staticmethod
-    def _compare_and_get_merge_commit_hashes(repo: Repository, base: str, head: str) -> list[str]:
+    def _compare_and_get_merge_commit_hashes(repo: Repository, base: str, head: str) -> tuple[Optional[str], list[str]]:
         """
         Compare two git refs and get a list of merge commit hashes between them.
 
         :param repo: GitHub repository
         :param base: base ref to compare from
         :param head: head ref to compare to
-        :return: list of git commit hashes
+        :return: compare status (None if the compare failed) and list of git commit hashes
         """
-        commits = []
         if not base or not head:
-            return commits
+            return None, []
         logger.info(f'Comparing {base} and {head} for repo:{repo.name}')
         try:
             comparison = repo.compare(base, head)
@@ -137,7 +643,8 @@ class GitHubUtil:
             logger.info(f'found {len(commits)} merge commits between {base} and {head} in {repo.name}')
         except (UnknownObjectException, GithubException) as e:
             logger.debug(f'compare failed with error:{e}')
-        return commits
+            return None, []
+        return comparison.status, commits
 
     @staticmethod
     def _update_git_tag(repo: Repository, commit: str, tag: str) -> bool:
@@ -1,11 +1,22 @@
 """Represents a pull request."""
 from dataclasses import dataclass
+from typing import Any
 
+from typing_extensions import Self
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class PullRequest:
-    """Represents a pull request."""
+    """Represents a pull request. The record is slotted and frozen, so it has no per instance dict and can be hashed."""
 
     title: str
     number: int
     url: str
+
+    def __reduce__(self: Self) -> tuple[Any, ...]:
+        """
+        Pickle the pull request as its field values only.
+
+        :return: class and field values
+        """
+        return PullRequest, (self.title, self.number, self.url)
@@ -0,0 +1,161 @@
+"""Provides tests for the GitHub App token provider."""
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from unittest.mock import MagicMock
+
+import jwt
+import requests
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from typing_extensions import Self
+
+from github_util.app_token_provider import AppTokenAuth, AppTokenProvider
+from github_util.github_rest_client import GitHubRestClient
+
+_PRIVATE_KEY = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+class _TokenEndpointHandler(BaseHTTPRequestHandler):
+    """Stands in for the GitHub endpoints which create installation tokens."""
+
+    protocol_version = 'HTTP/1.1'
+    expires_at = '2024-01-01T01:00:00Z'
+    requests: list[tuple[str, str, dict[str, Any]]] = []
+
+    def create_token(self: Self) -> None:
+        """Verify the JWT of the app and respond with a new installation token."""
+        if not self._verify():
+            return
+        token_number = len([request for request in self.requests if request[0] == 'POST']) - 1
+        self._send(201, {'token': f'ghs_token{token_number}', 'expires_at': self.expires_at})
+
+    def get_installation(self: Self) -> None:
+        """Verify the JWT of the app and respond with its installation in the organization."""
+        if self._verify():
+            self._send(200, {'id': 42} if self.path == '/orgs/test-org/installation' else {'message': 'Not Found'})
+
+    def _verify(self: Self) -> dict[str, Any]:
+        """Verify the JWT of the app, responding with 401 if it is not valid."""
+        try:
+            claims = jwt.decode(self.headers['Authorization'].removeprefix('Bearer '), _PRIVATE_KEY.public_key(),
+                                algorithms=['RS256'], options={'verify_exp': False, 'verify_iat': False})
+        except jwt.InvalidTokenError:
+            self._send(401, {'message': 'Bad credentials'})
+            return {}
+        self.requests.append((self.command, self.path, claims))
+        return claims
+
+    def _send(self: Self, status: int, content: dict[str, Any]) -> None:
+        """Send a JSON response."""
+        body = json.dumps(content).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self: Self, *_: Any) -> None:
+        """Do not log the requests."""
+
+
+# BaseHTTPRequestHandler dispatches requests to do_<method>
+setattr(_TokenEndpointHandler, 'do_POST', _TokenEndpointHandler.create_token)
+setattr(_TokenEndpointHandler, 'do_GET', _TokenEndpointHandler.get_installation)
+
+
+class TestAppTokenProvider(unittest.TestCase):
+    """Provides tests for the GitHub App token provider."""
+
+    def setUp(self: Self) -> None:
+        """Start a local server standing in for the GitHub token endpoints."""
+        _TokenEndpointHandler.requests = []
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _TokenEndpointHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        host, port = self.server.server_address[:2]
+        self.base_url = f'http://{host}:{port}'
+        self.clock = MagicMock(return_value=1704067200.0)  # 2024-01-01T00:00:00Z
+        self.private_key = _PRIVATE_KEY.private_bytes(encoding=serialization.Encoding.PEM,
+                                                      format=serialization.PrivateFormat.PKCS8,
+                                                      encryption_algorithm=serialization.NoEncryption()).decode()
+
+    def tearDown(self: Self) -> None:
+        """Stop the local server."""
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _get_token_provider(self: Self, **kwargs: Any) -> AppTokenProvider:
+        """
+        Get a token provider using the local server.
+
+        :param kwargs: arguments to override
+        :return: AppTokenProvider
+        """
+        arguments = {
+            'app_id': '123',
+            'private_key': self.private_key,
+            'installation_id': '42',
+            'base_url': self.base_url,
+            'request_timeout': 5,
+            'clock': self.clock
+        }
+        return AppTokenProvider(**{**arguments, **kwargs})
+
+    def test_get_token(self: Self) -> None:
+        """The JWT of the app should be exchanged for an installation token."""
+        self.assertEqual('ghs_token0', self._get_token_provider().get_token())
+
+        method, path, claims = _TokenEndpointHandler.requests[0]
+        self.assertEqual(('POST', '/app/installations/42/access_tokens'), (method, path))
+        self.assertEqual({'iat': 1704067140, 'exp': 1704067740, 'iss': '123'}, claims)
+
+    def test_get_token_is_cached(self: Self) -> None:
+        """The token should be reused until it is about to expire."""
+        token_provider = self._get_token_provider()
+
+        self.assertEqual('ghs_token0', token_provider.get_token())
+        self.clock.return_value += 3000
+        self.assertEqual('ghs_token0', token_provider.get_token())
+        self.assertEqual(1, token_provider.exchange_count)
+
+        self.clock.return_value += 400
+        self.assertEqual('ghs_token1', token_provider.get_token())
+        self.assertEqual(2, token_provider.exchange_count)
+
+    def test_get_token_with_installation_lookup(self: Self) -> None:
+        """The installation should be looked up from the organization once when its ID is not provided."""
+        token_provider = self._get_token_provider(installation_id=None, organization_name='test-org')
+
+        self.assertEqual('ghs_token0', token_provider.get_token())
+        self.assertEqual('42', token_provider.installation_id)
+        self.assertEqual([('GET', '/orgs/test-org/installation'), ('POST', '/app/installations/42/access_tokens')],
+                         [request[:2] for request in _TokenEndpointHandler.requests])
+
+    def test_get_token_with_invalid_key(self: Self) -> None:
+        """A JWT which is not signed by the key of the app should be rejected."""
+        other_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        token_provider = self._get_token_provider(private_key=other_key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.NoEncryption()
+        ).decode())
+
+        with self.assertRaises(requests.HTTPError):
+            token_provider.get_token()
+
+    def test_token_is_shared(self: Self) -> None:
+        """The PyGithub auth and the lean REST client should share the cached installation token."""
+        token_provider = self._get_token_provider()
+        session = MagicMock()
+        rest_client = GitHubRestClient('', session=session, token_provider=token_provider)
+        session.get.return_value.raw.tell.return_value = 2
+        session.get.return_value.links = {}
+        session.get.return_value.json.return_value = []
+
+        self.assertEqual('token ghs_token0', f'{AppTokenAuth(token_provider).token_type} '
+                                             f'{AppTokenAuth(token_provider).token}')
+        rest_client.get_commit_pull_requests('test-org', 'test-repo-1', 'm1')
+        self.assertEqual({'Authorization': 'Bearer ghs_token0'}, session.get.call_args.kwargs['headers'])
+        self.assertEqual(1, token_provider.exchange_count)
@@ -0,0 +1,42 @@
+"""Provides tests for the CommitRangeCache."""
+import unittest
+
+from typing_extensions import Self
+
+from github_util.commit_range_cache import CommitRangeCache
+
+
+class TestCommitRangeCache(unittest.TestCase):
+    """Provides tests for the CommitRangeCache."""
+
+    def setUp(self: Self) -> None:
+        """Set up a cache with a chain of ranges A..B..C and a diverged range C..X."""
+        self.cache = CommitRangeCache()
+        self.cache.put('repo', 'A', 'B', 'ahead', ['m1', 'm2'])
+        self.cache.put('repo', 'B', 'C', 'ahead', ['m3'])
+        self.cache.put('repo', 'C', 'X', 'diverged', ['m9'])
+
+    def test_get_with_exact_range(self: Self) -> None:
+        """An exact range should be returned whatever its status is."""
+        self.assertEqual(['m1', 'm2'], self.cache.get('repo', 'A', 'B'))
+        self.assertEqual(['m9'], self.cache.get('repo', 'C', 'X'))
+
+    def test_get_with_chained_ranges(self: Self) -> None:
+        """A range should be composed from linear ranges which chain together."""
+        self.assertEqual(['m1', 'm2', 'm3'], self.cache.get('repo', 'A', 'C'))
+
+    def test_get_with_missing_range(self: Self) -> None:
+        """Ranges which can not be composed from linear ranges should not be returned."""
+        self.assertIsNone(self.cache.get('repo', 'A', 'X'))
+        self.assertIsNone(self.cache.get('repo', 'C', 'A'))
+        self.assertIsNone(self.cache.get('other-repo', 'A', 'B'))
+
+    def test_get_longest_prefix(self: Self) -> None:
+        """The chain starting at base with the most merge commits should be returned."""
+        self.assertEqual(('C', ['m1', 'm2', 'm3']), self.cache.get_longest_prefix('repo', 'A'))
+        self.assertIsNone(self.cache.get_longest_prefix('repo', 'C'))
+
+    def test_get_longest_suffix(self: Self) -> None:
+        """The chain ending at head with the most merge commits should be returned."""
+        self.assertEqual(('A', ['m1', 'm2', 'm3']), self.cache.get_longest_suffix('repo', 'C'))
+        self.assertIsNone(self.cache.get_longest_suffix('repo', 'X'))
@@ -0,0 +1,61 @@
+"""Provides tests for the CostPlanner."""
+import unittest
+
+from typing_extensions import Self
+
+from github_util.cost_planner import CostPlanner, RangeEstimate, STRATEGY_COMMIT, STRATEGY_MERGE_WINDOW, \
+    ENDPOINT_COMMIT, ENDPOINT_COMMIT_PULLS, ENDPOINT_GIT_COMMIT, ENDPOINT_PULLS
+
+
+class TestCostPlanner(unittest.TestCase):
+    """Provides tests for the CostPlanner."""
+
+    def test_estimate(self: Self) -> None:
+        """The cost of each strategy should be estimated from the merge commits and the cache."""
+        planner = CostPlanner(lean_client=False, page_size=100)
+        estimate = RangeEstimate(merge_commits=120, uncached_merge_commits=100, repo_cached=True,
+                                 base_date_cached=False, updated_pull_requests=180)
+        self.assertEqual({STRATEGY_COMMIT: 200, STRATEGY_MERGE_WINDOW: 3}, planner.estimate(estimate))
+        self.assertEqual(
+            {
+                STRATEGY_COMMIT: {ENDPOINT_COMMIT: 100, ENDPOINT_COMMIT_PULLS: 100},
+                STRATEGY_MERGE_WINDOW: {ENDPOINT_GIT_COMMIT: 1, ENDPOINT_PULLS: 2}
+            },
+            planner.estimate_endpoints(estimate)
+        )
+
+    def test_choose_small_range(self: Self) -> None:
+        """A small range should be resolved per commit."""
+        estimate = RangeEstimate(merge_commits=2, uncached_merge_commits=2, repo_cached=False, base_date_cached=False)
+        self.assertEqual((STRATEGY_COMMIT, 2), CostPlanner().choose(estimate))
+
+    def test_choose_large_range(self: Self) -> None:
+        """A large range should be resolved by listing the merged pull requests."""
+        estimate = RangeEstimate(merge_commits=500, uncached_merge_commits=500, repo_cached=True,
+                                 base_date_cached=True, updated_pull_requests=750)
+        self.assertEqual((STRATEGY_MERGE_WINDOW, 8), CostPlanner().choose(estimate, rate_limit_remaining=100))
+
+    def test_choose_busy_repository(self: Self) -> None:
+        """A range in a repository with many more updated pull requests than merge commits should be resolved per commit."""
+        estimate = RangeEstimate(merge_commits=4, uncached_merge_commits=4, repo_cached=True, base_date_cached=True,
+                                 updated_pull_requests=2000)
+        self.assertEqual((STRATEGY_COMMIT, 4), CostPlanner().choose(estimate))
+
+    def test_choose_without_count(self: Self) -> None:
+        """The merge window should not be chosen before the pull requests it would list are counted."""
+        estimate = RangeEstimate(merge_commits=500, uncached_merge_commits=500, repo_cached=False,
+                                 base_date_cached=False)
+        self.assertEqual({STRATEGY_COMMIT: 500}, CostPlanner().estimate(estimate))
+        self.assertEqual((STRATEGY_COMMIT, 500), CostPlanner().choose(estimate))
+
+    def test_is_worth_counting(self: Self) -> None:
+        """The pull requests should only be counted when the per commit lookups cost more than the least listing."""
+        self.assertFalse(CostPlanner().is_worth_counting(RangeEstimate(4, 4, repo_cached=False, base_date_cached=False)))
+        self.assertTrue(CostPlanner().is_worth_counting(RangeEstimate(5, 5, repo_cached=False, base_date_cached=False)))
+        self.assertTrue(CostPlanner().is_worth_counting(RangeEstimate(3, 3, repo_cached=True, base_date_cached=True)))
+
+    def test_choose_cached_range(self: Self) -> None:
+        """A range whose pull requests are all cached should not cost anything, and prefer per commit lookups."""
+        estimate = RangeEstimate(merge_commits=500, uncached_merge_commits=0, repo_cached=False,
+                                 base_date_cached=False)
+        self.assertEqual((STRATEGY_COMMIT, 0), CostPlanner().choose(estimate))
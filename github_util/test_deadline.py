@@ -0,0 +1,38 @@
+"""Provides tests for the Deadline."""
+import unittest
+from unittest.mock import MagicMock
+
+from typing_extensions import Self
+
+from github_util.deadline import Deadline, DeadlineExceededError
+
+
+class TestDeadline(unittest.TestCase):
+    """Provides tests for the Deadline."""
+
+    def test_deadline_without_limit(self: Self) -> None:
+        """A deadline without a limit should never expire."""
+        deadline = Deadline()
+        self.assertIsNone(deadline.remaining())
+        self.assertFalse(deadline.expired())
+        deadline.check()
+
+    def test_deadline_with_limit(self: Self) -> None:
+        """A deadline should expire once its time budget has run out."""
+        clock = MagicMock(side_effect=[100.0, 110.0, 130.0, 130.0])
+        deadline = Deadline(seconds=20, clock=clock)
+
+        self.assertEqual(10.0, deadline.remaining())
+        self.assertEqual(0.0, deadline.remaining())
+        with self.assertRaises(DeadlineExceededError):
+            deadline.check()
+
+    def test_get_timeout(self: Self) -> None:
+        """The timeout of a request should be capped at the remaining time budget."""
+        clock = MagicMock(side_effect=[100.0, 100.0, 115.0, 115.0])
+        deadline = Deadline(seconds=20, clock=clock)
+
+        self.assertEqual(10, deadline.get_timeout(10))
+        self.assertEqual(5.0, deadline.get_timeout(10))
+        self.assertEqual(5.0, deadline.get_timeout(None))
+        self.assertEqual(10, Deadline().get_timeout(10))
@@ -0,0 +1,124 @@
+"""Provides tests for the lean GitHub REST client."""
+import gzip
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+import requests
+from typing_extensions import Self
+
+from github_util.github_rest_client import GitHubRestClient
+from github_util.pull_request import PullRequest
+
+
+class _GitHubHandler(BaseHTTPRequestHandler):
+    """Serves canned GitHub API responses compressed with gzip."""
+
+    protocol_version = 'HTTP/1.1'
+    responses: dict[str, tuple[Any, str]] = {}
+    requests: list[tuple[str, str]] = []
+    body_bytes = 0
+
+    def serve(self: Self) -> None:
+        """Serve the canned response for the path, or 404."""
+        self.requests.append((self.path, self.headers.get('Authorization')))
+        if self.path not in self.responses:
+            self._send(404, {'message': 'Not Found'}, '')
+            return
+        self._send(200, *self.responses[self.path])
+
+    def _send(self: Self, status: int, content: Any, next_path: str) -> None:
+        """Send a gzip compressed JSON response, with a link to the next page if there is one."""
+        body = gzip.compress(json.dumps(content).encode())
+        type(self).body_bytes += len(body)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('X-RateLimit-Remaining', '4999')
+        if next_path:
+            host, port = self.server.server_address[:2]
+            self.send_header('Link', f'<http://{host}:{port}{next_path}>; rel="next"')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self: Self, *_: Any) -> None:
+        """Do not log the requests."""
+
+
+# BaseHTTPRequestHandler dispatches GET requests to do_GET
+setattr(_GitHubHandler, 'do_GET', _GitHubHandler.serve)
+
+
+class TestGitHubRestClient(unittest.TestCase):
+    """Provides tests for the lean GitHub REST client."""
+
+    def setUp(self: Self) -> None:
+        """Start a local server standing in for the GitHub API."""
+        _GitHubHandler.responses = {}
+        _GitHubHandler.requests = []
+        _GitHubHandler.body_bytes = 0
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _GitHubHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        host, port = self.server.server_address[:2]
+        self.client = GitHubRestClient('test123', base_url=f'http://{host}:{port}/', request_timeout=5)
+
+    def tearDown(self: Self) -> None:
+        """Stop the local server."""
+        self.client.session.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_compare(self: Self) -> None:
+        """The merge commits of every page of the comparison should be returned."""
+        _GitHubHandler.responses = {
+            '/repos/test-org/test-repo-1/compare/abc...def?per_page=100': (
+                {'status': 'ahead', 'commits': [{'sha': 'm1', 'parents': [{}, {}]}, {'sha': 'c1', 'parents': [{}]}]},
+                '/repos/test-org/test-repo-1/compare/abc...def?per_page=100&page=2'
+            ),
+            '/repos/test-org/test-repo-1/compare/abc...def?per_page=100&page=2': (
+                {'status': 'ahead', 'commits': [{'sha': 'm2', 'parents': [{}, {}]}]}, ''
+            )
+        }
+
+        self.assertEqual(('ahead', ['m1', 'm2']), self.client.compare('test-org', 'test-repo-1', 'abc', 'def'))
+        self.assertEqual(2, self.client.request_count)
+        self.assertEqual('Bearer test123', _GitHubHandler.requests[0][1])
+        self.assertEqual(4999, self.client.rate_limit_remaining)
+
+    def test_get_commit_pull_requests(self: Self) -> None:
+        """Only the fields of the pull requests which are needed should be kept."""
+        _GitHubHandler.responses = {
+            '/repos/test-org/test-repo-1/commits/m1/pulls?per_page=100': (
+                [{'title': 'Pull Request 1', 'number': 1, 'html_url': 'https://foo.com/1', 'body': 'x' * 1000}], ''
+            )
+        }
+
+        self.assertEqual([PullRequest(title='Pull Request 1', number=1, url='https://foo.com/1')],
+                         self.client.get_commit_pull_requests('test-org', 'test-repo-1', 'm1'))
+
+    def test_bytes_received(self: Self) -> None:
+        """The compressed bytes received over the wire should be counted."""
+        _GitHubHandler.responses = {
+            '/repos/test-org/test-repo-1/commits/m1/pulls?per_page=100': (
+                [{'title': 'Pull Request 1', 'number': 1, 'html_url': 'https://foo.com/1', 'body': 'x' * 10000}], ''
+            )
+        }
+
+        self.client.get_commit_pull_requests('test-org', 'test-repo-1', 'm1')
+        self.assertEqual(_GitHubHandler.body_bytes, self.client.bytes_received)
+        self.assertLess(self.client.bytes_received, 1000)
+
+    def test_not_found(self: Self) -> None:
+        """An error response should raise an exception."""
+        with self.assertRaises(requests.HTTPError):
+            self.client.compare('test-org', 'test-repo-1', 'abc', 'def')
+
+    def test_server_error_should_be_retried(self: Self) -> None:
+        """A request which failed on the server should be retried a bounded number of times."""
+        adapter = self.client.session.get_adapter(self.client.base_url)
+        self.assertEqual(2, adapter.max_retries.total)
+        self.assertIn(502, adapter.max_retries.status_forcelist)
+        self.assertNotIn(403, adapter.max_retries.status_forcelist)
@@ -1,11 +1,16 @@
 """Provides tests for GitHub utility."""
 import unittest
-from unittest.mock import MagicMock
+from datetime import datetime, timezone
+from typing import Iterator
+from unittest.mock import call, MagicMock
 
-from github import UnknownObjectException, GithubException
+from github import RateLimitExceededException, UnknownObjectException, GithubException
+from requests import HTTPError, ReadTimeout
 from typing_extensions import Self
 
-from github_util.github_util import GitHubUtil
+from diff_parser.repo_commit_change import RepoCommitChange
+from github_util.deadline import Deadline, DeadlineExceededError, RequestFailedError
+from github_util.github_util import GitHubUtil, STRATEGY_AUTO, STRATEGY_MERGE_WINDOW
 from github_util.pull_request import PullRequest
 
 
@@ -52,7 +57,7 @@ class TestGitHubUtil(unittest.TestCase):
 
     def test_get_pull_requests_for_commit_with_success(self: Self) -> None:
         """Validate the get_pull_requests_for_commit function is successful."""
-        mock_repo = MagicMock()
+        mock_repo = self.github_session.get_organization.return_value.get_repo.return_value
         mock_repo.get_commit.return_value.get_pulls.return_value = [
             MagicMock(html_url='https://foo.com/1', title='Pull Request 1', number=1),
             MagicMock(html_url='https://foo.com/2', title='Pull Request 2', number=2)
@@ -61,28 +66,28 @@ class TestGitHubUtil(unittest.TestCase):
             PullRequest(title='Pull Request 1', number=1, url='https://foo.com/1'),
             PullRequest(title='Pull Request 2', number=2, url='https://foo.com/2')
         ]
-        self.assertEqual(expected, self.github_util._get_pull_requests_for_commit(mock_repo, commit='123'))
+        self.assertEqual(expected, self.github_util._get_pull_requests_for_commit('test-repo-1', commit='123'))
 
     def test_tag_commit(self: Self) -> None:
         """Validate the tag_commit function is successful."""
-        self.assertIsNone(self.github_util.tag_commit(repo_name='test-repo-1', commit='123', tag='test-tag'))
+        self.assertTrue(self.github_util.tag_commit(repo_name='test-repo-1', commit='123', tag='test-tag'))
 
     def test_tag_commit_with_repo_not_found(self: Self) -> None:
         """Validate the tag_commit function handles a repository not found."""
         self.github_session.get_organization.return_value.get_repo.return_value = None
-        self.assertIsNone(self.github_util.tag_commit(repo_name='test-repo-1', commit='123', tag='test-tag'))
+        self.assertFalse(self.github_util.tag_commit(repo_name='test-repo-1', commit='123', tag='test-tag'))
 
     def test_tag_commit_with_ref_not_found(self: Self) -> None:
         """Validate the tag_commit function handles a ref not found."""
         self.github_session.get_organization.return_value. \
             get_repo.return_value.get_git_ref.side_effect = UnknownObjectException(400)
-        self.assertIsNone(self.github_util.tag_commit(repo_name='test-repo-1', commit='123', tag='test-tag'))
+        self.assertTrue(self.github_util.tag_commit(repo_name='test-repo-1', commit='123', tag='test-tag'))
 
     def test_tag_commit_with_github_exception(self: Self) -> None:
         """Validate the tag_commit function handles a ref not found."""
         self.github_session.get_organization.return_value. \
             get_repo.return_value.get_git_ref.side_effect = GithubException(status=422, message='Not found')
-        self.assertIsNone(self.github_util.tag_commit(repo_name='test-repo-1', commit='123', tag='test-tag'))
+        self.assertTrue(self.github_util.tag_commit(repo_name='test-repo-1', commit='123', tag='test-tag'))
 
     def test_tag_commit_with_create_git_ref_not_found(self: Self) -> None:
         """Validate the tag_commit function handles a ref not found."""
@@ -91,16 +96,17 @@ class TestGitHubUtil(unittest.TestCase):
 
         self.github_session.get_organization.return_value. \
             get_repo.return_value.create_git_ref.side_effect = UnknownObjectException(400)
-        self.assertIsNone(self.github_util.tag_commit(repo_name='test-repo-1', commit='123', tag='test-tag'))
+        self.assertFalse(self.github_util.tag_commit(repo_name='test-repo-1', commit='123', tag='test-tag'))
 
     def test_compare_and_get_commits_hashes(self: Self) -> None:
         """Validate the compare_and_get_commits_hashes function is successful."""
         mock_repo = MagicMock()
+        mock_repo.compare.return_value.status = 'ahead'
         mock_repo.compare.return_value.commits = [
             MagicMock(sha='123', parents=[1, 1]),
             MagicMock(sha='456')
         ]
-        self.assertEqual(['123'], self.github_util._compare_and_get_merge_commit_hashes(
+        self.assertEqual(('ahead', ['123']), self.github_util._compare_and_get_merge_commit_hashes(
             mock_repo, base='main', head='feature-1'
         ))
 
@@ -121,3 +127,377 @@ class TestGitHubUtil(unittest.TestCase):
         ]
         self.assertEqual(expected, self.github_util.get_pull_requests_between_refs(repo_name='test-repo-1',
                                                                                    base='123', head='456'))
+
+    def test_get_pull_requests_for_changes_with_shared_ranges(self: Self) -> None:
+        """Identical ranges, repositories and merge commits should only be looked up once."""
+        repo = self.github_session.get_organization.return_value.get_repo.return_value
+        repo.compare.return_value.commits = [MagicMock(sha='123', parents=[1, 1])]
+        repo.get_commit.return_value.get_pulls.return_value = [
+            MagicMock(html_url='https://foo.com/1', title='Pull Request 1', number=1)
+        ]
+        changes = [
+            RepoCommitChange(repository='test-repo-1', old_commit='abc11', new_commit='abc12'),
+            RepoCommitChange(repository='test-repo-1', old_commit='abc11', new_commit='abc12'),
+            RepoCommitChange(repository='test-repo-1', old_commit='abc10', new_commit='abc12'),
+        ]
+        expected = [PullRequest(title='Pull Request 1', number=1, url='https://foo.com/1')]
+
+        self.assertEqual([expected, expected, expected], self.github_util.get_pull_requests_for_changes(changes))
+        self.github_session.get_organization.return_value.get_repo.assert_called_once_with('test-repo-1')
+        self.assertEqual(2, repo.compare.call_count)
+        repo.get_commit.assert_called_once_with('123')
+
+    def test_get_pull_requests_between_refs_with_deadline_exceeded(self: Self) -> None:
+        """No API calls should be made once the deadline has passed."""
+        deadline = Deadline(seconds=10, clock=MagicMock(side_effect=[0.0, 20.0]))
+        github_util = GitHubUtil(access_token='test123', organization_name='test-org',
+                                 github_session=self.github_session, deadline=deadline)
+
+        with self.assertRaises(DeadlineExceededError):
+            github_util.get_pull_requests_between_refs(repo_name='test-repo-1', base='123', head='456')
+        self.github_session.get_organization.return_value.get_repo.assert_not_called()
+
+    def test_get_pull_requests_between_refs_with_rest_client(self: Self) -> None:
+        """The lean REST client should be used without loading the repository or the commits."""
+        rest_client = MagicMock()
+        rest_client.compare.return_value = ('ahead', ['m1', 'm2'])
+        rest_client.get_commit_pull_requests.side_effect = [
+            [PullRequest(title='Pull Request 1', number=1, url='https://foo.com/1')],
+            [PullRequest(title='Pull Request 1', number=1, url='https://foo.com/1')]
+        ]
+        github_util = GitHubUtil(access_token='test123', organization_name='test-org',
+                                 github_session=self.github_session, rest_client=rest_client)
+
+        self.assertEqual([PullRequest(title='Pull Request 1', number=1, url='https://foo.com/1')],
+                         github_util.get_pull_requests_between_refs(repo_name='test-repo-1', base='A', head='B'))
+        rest_client.compare.assert_called_once_with('test-org', 'test-repo-1', 'A', 'B')
+        rest_client.get_commit_pull_requests.assert_called_with('test-org', 'test-repo-1', 'm2')
+        self.github_session.get_organization.return_value.get_repo.assert_not_called()
+
+    def test_get_pull_requests_between_refs_with_identical_range(self: Self) -> None:
+        """An identical range should only be resolved once, even after the deadline has passed."""
+        clock = MagicMock(return_value=0.0)
+        rest_client = MagicMock()
+        rest_client.compare.return_value = ('ahead', ['m1'])
+        rest_client.get_commit_pull_requests.return_value = [
+            PullRequest(title='Pull Request 1', number=1, url='https://foo.com/1')
+        ]
+        github_util = GitHubUtil(access_token='test123', organization_name='test-org',
+                                 github_session=self.github_session, rest_client=rest_client,
+                                 deadline=Deadline(seconds=10, clock=clock))
+
+        first = github_util.get_pull_requests_between_refs(repo_name='test-repo-1', base='A', head='B')
+        clock.return_value = 20.0
+        self.assertEqual(first, github_util.get_pull_requests_between_refs(repo_name='test-repo-1', base='A', head='B'))
+        rest_client.compare.assert_called_once()
+        rest_client.get_commit_pull_requests.assert_called_once()
+
+    def test_get_pull_requests_between_refs_with_rest_client_error(self: Self) -> None:
+        """A failed request of the lean REST client should be handled."""
+        rest_client = MagicMock()
+        rest_client.compare.side_effect = HTTPError('404 Client Error: Not Found', response=MagicMock(status_code=404))
+        github_util = GitHubUtil(access_token='test123', organization_name='test-org',
+                                 github_session=self.github_session, rest_client=rest_client)
+
+        self.assertEqual([], github_util.get_pull_requests_between_refs(repo_name='test-repo-1', base='A', head='B'))
+        rest_client.get_commit_pull_requests.assert_not_called()
+
+    def test_get_pull_requests_between_refs_with_rest_client_transient_error(self: Self) -> None:
+        """A rate limited or failed request should not look like a range without pull requests, nor be cached."""
+        rest_client = MagicMock(request_count=0)
+        rest_client.compare.side_effect = [
+            HTTPError('403 Client Error: rate limit exceeded', response=MagicMock(status_code=403)),
+            HTTPError('502 Server Error: Bad Gateway', response=MagicMock(status_code=502)),
+            ('ahead', [])
+        ]
+        github_util = GitHubUtil(access_token='test123', organization_name='test-org',
+                                 github_session=self.github_session, rest_client=rest_client)
+
+        for _ in range(2):
+            with self.assertRaises(RequestFailedError):
+                github_util.get_pull_requests_between_refs(repo_name='test-repo-1', base='A', head='B')
+        self.assertEqual([], github_util.get_pull_requests_between_refs(repo_name='test-repo-1', base='A', head='B'))
+        self.assertEqual(3, rest_client.compare.call_count)
+
+    def test_get_pull_requests_between_refs_with_request_timeout(self: Self) -> None:
+        """A request which timed out should be handled like the deadline, and the range resolved again later."""
+        rest_client = MagicMock(request_count=0)
+        rest_client.compare.return_value = ('ahead', ['m1'])
+        rest_client.get_commit_pull_requests.side_effect = [ReadTimeout('read timed out'), []]
+        github_util = GitHubUtil(access_token='test123', organization_name='test-org',
+                                 github_session=self.github_session, rest_client=rest_client)
+
+        with self.assertRaises(RequestFailedError):
+            github_util.get_pull_requests_between_refs(repo_name='test-repo-1', base='A', head='B')
+        self.assertEqual([], github_util.get_pull_requests_between_refs(repo_name='test-repo-1', base='A', head='B'))
+        self.assertEqual(2, rest_client.get_commit_pull_requests.call_count)
+
+    def test_get_compare_url(self: Self) -> None:
+        """The compare URL should point to the repository in the organization."""
+        self.github_session.get_organization.return_value.html_url = 'https://github.com/test-org'
+        self.assertEqual('https://github.com/test-org/test-repo-1/compare/abc...def',
+                         self.github_util.get_compare_url('test-repo-1', 'abc', 'def'))
+
+    def test_get_pull_requests_between_refs_with_chained_ranges(self: Self) -> None:
+        """A range covered by cached ranges should not be compared again."""
+        repo = self.github_session.get_organization.return_value.get_repo.return_value
+        repo.name = 'test-repo-1'
+        repo.compare.side_effect = [
+            MagicMock(status='ahead', commits=[MagicMock(sha='m1', parents=[1, 1])]),
+            MagicMock(status='ahead', commits=[MagicMock(sha='m2', parents=[1, 1])])
+        ]
+        repo.get_commit.return_value.get_pulls.return_value = []
+
+        self.github_util.get_pull_requests_between_refs(repo_name='test-repo-1', base='A', head='B')
+        self.github_util.get_pull_requests_between_refs(repo_name='test-repo-1', base='B', head='C')
+        self.github_util.get_pull_requests_between_refs(repo_name='test-repo-1', base='A', head='C')
+
+        self.assertEqual(2, repo.compare.call_count)
+        self.assertEqual(['m1', 'm2'], self.github_util._get_merge_commit_hashes('test-repo-1', 'A', 'C'))
+
+    def test_get_merge_commit_hashes_with_cached_prefix(self: Self) -> None:
+        """Only the part of the range which is not cached should be compared."""
+        repo = self.github_session.get_organization.return_value.get_repo.return_value
+        repo.name = 'test-repo-1'
+        repo.compare.side_effect = [
+            MagicMock(status='ahead', commits=[MagicMock(sha='m1', parents=[1, 1])]),
+            MagicMock(status='ahead', commits=[MagicMock(sha='m2', parents=[1, 1])])
+        ]
+
+        self.assertEqual(['m1'], self.github_util._get_merge_commit_hashes('test-repo-1', 'A', 'B'))
+        self.assertEqual(['m1', 'm2'], self.github_util._get_merge_commit_hashes('test-repo-1', 'A', 'C'))
+        repo.compare.assert_called_with('B', 'C')
+
+    def test_get_merge_commit_hashes_with_cached_suffix(self: Self) -> None:
+        """Only the start of the range should be compared when its end is cached."""
+        repo = self.github_session.get_organization.return_value.get_repo.return_value
+        repo.name = 'test-repo-1'
+        repo.compare.side_effect = [
+            MagicMock(status='ahead', commits=[MagicMock(sha='m2', parents=[1, 1])]),
+            MagicMock(status='ahead', commits=[MagicMock(sha='m1', parents=[1, 1])])
+        ]
+
+        self.assertEqual(['m2'], self.github_util._get_merge_commit_hashes('test-repo-1', 'B', 'C'))
+        self.assertEqual(['m1', 'm2'], self.github_util._get_merge_commit_hashes('test-repo-1', 'A', 'C'))
+        repo.compare.assert_called_with('A', 'B')
+
+    def test_get_merge_commit_hashes_with_diverged_prefix(self: Self) -> None:
+        """The full range should be compared when the missing part is not linear."""
+        repo = self.github_session.get_organization.return_value.get_repo.return_value
+        repo.name = 'test-repo-1'
+        repo.compare.side_effect = [
+            MagicMock(status='ahead', commits=[MagicMock(sha='m1', parents=[1, 1])]),
+            MagicMock(status='diverged', commits=[]),
+            MagicMock(status='ahead', commits=[MagicMock(sha='m3', parents=[1, 1])])
+        ]
+
+        self.github_util._get_merge_commit_hashes('test-repo-1', 'A', 'B')
+        self.assertEqual(['m3'], self.github_util._get_merge_commit_hashes('test-repo-1', 'A', 'C'))
+        repo.compare.assert_called_with('A', 'C')
+
+    def test_get_merge_commit_hashes_with_diverged_prefix_and_cached_suffix(self: Self) -> None:
+        """At most two compare calls should be made when both the start and the end of the range are cached."""
+        repo = self.github_session.get_organization.return_value.get_repo.return_value
+        repo.name = 'test-repo-1'
+        repo.compare.side_effect = [
+            MagicMock(status='ahead', commits=[MagicMock(sha='m1', parents=[1, 1])]),
+            MagicMock(status='ahead', commits=[MagicMock(sha='m2', parents=[1, 1])]),
+            MagicMock(status='diverged', commits=[]),
+            MagicMock(status='ahead', commits=[MagicMock(sha='m3', parents=[1, 1])])
+        ]
+
+        self.github_util._get_merge_commit_hashes('test-repo-1', 'A', 'B')
+        self.github_util._get_merge_commit_hashes('test-repo-1', 'D', 'C')
+        self.assertEqual(['m3'], self.github_util._get_merge_commit_hashes('test-repo-1', 'A', 'C'))
+        self.assertEqual([call('B', 'C'), call('A', 'C')], repo.compare.call_args_list[2:])
+
+    def _get_merge_window_github_util(self: Self) -> tuple[GitHubUtil, MagicMock]:
+        """
+        Get a GitHubUtil using the merge window strategy for a repository with two merge commits in the range.
+
+        :return: GitHubUtil and the mocked repository
+        """
+        github_util = GitHubUtil(access_token='test123', organization_name='test-org',
+                                 github_session=self.github_session, strategy=STRATEGY_MERGE_WINDOW)
+        repo = self.github_session.get_organization.return_value.get_repo.return_value
+        repo.name = 'test-repo-1'
+        repo.default_branch = 'main'
+        repo.compare.return_value.status = 'ahead'
+        repo.compare.return_value.commits = [
+            MagicMock(sha='m1', parents=[1, 1]),
+            MagicMock(sha='c1', parents=[1]),
+            MagicMock(sha='m2', parents=[1, 1])
+        ]
+        repo.get_git_commit.return_value.committer.date = datetime(2024, 1, 10, tzinfo=timezone.utc)
+        return github_util, repo
+
+    def test_get_pull_requests_between_refs_with_merge_window(self: Self) -> None:
+        """Merged pull requests should be listed once and matched against the merge commits of the range."""
+        github_util, repo = self._get_merge_window_github_util()
+        repo.get_pulls.return_value = [
+            MagicMock(merge_commit_sha='other', updated_at=datetime(2024, 1, 12, tzinfo=timezone.utc)),
+            MagicMock(merge_commit_sha='m2', updated_at=datetime(2024, 1, 11, tzinfo=timezone.utc),
+                      html_url='https://foo.com/2', title='Pull Request 2', number=2),
+            MagicMock(merge_commit_sha='m1', updated_at=datetime(2024, 1, 10, tzinfo=timezone.utc),
+                      html_url='https://foo.com/1', title='Pull Request 1', number=1),
+            MagicMock(merge_commit_sha='never-reached', updated_at=datetime(2024, 1, 9, tzinfo=timezone.utc)),
+        ]
+
+        expected = [
+            PullRequest(title='Pull Request 1', number=1, url='https://foo.com/1'),
+            PullRequest(title='Pull Request 2', number=2, url='https://foo.com/2')
+        ]
+        self.assertEqual(expected, github_util.get_pull_requests_between_refs('test-repo-1', base='A', head='B'))
+        repo.get_pulls.assert_called_once_with(state='closed', sort='updated', direction='desc', base='main')
+        repo.get_git_commit.assert_called_once_with('A')
+        repo.get_commit.assert_not_called()
+
+    def test_get_pull_requests_between_refs_with_merge_window_outside_window(self: Self) -> None:
+        """Listing should stop at pull requests last updated before the base commit, looking up the rest per commit."""
+        github_util, repo = self._get_merge_window_github_util()
+        repo.get_pulls.return_value = [
+            MagicMock(merge_commit_sha='m2', updated_at=datetime(2024, 1, 11, tzinfo=timezone.utc),
+                      html_url='https://foo.com/2', title='Pull Request 2', number=2),
+            MagicMock(merge_commit_sha='other', updated_at=datetime(2024, 1, 1, tzinfo=timezone.utc)),
+            MagicMock(merge_commit_sha='m1', updated_at=datetime(2023, 12, 1, tzinfo=timezone.utc)),
+        ]
+        repo.get_commit.return_value.get_pulls.return_value = [
+            MagicMock(html_url='https://foo.com/1', title='Pull Request 1', number=1)
+        ]
+
+        expected = [
+            PullRequest(title='Pull Request 1', number=1, url='https://foo.com/1'),
+            PullRequest(title='Pull Request 2', number=2, url='https://foo.com/2')
+        ]
+        self.assertEqual(expected, github_util.get_pull_requests_between_refs('test-repo-1', base='A', head='B'))
+        repo.get_commit.assert_called_once_with('m1')
+
+    def test_get_pull_requests_between_refs_with_merge_window_for_several_ranges(self: Self) -> None:
+        """The pull requests of a repository should be listed once, continuing the listing for older ranges."""
+        github_util, repo = self._get_merge_window_github_util()
+        repo.get_pulls.return_value = [
+            MagicMock(merge_commit_sha='m2', updated_at=datetime(2024, 1, 11, tzinfo=timezone.utc),
+                      html_url='https://foo.com/2', title='Pull Request 2', number=2),
+            MagicMock(merge_commit_sha='m1', updated_at=datetime(2024, 1, 10, tzinfo=timezone.utc),
+                      html_url='https://foo.com/1', title='Pull Request 1', number=1),
+            MagicMock(merge_commit_sha='m0', updated_at=datetime(2024, 1, 6, tzinfo=timezone.utc),
+                      html_url='https://foo.com/0', title='Pull Request 0', number=0)
+        ]
+
+        github_util.get_pull_requests_between_refs('test-repo-1', base='A', head='B')
+        repo.compare.return_value.commits = [MagicMock(sha='m0', parents=[1, 1]), MagicMock(sha='m1', parents=[1, 1])]
+        repo.get_git_commit.return_value.committer.date = datetime(2024, 1, 5, tzinfo=timezone.utc)
+
+        expected = [
+            PullRequest(title='Pull Request 0', number=0, url='https://foo.com/0'),
+            PullRequest(title='Pull Request 1', number=1, url='https://foo.com/1')
+        ]
+        self.assertEqual(expected, github_util.get_pull_requests_between_refs('test-repo-1', base='Z', head='A'))
+        repo.get_pulls.assert_called_once()
+        repo.get_commit.assert_not_called()
+
+    def test_get_pull_requests_between_refs_with_merge_window_failing(self: Self) -> None:
+        """A listing which is rate limited or fails on the server should fail the range instead of the run."""
+        github_util, repo = self._get_merge_window_github_util()
+
+        errors = [
+            RateLimitExceededException(403, {'message': 'API rate limit exceeded'}, {}),
+            GithubException(404, {'message': 'Not Found'}, {})
+        ]
+
+        def get_pulls(**_: str) -> Iterator[MagicMock]:
+            yield MagicMock(merge_commit_sha='other', updated_at=datetime(2024, 1, 12, tzinfo=timezone.utc))
+            raise errors.pop(0)
+
+        repo.get_pulls.side_effect = get_pulls
+
+        with self.assertRaisesRegex(RequestFailedError, 'rate limit'):
+            github_util.get_pull_requests_between_refs('test-repo-1', base='A', head='B')
+        repo.get_commit.assert_not_called()
+
+        repo.get_commit.return_value.get_pulls.return_value = []
+        self.assertEqual([], github_util.get_pull_requests_between_refs('test-repo-1', base='A', head='C'))
+        self.assertEqual(2, repo.get_commit.call_count)
+
+    def test_get_pull_requests_between_refs_with_merge_window_other_branch(self: Self) -> None:
+        """Merge commits of pull requests into another branch than the default branch should be looked up per commit."""
+        github_util, repo = self._get_merge_window_github_util()
+        repo.get_pulls.return_value = []
+        repo.get_commit.side_effect = lambda commit: MagicMock(get_pulls=MagicMock(return_value=[
+            MagicMock(html_url=f'https://foo.com/{commit}', title=f'Release {commit}', number=int(commit[1:]))
+        ]))
+
+        expected = [
+            PullRequest(title='Release m1', number=1, url='https://foo.com/m1'),
+            PullRequest(title='Release m2', number=2, url='https://foo.com/m2')
+        ]
+        self.assertEqual(expected, github_util.get_pull_requests_between_refs('test-repo-1', base='A', head='B'))
+
+    def test_get_pull_requests_between_refs_with_merge_window_unknown_base(self: Self) -> None:
+        """The per commit lookup should be used when the date of the base commit is unknown."""
+        github_util, repo = self._get_merge_window_github_util()
+        repo.get_git_commit.side_effect = UnknownObjectException(404)
+        repo.get_commit.return_value.get_pulls.return_value = [
+            MagicMock(html_url='https://foo.com/1', title='Pull Request 1', number=1)
+        ]
+
+        expected = [PullRequest(title='Pull Request 1', number=1, url='https://foo.com/1')]
+        self.assertEqual(expected, github_util.get_pull_requests_between_refs('test-repo-1', base='A', head='B'))
+        repo.get_pulls.assert_not_called()
+        self.assertEqual(2, repo.get_commit.call_count)
+
+    def _get_auto_github_util(self: Self, merge_commits: list[str]) -> tuple[GitHubUtil, MagicMock, MagicMock]:
+        """
+        Get a GitHubUtil using the auto strategy with a lean REST client, for a range with the merge commits.
+
+        :param merge_commits: merge commits of the range
+        :return: GitHubUtil, the mocked REST client and the mocked repository
+        """
+        rest_client = MagicMock(request_count=0, rate_limit_remaining=None)
+        rest_client.compare.return_value = ('ahead', merge_commits)
+        rest_client.get_commit_pull_requests.return_value = []
+        github_util = GitHubUtil(access_token='test123', organization_name='test-org',
+                                 github_session=self.github_session, strategy=STRATEGY_AUTO, rest_client=rest_client)
+        repo = self.github_session.get_organization.return_value.get_repo.return_value
+        repo.get_git_commit.return_value.committer.date = datetime(2024, 1, 10, tzinfo=timezone.utc)
+        repo.full_name = 'test-org/test-repo-1'
+        repo.default_branch = 'main'
+        self.github_session.search_issues.return_value.totalCount = len(merge_commits) + 10
+        repo.get_pulls.return_value = [
+            MagicMock(merge_commit_sha=commit, number=number, title=f'Pull Request {number}',
+                      html_url=f'https://foo.com/{number}', updated_at=datetime(2024, 1, 11, tzinfo=timezone.utc))
+            for number, commit in enumerate(merge_commits)
+        ]
+        return github_util, rest_client, repo
+
+    def test_get_pull_requests_between_refs_with_auto_strategy_for_small_range(self: Self) -> None:
+        """A small range should be resolved per merge commit."""
+        github_util, rest_client, repo = self._get_auto_github_util(['m1', 'm2'])
+
+        github_util.get_pull_requests_between_refs(repo_name='test-repo-1', base='A', head='B')
+        self.assertEqual(2, rest_client.get_commit_pull_requests.call_count)
+        repo.get_pulls.assert_not_called()
+        self.github_session.search_issues.assert_not_called()
+
+    def test_get_pull_requests_between_refs_with_auto_strategy_for_large_range(self: Self) -> None:
+        """A large range should be resolved by listing the merged pull requests."""
+        merge_commits = [f'm{number}' for number in range(50)]
+        github_util, rest_client, repo = self._get_auto_github_util(merge_commits)
+
+        pull_requests = github_util.get_pull_requests_between_refs(repo_name='test-repo-1', base='A', head='B')
+        self.assertEqual(50, len(pull_requests))
+        rest_client.get_commit_pull_requests.assert_not_called()
+        self.github_session.search_issues.assert_called_once_with(
+            'repo:test-org/test-repo-1 is:pr is:closed base:main updated:>=2024-01-09T23:00:00Z'
+        )
+        self.assertEqual(4, github_util.api_calls)
+
+    def test_get_pull_requests_between_refs_with_auto_strategy_for_busy_repository(self: Self) -> None:
+        """A range should be resolved per merge commit when listing would go through many more pull requests."""
+        merge_commits = [f'm{number}' for number in range(5)]
+        github_util, rest_client, repo = self._get_auto_github_util(merge_commits)
+        self.github_session.search_issues.return_value.totalCount = 5000
+
+        github_util.get_pull_requests_between_refs(repo_name='test-repo-1', base='A', head='B')
+        self.assertEqual(5, rest_client.get_commit_pull_requests.call_count)
+        repo.get_pulls.assert_not_called()
@@ -0,0 +1,230 @@
+"""Coordinates overlapping runs for an environment so that the newest run supersedes the older ones."""
+import fcntl
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Callable, Optional, Union
+
+from git import GitCommandError
+from typing_extensions import Self
+
+from git_util.git_util import GitUtil
+
+logger = logging.getLogger(__name__)
+
+LEASE = 'lease'
+NOTIFIED = 'notified'
+DONE = 'done'
+
+# a run only retries acquiring the lease when another run changed it at the same time
+_MAX_ATTEMPTS = 5
+
+
+class SupersededError(Exception):
+    """Raised when a run for a newer commit of the environment repository holds the lease."""
+
+
+class FileLeaseStorage:
+    """Stores the lease in a local file, for runs sharing a runner. Updates are serialized with a file lock."""
+
+    def __init__(self: Self, path: str) -> None:
+        """
+        Initialize the FileLeaseStorage.
+
+        :param path: path of the lease file
+        """
+        self._path = Path(path)
+        self._lock_path = Path(f'{path}.lock')
+
+    def get(self: Self, name: str) -> Optional[str]:
+        """
+        Get the commit recorded under a name.
+
+        :param name: LEASE for the commit of the run holding the lease, NOTIFIED or DONE for the last notified or completed commit
+        :return: commit hash, None if nothing is recorded
+        """
+        if not self._path.exists():
+            return None
+        return json.loads(self._path.read_text()).get(name)
+
+    def compare_and_set(self: Self, name: str, expected: Optional[str], commit: str) -> bool:
+        """
+        Record a commit under a name, only if the expected commit is still recorded.
+
+        :param name: LEASE, NOTIFIED or DONE
+        :param expected: commit hash expected to be recorded, None if nothing is expected to be recorded
+        :param commit: commit hash to record, empty to release it
+        :return: True if the commit was recorded, False if the record changed in the meantime
+        """
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock_path.open('w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            records = json.loads(self._path.read_text()) if self._path.exists() else {}
+            if records.get(name) != expected:
+                return False
+            records[name] = commit
+            self._path.write_text(json.dumps(records))
+            return True
+
+
+class GitRefLeaseStorage:
+    """Stores the lease as refs on the remote of the environment repository, for runs on different runners."""
+
+    def __init__(self: Self, git_util: GitUtil, environment_name: str, ref_prefix: str = 'refs/release-notes') -> None:
+        """
+        Initialize the GitRefLeaseStorage.
+
+        :param git_util: GitUtil for the environment repository
+        :param environment_name: Name of the environment, so each environment has its own lease
+        :param ref_prefix: prefix of the refs
+        """
+        self._git_util = git_util
+        self._ref_prefix = f'{ref_prefix}/{environment_name}'
+
+    def get(self: Self, name: str) -> Optional[str]:
+        """
+        Get the commit a lease ref points to.
+
+        :param name: LEASE for the commit of the run holding the lease, NOTIFIED or DONE for the last notified or completed commit
+        :return: commit hash, None if the ref does not exist
+        """
+        return self._git_util.get_remote_ref(f'{self._ref_prefix}/{name}')
+
+    def compare_and_set(self: Self, name: str, expected: Optional[str], commit: str) -> bool:
+        """
+        Point a lease ref to a commit, only if it still points to the expected commit.
+
+        :param name: LEASE, NOTIFIED or DONE
+        :param expected: commit hash the ref is expected to point to, None if it is expected not to exist
+        :param commit: commit hash to point the ref to, empty to delete the ref
+        :return: True if the ref was updated, False if it changed in the meantime
+        """
+        return self._git_util.push_ref(f'{self._ref_prefix}/{name}', commit, expected)
+
+
+class Lease:
+    """
+    Coordinates overlapping runs for an environment so that the newest run supersedes the older ones.
+
+    A run takes the lease by recording its commit, unless the lease is held by a run for a descendant of that
+    commit or a descendant was notified already. Older runs find that they were superseded when they check the
+    lease, and stop before doing more GitHub work, sending the message or moving tags. The last notified commit is
+    recorded as soon as the message is sent, so the newest run covers the whole range since then in one
+    notification, including the commits of the superseded runs, and never announces the changes of a run which was
+    superseded while tagging again. The last completed commit, with its tags, is recorded as well, and the lease is
+    released.
+
+    A recorded commit only counts as newer when it is known to descend from the commit of the run. A commit which
+    is not related, for example after the environment branch was force-pushed or reset, or which can no longer be
+    fetched, is stale, so a crashed or orphaned holder never stops the runs for later commits.
+    """
+
+    def __init__(self: Self, storage: Union[FileLeaseStorage, GitRefLeaseStorage], git_util: GitUtil, commit: str,
+                 check_interval: float = 10.0, clock: Callable[[], float] = time.monotonic) -> None:
+        """
+        Initialize the Lease.
+
+        :param storage: where the lease is kept
+        :param git_util: GitUtil for the environment repository, to order the commits of the runs
+        :param commit: commit of the environment repository this run handles
+        :param check_interval: minimum seconds between two checks of the lease, unless a check is forced
+        :param clock: Optionally inject a clock returning seconds
+        """
+        self.storage = storage
+        self.git_util = git_util
+        self.commit = commit
+        self.check_interval = check_interval
+        self.clock = clock
+        self._checked_at: Optional[float] = None
+
+    def acquire(self: Self) -> Optional[str]:
+        """
+        Take the lease for the commit of this run.
+
+        :raises SupersededError: if a run for a newer commit holds the lease, or a newer commit was notified
+        :return: last notified commit when it is an older ancestor, so the run covers the range since then
+        """
+        notified = self.storage.get(NOTIFIED)
+        if notified and notified != self.commit and self._is_ancestor(self.commit, notified):
+            raise SupersededError(f'the newer commit {notified} was notified already')
+
+        for _ in range(_MAX_ATTEMPTS):
+            holder = self.storage.get(LEASE)
+            if holder == self.commit:
+                break
+            if holder and self._is_ancestor(self.commit, holder):
+                raise SupersededError(f'the lease is held by a run for commit {holder}')
+            if holder and not self._is_ancestor(holder, self.commit):
+                logger.warning(f'taking the lease from a run for commit {holder}, which is not an ancestor')
+            if self.storage.compare_and_set(LEASE, holder, self.commit):
+                logger.info(f'took the lease for commit {self.commit} from {holder or "nobody"}')
+                break
+        else:
+            raise SupersededError(f'the lease kept changing while taking it for commit {self.commit}')
+
+        self._checked_at = self.clock()
+        if notified and notified != self.commit and self._is_ancestor(notified, self.commit):
+            logger.info(f'covering the range since the last notified commit {notified}')
+            return notified
+        return None
+
+    def check(self: Self, force: bool = False) -> None:
+        """
+        Check that this run still holds the lease, at most once per check interval unless forced.
+
+        :param force: check even if the lease was checked recently
+        :raises SupersededError: if a run for a newer commit took the lease
+        :return: None
+        """
+        if not force and self._checked_at is not None and self.clock() - self._checked_at < self.check_interval:
+            return
+        self._checked_at = self.clock()
+        holder = self.storage.get(LEASE)
+        if holder != self.commit:
+            raise SupersededError(f'superseded by a run for commit {holder}')
+
+    def set_notified(self: Self) -> None:
+        """
+        Record the commit of this run as notified, unless a newer commit was notified already.
+
+        :return: None
+        """
+        self._fast_forward(NOTIFIED)
+
+    def complete(self: Self) -> None:
+        """
+        Record the commit of this run as completed, unless a newer commit was completed already, and release the lease.
+
+        :return: None
+        """
+        self._fast_forward(DONE)
+        if self.storage.compare_and_set(LEASE, self.commit, ''):
+            logger.info(f'released the lease for commit {self.commit}')
+
+    def _fast_forward(self: Self, name: str) -> None:
+        """
+        Record the commit of this run under a name, unless a newer commit is recorded already.
+
+        :param name: NOTIFIED or DONE
+        :return: None
+        """
+        recorded = self.storage.get(name)
+        if recorded == self.commit or (recorded and self._is_ancestor(self.commit, recorded)):
+            return
+        if self.storage.compare_and_set(name, recorded, self.commit):
+            logger.info(f'recorded commit {self.commit} as {name}')
+
+    def _is_ancestor(self: Self, ancestor: str, descendant: str) -> bool:
+        """
+        Check if a commit is an ancestor of another, treating commits which cannot be compared as unrelated.
+
+        :param ancestor: hash of the possible ancestor
+        :param descendant: hash of the possible descendant
+        :return: True if ancestor is known to be an ancestor of descendant
+        """
+        try:
+            return self.git_util.is_ancestor(ancestor, descendant)
+        except GitCommandError as e:
+            logger.warning(f'unable to compare commits {ancestor} and {descendant}, treating them as unrelated: {e}')
+            return False
@@ -0,0 +1,165 @@
+"""Provides tests for Lease."""
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from git import GitCommandError
+from typing_extensions import Self
+
+from lease.lease import DONE, FileLeaseStorage, GitRefLeaseStorage, LEASE, Lease, NOTIFIED, SupersededError
+
+# each commit is an ancestor of the commits after it
+_HISTORY = ['env1', 'env2', 'env3']
+# commit which is no longer on the remote, so it can't be fetched into a shallow clone
+_MISSING = 'gone'
+
+
+class TestLease(unittest.TestCase):
+    """Provides tests for Lease."""
+
+    def setUp(self: Self) -> None:
+        """Create a lease file and a git util ordering the commits of the history."""
+        self._directory = tempfile.TemporaryDirectory()
+        self.storage = FileLeaseStorage(str(Path(self._directory.name) / 'lease.json'))
+        self.git_util = MagicMock()
+        self.git_util.is_ancestor.side_effect = self._is_ancestor
+        self.time = 0.0
+
+    def tearDown(self: Self) -> None:
+        """Remove the lease file."""
+        self._directory.cleanup()
+
+    @staticmethod
+    def _is_ancestor(ancestor: str, descendant: str) -> bool:
+        """
+        Order the commits of the history, commits outside of it are not related and a missing commit can't be fetched.
+
+        :param ancestor: possible ancestor
+        :param descendant: possible descendant
+        :return: True if ancestor is an ancestor of descendant
+        """
+        if _MISSING in (ancestor, descendant):
+            raise GitCommandError('fetch')
+        if ancestor not in _HISTORY or descendant not in _HISTORY:
+            return ancestor == descendant
+        return _HISTORY.index(ancestor) <= _HISTORY.index(descendant)
+
+    def _lease(self: Self, commit: str) -> Lease:
+        """
+        Create a lease for a commit with a clock controlled by the test.
+
+        :param commit: commit of the run
+        :return: lease
+        """
+        return Lease(self.storage, self.git_util, commit, check_interval=10.0, clock=lambda: self.time)
+
+    def test_acquire(self: Self) -> None:
+        """The first run should take the lease and have no earlier commit to cover."""
+        lease = self._lease('env2')
+
+        self.assertIsNone(lease.acquire())
+        self.assertEqual('env2', self.storage.get(LEASE))
+        lease.check(force=True)
+
+    def test_acquire_should_return_the_last_notified_commit(self: Self) -> None:
+        """A run should cover the range since the last notified run, including the runs it superseded."""
+        first = self._lease('env1')
+        first.acquire()
+        first.set_notified()
+        superseded = self._lease('env2')
+        superseded.acquire()
+
+        self.assertEqual('env1', self._lease('env3').acquire())
+        with self.assertRaises(SupersededError):
+            superseded.check(force=True)
+
+    def test_acquire_after_a_run_superseded_while_tagging(self: Self) -> None:
+        """The changes of a run which sent its message before it was superseded should not be announced again."""
+        first = self._lease('env1')
+        first.acquire()
+        first.set_notified()
+        first.complete()
+        superseded = self._lease('env2')
+        superseded.acquire()
+        superseded.set_notified()
+
+        self.assertEqual('env2', self._lease('env3').acquire())
+        self.assertEqual('env1', self.storage.get(DONE))
+
+    def test_acquire_should_raise_when_a_newer_run_holds_the_lease(self: Self) -> None:
+        """A run starting after a run for a newer commit should stop."""
+        self._lease('env3').acquire()
+
+        with self.assertRaises(SupersededError):
+            self._lease('env2').acquire()
+        self.assertEqual('env3', self.storage.get(LEASE))
+
+    def test_acquire_after_a_newer_run_completed(self: Self) -> None:
+        """A run starting after a run for a newer commit completed and released the lease should stop."""
+        newer = self._lease('env3')
+        newer.acquire()
+        newer.set_notified()
+        newer.complete()
+
+        self.assertFalse(self.storage.get(LEASE))
+        with self.assertRaises(SupersededError):
+            self._lease('env2').acquire()
+        self.assertIsNone(self._lease('env3').acquire())
+        self.assertEqual('env3', self.storage.get(LEASE))
+
+    def test_acquire_should_take_a_stale_lease(self: Self) -> None:
+        """A lease held or notified for a commit which is not related or can't be fetched should be taken over."""
+        for stale in ('reset', _MISSING):
+            self.storage.compare_and_set(LEASE, self.storage.get(LEASE), stale)
+            self.storage.compare_and_set(NOTIFIED, self.storage.get(NOTIFIED), stale)
+            lease = self._lease('env2')
+
+            with self.assertLogs('lease.lease', level='WARNING'):
+                self.assertIsNone(lease.acquire())
+            lease.set_notified()
+
+            self.assertEqual('env2', self.storage.get(LEASE))
+            self.assertEqual('env2', self.storage.get(NOTIFIED))
+
+    def test_check_should_be_throttled(self: Self) -> None:
+        """The lease should only be read once per check interval unless the check is forced."""
+        lease = self._lease('env2')
+        lease.acquire()
+        self._lease('env3').acquire()
+
+        self.time = 5.0
+        lease.check()
+        self.time = 10.0
+        with self.assertRaises(SupersededError):
+            lease.check()
+
+    def test_complete_should_not_move_back(self: Self) -> None:
+        """A run finishing after a run for a newer commit should not move the notified or completed commit back."""
+        self._lease('env3').set_notified()
+        self._lease('env3').complete()
+        self._lease('env2').set_notified()
+        self._lease('env2').complete()
+
+        self.assertEqual('env3', self.storage.get(NOTIFIED))
+        self.assertEqual('env3', self.storage.get(DONE))
+
+    def test_file_storage_compare_and_set(self: Self) -> None:
+        """The lease file should only be updated when it still records the expected commit."""
+        self.assertTrue(self.storage.compare_and_set(LEASE, None, 'env1'))
+        self.assertFalse(self.storage.compare_and_set(LEASE, None, 'env2'))
+        self.assertTrue(self.storage.compare_and_set(LEASE, 'env1', 'env2'))
+        self.assertEqual('env2', self.storage.get(LEASE))
+        self.assertIsNone(self.storage.get(DONE))
+
+    def test_git_ref_storage(self: Self) -> None:
+        """The lease should be kept in refs of the environment on the remote."""
+        git_util = MagicMock()
+        git_util.get_remote_ref.return_value = 'env1'
+        git_util.push_ref.return_value = False
+        storage = GitRefLeaseStorage(git_util, 'dev')
+
+        self.assertEqual('env1', storage.get(LEASE))
+        self.assertFalse(storage.compare_and_set(DONE, None, 'env2'))
+        git_util.get_remote_ref.assert_called_once_with('refs/release-notes/dev/lease')
+        git_util.push_ref.assert_called_once_with('refs/release-notes/dev/done', 'env2', None)
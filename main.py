@@ -1,12 +1,25 @@
 """Parses the most recent commit for changes to variables."""
 import logging
 import os
+from typing import Iterator, Optional, Union
 
+from artifact_writer.artifact_writer import ArtifactWriter
 from diff_parser.diff_parser import DiffParser
+from diff_parser.repo_commit_change import RepoCommitChange
 from git_util.git_util import GitUtil
-from github_util.github_util import GitHubUtil
+from github_util.app_token_provider import AppTokenProvider
+from github_util.deadline import Deadline, DeadlineExceededError
+from github_util.github_util import GitHubUtil, STRATEGY_COMMIT
+from github_util.pull_request import PullRequest
+from lease.lease import FileLeaseStorage, GitRefLeaseStorage, Lease, SupersededError
 from message_formatter.message_formatter import MessageFormatter
-from slack_notifier.slack_notifier import SlackNotifier
+from notification_state.notification_state import NotificationState
+from notification_state.state_storage import FileStateStorage, GitNoteStateStorage
+from notifier.notifier import DEFAULT_TIMEOUT, NotificationError, Notifier
+from notifier.notifier_group import create_notifier
+from profiler.profiler import Profiler
+from reference_index.reference_index import ReferenceIndex
+from shard.shard import Shard
 
 logging.basicConfig(
     format='%(asctime)s [%(levelname)8s] %(message)s (%(filename)s:%(lineno)s)',
@@ -15,38 +28,327 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def main(git_util: GitUtil, slack_notifier: SlackNotifier, github_util: GitHubUtil,
-         environment_name: str, file_pattern: str, tag_name: str) -> None:
+def _resolve_change(github_util: GitHubUtil, change: RepoCommitChange,
+                    notification_state: Optional[NotificationState]) -> list[PullRequest]:
+    """
+    Get the pull requests for a change, reusing the ones recorded by a previous run.
+
+    :param github_util: GitHubUtil to resolve pull requests
+    :param change: repository commit change
+    :param notification_state: Optionally the work recorded by previous runs
+    :raises DeadlineExceededError: if the deadline passes before the pull requests are resolved
+    :return: list of pull requests
+    """
+    pull_requests = notification_state.get_pull_requests(change) if notification_state else None
+    if pull_requests is not None:
+        logger.info(f'using pull requests resolved by a previous run for repo:{change.repository}')
+        return pull_requests
+
+    pull_requests = github_util.get_pull_requests_between_refs(change.repository, change.old_commit, change.new_commit)
+    if notification_state:
+        notification_state.set_pull_requests(change, pull_requests)
+    return pull_requests
+
+
+def _get_changes(git_util: GitUtil, file_pattern: str,
+                 index_storage: Optional[Union[FileStateStorage, GitNoteStateStorage]] = None,
+                 save_index: bool = True, base: Optional[str] = None) -> Iterator[tuple[str, RepoCommitChange]]:
+    """
+    Get the changes of the last commit with the file each change was found in.
+
+    Without index storage the changed files are diffed and parsed. With index storage, the reference index of the
+    parent commit is loaded, or built from whichever index was stored, and the index of the last commit is built
+    from it by reading only the files whose object changed. The changes are found by comparing the two indexes.
+    When the changes are found since an earlier commit, the index noted on that commit is preferred, as the parent
+    commit may have been skipped by a superseded run.
+
+    :param git_util: GitUtil for the environment repository
+    :param file_pattern: Regex pattern(s) to filter files, separated by newlines
+    :param index_storage: Optionally where the reference index is kept between runs
+    :param save_index: Save the index of the last commit for the next run
+    :param base: Optionally get the changes since this earlier commit instead of since the parent commit
+    :return: iterator of the file name and the change
+    """
+    if not index_storage:
+        file_diffs = git_util.get_file_diffs_since(base, file_pattern) if base else \
+            git_util.get_file_diffs_from_last_commit(file_pattern)
+        for file_diff in file_diffs:
+            for change in DiffParser.get_file_repo_commit_changes(file_diff):
+                yield file_diff.file_name, change
+        return
+
+    commit, parent = git_util.get_last_commit_hashes()
+    parent = base or parent
+    content = None
+    if base and isinstance(index_storage, GitNoteStateStorage):
+        content = index_storage.read(base)
+    content = content or index_storage.read()
+    stored_index = ReferenceIndex.loads(content) if content else None
+    if stored_index and stored_index.commit == parent and stored_index.file_pattern == file_pattern:
+        logger.info(f'using the stored reference index of commit {parent}')
+        parent_index = stored_index
+    else:
+        parent_index = ReferenceIndex.build(git_util, parent, file_pattern, stored_index)
+
+    index = ReferenceIndex.build(git_util, commit, file_pattern, parent_index)
+    if save_index:
+        index_storage.write(index.dumps())
+    yield from index.get_changes(parent_index)
+
+
+def main(git_util: GitUtil, slack_notifier: Notifier, github_util: GitHubUtil,
+         environment_name: str, file_pattern: str, tag_name: str,
+         artifact_writer: Optional[ArtifactWriter] = None,
+         notification_state: Optional[NotificationState] = None, shard: Shard = Shard(),
+         index_storage: Optional[Union[FileStateStorage, GitNoteStateStorage]] = None,
+         lease: Optional[Lease] = None) -> None:
     """
     Handle the main execution of the script.
 
+    The Slack message is sent before any commits are tagged, so that it goes out on time when the GitHub deadline
+    is reached. Repositories which could not be resolved before the deadline, or whose requests timed out, link to
+    the comparison instead.
+
+    When a notification state is provided, changes which were already resolved, notified or tagged by a previous
+    run are not done again, and the state is saved after each step.
+
+    When the shard is one of several, only the changes of the shard are resolved and tagged, and no Slack message
+    is sent. The results are written to the artifact with their position among all changes, for aggregate.py to
+    merge into one message, so the run fails before doing any work when there is no artifact file. Changes which were
+    notified by a previous run are marked in the artifact, and aggregate.py records the changes it notified.
+
+    Pull requests shared by several repositories, for example when a shared library is rolled out to many services,
+    are listed once in a grouped block instead of in the block of each repository.
+
+    When a lease is provided, a run for a newer commit of the environment repository supersedes this run. The lease
+    is checked while resolving pull requests, before the Slack message is sent and before each tag, so a superseded
+    run stops its GitHub work and never moves a tag back. The run holding the lease covers every change since the
+    last notified run in one message, including the changes of the runs it superseded.
+
+    When the message reaches some sinks but not others, the changes are still recorded as notified and tagged, so a
+    re-run does not send them again to the sinks which got them, and the error is raised at the end of the run.
+
+    :param artifact_writer: Optionally write the results for downstream steps
+    :param notification_state: Optionally record the work done, to skip it when the job is re-run
+    :param shard: Optionally only handle the changes of one of several parallel jobs
+    :param index_storage: Optionally find the changes by comparing reference indexes kept between runs
+    :param lease: Optionally coordinate with overlapping runs for newer commits
+    :raises ValueError: if the shard is one of several and its results are not written to an artifact file
+    :raises SupersededError: if a run for a newer commit took the lease
+    :raises NotificationError: if the message could not be delivered to a sink
     :return: None
     """
-    file_diffs = git_util.get_file_diffs_from_last_commit(file_pattern)
-    if not file_diffs:
-        return
+    if shard.is_partial and not (artifact_writer and artifact_writer.has_artifact_file()):
+        raise ValueError(f'shard {shard.index} of {shard.count} needs an artifact file to pass its results to aggregate.py')
 
-    for file_diff in file_diffs:
-        for change in DiffParser.get_repo_commit_changes(file_diff.unified_diff):
-            pull_requests = github_util.get_pull_requests_between_refs(change.repository, change.old_commit,
-                                                                       change.new_commit)
+    base = lease.acquire() if lease else None
+    results: list[tuple[RepoCommitChange, list[PullRequest], dict[str, Union[str, int]]]] = []
+    repo_results: list[tuple[str, list[PullRequest], Optional[str]]] = []
+    fallback_count = 0
+    notification_error: Optional[NotificationError] = None
+    position = 0
 
-            summary = MessageFormatter.get_repo_pull_request_summary(repo_name=change.repository,
-                                                                     pull_requests=pull_requests)
-            slack_notifier.add_message_block(summary)
+    for file_name, change in _get_changes(git_util, file_pattern, index_storage, base=base):
+        position += 1
+        if not shard.includes(change):
+            continue
+        if lease:
+            lease.check()
 
-            if tag_name:
-                github_util.tag_commit(change.repository, change.new_commit, tag_name)
+        fields = {'file_name': file_name}
+        if shard.is_partial:
+            fields['position'] = position
+        try:
+            pull_requests = _resolve_change(github_util, change, notification_state)
+        except DeadlineExceededError as e:
+            logger.warning(f'{e}, linking to the comparison for repo:{change.repository}')
+            fallback_count += 1
+            pull_requests = []
+            fields['compare_url'] = github_util.get_compare_url(change.repository, change.old_commit,
+                                                                change.new_commit)
+
+        if notification_state and notification_state.is_notified(change):
+            logger.info(f'skipping repo:{change.repository} which was notified by a previous run')
+            fields['notified'] = True
+        elif not shard.is_partial:
+            repo_results.append((change.repository, pull_requests, fields.get('compare_url')))
+        results.append((change, pull_requests, fields))
+
+    for summary in MessageFormatter.get_summaries(repo_results):
+        slack_notifier.add_message_block(summary)
+
+    if notification_state:
+        notification_state.save()
+
+    if lease:
+        lease.check(force=True)
 
     if slack_notifier.has_messages():
         slack_notifier.add_message_block(MessageFormatter.get_message_header(environment_name), at_beginning=True)
-        slack_notifier.send_message()
+        if fallback_count:
+            slack_notifier.add_message_block(MessageFormatter.get_fallback_summary(fallback_count))
+        try:
+            slack_notifier.send_message()
+        except NotificationError as e:
+            if not e.delivered:
+                raise
+            logger.error(f'{e}, recording the changes as notified as it was delivered to: {", ".join(e.delivered)}')
+            notification_error = e
+
+        if notification_state:
+            for change, _, _ in results:
+                notification_state.set_notified(change)
+            notification_state.save()
+
+    if lease:
+        lease.set_notified()
+
+    try:
+        for change, pull_requests, fields in results:
+            tagged = None
+            if tag_name and notification_state and notification_state.is_tagged(change):
+                logger.info(f'skipping tag for repo:{change.repository} which was tagged by a previous run')
+                tagged = True
+            elif tag_name:
+                if lease:
+                    lease.check(force=True)
+                tagged = github_util.tag_commit(change.repository, change.new_commit, tag_name)
+                if tagged and notification_state:
+                    notification_state.set_tagged(change)
+
+            if artifact_writer:
+                artifact_writer.write_change(change, pull_requests, tagged, **fields)
+    finally:
+        if notification_state:
+            notification_state.save()
+
+    if lease:
+        lease.complete()
+
+    if notification_error:
+        raise notification_error
+
+
+def plan(git_util: GitUtil, github_util: GitHubUtil, file_pattern: str, tag_name: str,
+         shard: Shard = Shard(), index_storage: Optional[Union[FileStateStorage, GitNoteStateStorage]] = None) -> dict[str, int]:
+    """
+    Preview the GitHub API calls a run would make, without tagging commits or sending the Slack message.
+
+    The changes are parsed as in a run, but the refs are only compared to count their merge commits. Identical
+    ranges are only estimated once. The estimate is an upper bound, as merge commits shared between ranges are
+    counted for each range.
+
+    :param git_util: GitUtil for the environment repository
+    :param github_util: GitHubUtil to compare the refs
+    :param file_pattern: Regex pattern(s) to filter files, separated by newlines
+    :param tag_name: Tag which would be added to the source repositories
+    :param shard: Optionally only preview the changes of one of several parallel jobs
+    :param index_storage: Optionally find the changes from the stored reference index, without saving it
+    :return: estimated API calls to each endpoint
+    """
+    totals: dict[str, int] = {}
+    commit_ranges: set[tuple[str, str, str]] = set()
+
+    for _, change in _get_changes(git_util, file_pattern, index_storage, save_index=False):
+        commit_range = (change.repository, change.old_commit, change.new_commit)
+        if not shard.includes(change) or commit_range in commit_ranges:
+            continue
+        commit_ranges.add(commit_range)
+
+        strategy, endpoints = github_util.plan_pull_requests_between_refs(*commit_range)
+        logger.info(f'plan: repo:{change.repository} {change.old_commit}...{change.new_commit} '
+                    f'using {strategy}: {endpoints}')
+        if tag_name:
+            logger.info(f'plan: would tag commit:{change.new_commit} in repo:{change.repository} '
+                        f'with tag:{tag_name}')
+            for endpoint, calls in github_util.plan_tag_commit(change.repository).items():
+                endpoints[endpoint] = endpoints.get(endpoint, 0) + calls
+
+        for endpoint, calls in endpoints.items():
+            totals[endpoint] = totals.get(endpoint, 0) + calls
+
+    for endpoint, calls in sorted(totals.items()):
+        logger.info(f'plan: {calls} calls to {endpoint}')
+    total_calls = sum(totals.values())
+    rate_limit_remaining = github_util.get_rate_limit_remaining()
+    logger.info(f'plan: {len(commit_ranges)} ranges, {total_calls} API calls estimated, '
+                f'{rate_limit_remaining} calls left in the rate limit')
+    if rate_limit_remaining is not None and total_calls > rate_limit_remaining:
+        logger.warning(f'plan: the estimated {total_calls} API calls exceed the {rate_limit_remaining} calls left '
+                       'in the rate limit')
+    return totals
 
 
 if __name__ == '__main__':
-    main(git_util=GitUtil(),
-         slack_notifier=SlackNotifier(webhook_url=os.getenv('SLACK_WEBHOOK')),
-         github_util=GitHubUtil(access_token=os.getenv('TOKEN'), organization_name=os.getenv('ORGANIZATION')),
-         environment_name=os.getenv('ENVIRONMENT'),
-         file_pattern=os.getenv('FILE_PATTERN'),
-         tag_name=os.getenv('TAG_NAME'))
+    environment_git_util = GitUtil()
+    token_provider = None
+    if os.getenv('APP_ID'):
+        token_provider = AppTokenProvider(app_id=os.getenv('APP_ID'),
+                                          private_key=os.getenv('APP_PRIVATE_KEY'),
+                                          installation_id=os.getenv('APP_INSTALLATION_ID'),
+                                          organization_name=os.getenv('ORGANIZATION'),
+                                          request_timeout=int(os.getenv('REQUEST_TIMEOUT') or 0) or None)
+    environment_github_util = GitHubUtil(access_token=os.getenv('TOKEN'),
+                                         organization_name=os.getenv('ORGANIZATION'),
+                                         request_timeout=int(os.getenv('REQUEST_TIMEOUT') or 0) or None,
+                                         deadline=Deadline(seconds=float(os.getenv('DEADLINE') or 0) or None),
+                                         strategy=os.getenv('LOOKUP_STRATEGY') or STRATEGY_COMMIT,
+                                         token_provider=token_provider)
+    environment_shard = Shard(index=int(os.getenv('SHARD_INDEX') or 0), count=int(os.getenv('SHARD_COUNT') or 1))
+    environment_index_storage = None
+    if os.getenv('INDEX_FILE'):
+        environment_index_storage = FileStateStorage(os.getenv('INDEX_FILE'))
+    elif os.getenv('INDEX_GIT_NOTES') == 'true':
+        environment_index_storage = GitNoteStateStorage(environment_git_util, notes_ref='release-notes-index',
+                                                        read_commit='HEAD~1')
+    environment_lease_storage = None
+    if os.getenv('LEASE_FILE'):
+        environment_lease_storage = FileLeaseStorage(os.getenv('LEASE_FILE'))
+    elif os.getenv('LEASE_GIT_REF') == 'true':
+        environment_lease_storage = GitRefLeaseStorage(environment_git_util, os.getenv('ENVIRONMENT'))
+
+    if os.getenv('PLAN') == 'true':
+        plan(git_util=environment_git_util,
+             github_util=environment_github_util,
+             file_pattern=os.getenv('FILE_PATTERN'),
+             tag_name=os.getenv('TAG_NAME'),
+             shard=environment_shard,
+             index_storage=environment_index_storage)
+    else:
+        with ArtifactWriter(artifact_file=os.getenv('ARTIFACT_FILE'),
+                            markdown_file=os.getenv('GITHUB_STEP_SUMMARY') if os.getenv('JOB_SUMMARY') == 'true' else None,
+                            environment_name=os.getenv('ENVIRONMENT')) as writer:
+            state_storage = None
+            if os.getenv('STATE_FILE'):
+                state_storage = FileStateStorage(os.getenv('STATE_FILE'))
+            elif os.getenv('STATE_GIT_NOTES') == 'true':
+                state_storage = GitNoteStateStorage(environment_git_util)
+
+            notifier = create_notifier(slack_webhooks=os.getenv('SLACK_WEBHOOK'),
+                                       teams_webhooks=os.getenv('TEAMS_WEBHOOK'),
+                                       webhook_urls=os.getenv('WEBHOOK_URL'),
+                                       timeout=float(os.getenv('NOTIFY_TIMEOUT') or DEFAULT_TIMEOUT),
+                                       retries=int(os.getenv('NOTIFY_RETRIES') or 2))
+            environment_commit = environment_git_util.get_last_commit_hashes()[0]
+            arguments = {
+                'git_util': environment_git_util,
+                'slack_notifier': notifier,
+                'github_util': environment_github_util,
+                'environment_name': os.getenv('ENVIRONMENT'),
+                'file_pattern': os.getenv('FILE_PATTERN'),
+                'tag_name': os.getenv('TAG_NAME'),
+                'artifact_writer': writer,
+                'notification_state': NotificationState(state_storage, os.getenv('ENVIRONMENT'),
+                                                        environment_commit) if state_storage else None,
+                'shard': environment_shard,
+                'index_storage': environment_index_storage,
+                'lease': Lease(environment_lease_storage, environment_git_util,
+                               environment_commit) if environment_lease_storage else None
+            }
+            try:
+                if os.getenv('PROFILE_DIR'):
+                    Profiler(output_dir=os.getenv('PROFILE_DIR')).run(main, **arguments)
+                else:
+                    main(**arguments)
+            except SupersededError as e:
+                logger.warning(f'stopping this run: {e}')
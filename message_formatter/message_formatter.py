@@ -1,6 +1,11 @@
 """Provides functionality for formatting the notification message."""
+from typing import Optional
+
 from github_util.pull_request import PullRequest
 
+# leaves room for the pull requests within the 3000 character limit of a Slack block
+_MAX_GROUPED_NAMES_LENGTH = 1000
+
 
 class MessageFormatter:
     """Provides functionality for formatting the notification message."""
@@ -28,3 +33,118 @@ class MessageFormatter:
         for pull_request in pull_requests:
             summary += f'\n \t • *<{pull_request.url}|{pull_request.title}>* #{pull_request.number}'
         return summary
+
+    @staticmethod
+    def get_grouped_pull_request_summary(repo_names: list[str], pull_requests: list[PullRequest]) -> str:
+        """
+        Get a summary of the pull requests shared by several repositories, listing them once.
+
+        The pull requests come first, so they are kept when a block for many repositories is truncated, and the
+        names of the repositories are listed after them up to a length, counting the ones left out.
+
+        :param repo_names: Names of the repositories sharing the pull requests
+        :param pull_requests: List of the shared pull request information
+        :return:
+        """
+        names: list[str] = []
+        length = 0
+        for repo_name in repo_names:
+            length += len(repo_name) + 2
+            if length > _MAX_GROUPED_NAMES_LENGTH:
+                break
+            names.append(repo_name)
+        if len(names) < len(repo_names):
+            names.append(f'and {len(repo_names) - len(names)} more')
+
+        summary = MessageFormatter.get_repo_pull_request_summary(f'{len(repo_names)} repositories', pull_requests)
+        return f'{summary}\n{", ".join(names)}'
+
+    @staticmethod
+    def get_summaries(repo_results: list[tuple[str, list[PullRequest], Optional[str]]]) -> list[str]:
+        """
+        Get the summaries of the repositories, grouping the pull requests shared between repositories.
+
+        Pull requests are the same when their URL and number are. A pull request found in several repositories is
+        listed once, in a grouped summary of all the repositories sharing it, placed where the first of them is.
+        Each repository only lists the pull requests it does not share, and is left out when it has none left.
+        Identical summaries, for example the same range in several files, are only added once.
+
+        :param repo_results: Name, pull requests and, when they were not resolved, compare URL of each repository
+        :return:
+        """
+        first_pull_requests: dict[tuple[str, int], PullRequest] = {}
+        repos_by_pull_request: dict[tuple[str, int], list[str]] = {}
+        for repo_name, pull_requests, _ in repo_results:
+            for pull_request in pull_requests:
+                key = (pull_request.url, pull_request.number)
+                first_pull_requests.setdefault(key, pull_request)
+                repo_names = repos_by_pull_request.setdefault(key, [])
+                if repo_name not in repo_names:
+                    repo_names.append(repo_name)
+
+        groups: dict[tuple[str, ...], list[PullRequest]] = {}
+        for key, repo_names in repos_by_pull_request.items():
+            if len(repo_names) > 1:
+                groups.setdefault(tuple(repo_names), []).append(first_pull_requests[key])
+
+        summaries: list[str] = []
+        for repo_name, pull_requests, compare_url in repo_results:
+            own_pull_requests = [
+                pull_request for pull_request in pull_requests
+                if len(repos_by_pull_request[(pull_request.url, pull_request.number)]) == 1
+            ]
+            if compare_url:
+                summaries.append(MessageFormatter.get_repo_compare_summary(repo_name, compare_url))
+            elif own_pull_requests or not pull_requests:
+                summaries.append(MessageFormatter.get_repo_pull_request_summary(repo_name, own_pull_requests))
+            summaries.extend(
+                MessageFormatter.get_grouped_pull_request_summary(list(repo_names), group)
+                for repo_names, group in groups.items() if repo_names[0] == repo_name
+            )
+        return list(dict.fromkeys(summaries))
+
+    @staticmethod
+    def get_repo_compare_summary(repo_name: str, compare_url: str) -> str:
+        """
+        Get a summary for the repository linking to the comparison, used when the pull requests were not resolved.
+
+        :param repo_name: Name of the repository.
+        :param compare_url: URL of the page comparing the old and new commits
+        :return:
+        """
+        return f'{repo_name}\n \t • *<{compare_url}|Compare changes>*'
+
+    @staticmethod
+    def get_fallback_summary(fallback_count: int) -> str:
+        """
+        Get a note saying how many repositories link to the comparison instead of listing pull requests.
+
+        :param fallback_count: Number of repositories which were not resolved in time
+        :return:
+        """
+        repositories = 'repository' if fallback_count == 1 else 'repositories'
+        return f'_{fallback_count} {repositories} could not be resolved in time and link to the comparison instead_'
+
+    @staticmethod
+    def get_markdown_header(environment_name: str) -> str:
+        """
+        Get the Markdown header for the job summary.
+
+        :param environment_name: Name of the environment being updated
+        :return:
+        """
+        return f'## {MessageFormatter.get_message_header(environment_name)}\n\n'
+
+    @staticmethod
+    def get_repo_pull_request_markdown(repo_name: str, pull_requests: list[PullRequest]) -> str:
+        """
+        Get a Markdown section with each pull request for the repository.
+
+        :param repo_name: Name of the repository.
+        :param pull_requests: List of pull request information
+        :return:
+        """
+        summary = f'### {repo_name}\n'
+        for pull_request in pull_requests:
+            summary += f'- [{pull_request.title}]({pull_request.url}) #{pull_request.number}\n'
+        return f'{summary}\n'
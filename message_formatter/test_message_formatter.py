@@ -1,10 +1,12 @@
 """Provides tests for the message formatter."""
 import unittest
+from unittest.mock import MagicMock
 
 from typing_extensions import Self
 
 from github_util.pull_request import PullRequest
 from message_formatter.message_formatter import MessageFormatter
+from slack_notifier.slack_notifier import SlackNotifier
 
 
 class TestMessageFormatter(unittest.TestCase):
@@ -30,3 +32,96 @@ class TestMessageFormatter(unittest.TestCase):
             'The Dev environment has been updated',
             MessageFormatter.get_message_header('Dev')
         )
+
+    def test_get_markdown_header(self: Self) -> None:
+        """The Markdown header should be formatted correctly."""
+        self.assertEqual(
+            '## The Dev environment has been updated\n\n',
+            MessageFormatter.get_markdown_header('Dev')
+        )
+
+    def test_get_repo_pull_request_markdown(self: Self) -> None:
+        """The Markdown pull request summary should be formatted correctly."""
+        summary = MessageFormatter.get_repo_pull_request_markdown('repo1', [
+            PullRequest(title='Pull Request 1', number=1, url='http://example.com/pr1'),
+            PullRequest(title='Pull Request 2', number=2, url='http://example.com/pr2'),
+        ])
+
+        expected = (
+            '### repo1\n'
+            '- [Pull Request 1](http://example.com/pr1) #1\n'
+            '- [Pull Request 2](http://example.com/pr2) #2\n'
+            '\n'
+        )
+        self.assertEqual(expected, summary)
+
+    def test_get_repo_compare_summary(self: Self) -> None:
+        """The compare summary should link to the comparison."""
+        self.assertEqual(
+            'repo1\n \t • *<https://github.com/org/repo1/compare/a...b|Compare changes>*',
+            MessageFormatter.get_repo_compare_summary('repo1', 'https://github.com/org/repo1/compare/a...b')
+        )
+
+    def test_get_fallback_summary(self: Self) -> None:
+        """The fallback summary should include the number of repositories."""
+        self.assertEqual(
+            '_1 repository could not be resolved in time and link to the comparison instead_',
+            MessageFormatter.get_fallback_summary(1)
+        )
+        self.assertEqual(
+            '_3 repositories could not be resolved in time and link to the comparison instead_',
+            MessageFormatter.get_fallback_summary(3)
+        )
+
+    def test_get_grouped_pull_request_summary(self: Self) -> None:
+        """The grouped summary should list the repositories sharing the pull requests."""
+        summary = MessageFormatter.get_grouped_pull_request_summary(['repo1', 'repo2'], [
+            PullRequest(title='Pull Request 45', number=45, url='http://example.com/pr45')
+        ])
+        self.assertEqual('2 repositories\n \t • *<http://example.com/pr45|Pull Request 45>* #45\nrepo1, repo2', summary)
+
+    def test_get_grouped_pull_request_summary_with_many_repositories(self: Self) -> None:
+        """The shared pull requests should fit in a Slack block when hundreds of repositories share them."""
+        slack_client = MagicMock()
+        slack_client.send.return_value.status_code = 200
+        notifier = SlackNotifier('', slack_client)
+        pull_requests = [
+            PullRequest(title=f'Bump base image {number}', number=number, url=f'https://github.com/org/base/pull/{number}')
+            for number in (45, 46)
+        ]
+
+        notifier.add_message_block(MessageFormatter.get_grouped_pull_request_summary(
+            [f'platform-service-{index:03}' for index in range(300)], pull_requests
+        ))
+        notifier.send_message()
+
+        text = slack_client.send.call_args.kwargs['blocks'][0]['text']['text']
+        self.assertLessEqual(len(text), 3000)
+        self.assertTrue(text.startswith('300 repositories\n \t • *<https://github.com/org/base/pull/45|Bump base image 45>* #45\n'
+                                        ' \t • *<https://github.com/org/base/pull/46|Bump base image 46>* #46\n'
+                                        'platform-service-000, platform-service-001'))
+        self.assertTrue(text.endswith('platform-service-044, and 255 more'))
+
+    def test_get_summaries(self: Self) -> None:
+        """Pull requests shared between repositories should be listed once in a grouped summary."""
+        shared_1 = PullRequest(title='Bump base image', number=45, url='http://example.com/lib/pr45')
+        shared_2 = PullRequest(title='Bump library', number=46, url='http://example.com/lib/pr46')
+        own = PullRequest(title='Fix service', number=7, url='http://example.com/svc3/pr7')
+
+        summaries = MessageFormatter.get_summaries([
+            ('svc1', [shared_1, shared_2], None),
+            ('svc2', [shared_1, shared_2], None),
+            ('svc3', [shared_2, own], None),
+            ('svc4', [], 'https://github.com/org/svc4/compare/a...b'),
+            ('svc2', [shared_1, shared_2], None),
+            ('svc5', [], None)
+        ])
+
+        expected = [
+            '2 repositories\n \t • *<http://example.com/lib/pr45|Bump base image>* #45\nsvc1, svc2',
+            '3 repositories\n \t • *<http://example.com/lib/pr46|Bump library>* #46\nsvc1, svc2, svc3',
+            'svc3\n \t • *<http://example.com/svc3/pr7|Fix service>* #7',
+            'svc4\n \t • *<https://github.com/org/svc4/compare/a...b|Compare changes>*',
+            'svc5'
+        ]
+        self.assertEqual(expected, summaries)
@@ -0,0 +1 @@
+"""Package for notification_state."""
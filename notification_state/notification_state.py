@@ -0,0 +1,139 @@
+"""Records the work already done for each change so that a re-run only does what remains."""
+import dataclasses
+import json
+import logging
+from typing import Optional, Union
+
+from typing_extensions import Self
+
+from diff_parser.repo_commit_change import RepoCommitChange
+from github_util.pull_request import PullRequest
+from notification_state.state_storage import FileStateStorage, GitNoteStateStorage
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationState:
+    """
+    Records the work already done for each change so that a re-run only does what remains.
+
+    A record is kept for each (environment, repository, new commit) with the resolved pull requests and whether
+    the commit was tagged and included in a notification. The pull requests are only reused for the same old
+    commit, so a range which starts earlier is resolved again.
+
+    When the commit of the environment repository is given, the records are kept for that commit only: the records
+    of the environment written for other commits are dropped when the state is loaded. A re-run only needs the
+    records of its own commit, the state does not grow with every run, and a later commit of the environment which
+    deploys a commit seen before, for example after a rollback, is notified and tagged again.
+    """
+
+    def __init__(self: Self, storage: Union[FileStateStorage, GitNoteStateStorage], environment_name: str,
+                 commit: Optional[str] = None) -> None:
+        """
+        Initialize the NotificationState and load the stored records.
+
+        :param storage: where the state is stored
+        :param environment_name: Name of the environment being updated
+        :param commit: Optionally the commit of the environment repository, to drop the records of other commits
+        """
+        self._storage = storage
+        self._environment_name = environment_name
+        self._commit = commit
+        self._records: dict[str, dict] = {}
+
+        content = storage.read()
+        if content:
+            self._records = json.loads(content)
+            logger.info(f'loaded notification state with {len(self._records)} records')
+        if commit:
+            self._records = {
+                key: record for key, record in self._records.items()
+                if not key.startswith(f'{environment_name}/') or record.get('commit') == commit
+            }
+
+    def _get_key(self: Self, change: RepoCommitChange) -> str:
+        """
+        Get the key of the record for a change.
+
+        :param change: repository commit change
+        :return: record key
+        """
+        return f'{self._environment_name}/{change.repository}/{change.new_commit}'
+
+    def _get_record(self: Self, change: RepoCommitChange) -> dict:
+        """
+        Get the record for a change, creating it if needed.
+
+        :param change: repository commit change
+        :return: record
+        """
+        return self._records.setdefault(self._get_key(change), {'commit': self._commit} if self._commit else {})
+
+    def get_pull_requests(self: Self, change: RepoCommitChange) -> Optional[list[PullRequest]]:
+        """
+        Get the pull requests already resolved for a change.
+
+        :param change: repository commit change
+        :return: list of pull requests, or None if the change was not resolved yet
+        """
+        record = self._records.get(self._get_key(change), {})
+        pull_requests = record.get('pull_requests')
+        if pull_requests is None or record.get('old_commit', change.old_commit) != change.old_commit:
+            return None
+        return [PullRequest(**pull_request) for pull_request in pull_requests]
+
+    def set_pull_requests(self: Self, change: RepoCommitChange, pull_requests: list[PullRequest]) -> None:
+        """
+        Record the pull requests resolved for a change.
+
+        :param change: repository commit change
+        :param pull_requests: list of pull requests
+        :return: None
+        """
+        record = self._get_record(change)
+        record['old_commit'] = change.old_commit
+        record['pull_requests'] = [dataclasses.asdict(pull_request) for pull_request in pull_requests]
+
+    def is_notified(self: Self, change: RepoCommitChange) -> bool:
+        """
+        Check if a change was already included in a notification.
+
+        :param change: repository commit change
+        :return: True if the change was notified
+        """
+        return self._records.get(self._get_key(change), {}).get('notified', False)
+
+    def set_notified(self: Self, change: RepoCommitChange) -> None:
+        """
+        Record that a change was included in a notification.
+
+        :param change: repository commit change
+        :return: None
+        """
+        self._get_record(change)['notified'] = True
+
+    def is_tagged(self: Self, change: RepoCommitChange) -> bool:
+        """
+        Check if the new commit of a change was already tagged.
+
+        :param change: repository commit change
+        :return: True if the commit was tagged
+        """
+        return self._records.get(self._get_key(change), {}).get('tagged', False)
+
+    def set_tagged(self: Self, change: RepoCommitChange) -> None:
+        """
+        Record that the new commit of a change was tagged.
+
+        :param change: repository commit change
+        :return: None
+        """
+        self._get_record(change)['tagged'] = True
+
+    def save(self: Self) -> None:
+        """
+        Write the records to the storage.
+
+        :return: None
+        """
+        self._storage.write(json.dumps(self._records, indent=2, sort_keys=True))
@@ -0,0 +1,77 @@
+"""Provides storage for the notification state in a local file or in a git note on the environment repository."""
+import logging
+from pathlib import Path
+from typing import Optional
+
+from typing_extensions import Self
+
+from git_util.git_util import GitUtil
+
+logger = logging.getLogger(__name__)
+
+
+class FileStateStorage:
+    """Stores the notification state in a local file."""
+
+    def __init__(self: Self, path: str) -> None:
+        """
+        Initialize the FileStateStorage.
+
+        :param path: path of the state file
+        """
+        self._path = Path(path)
+
+    def read(self: Self) -> Optional[str]:
+        """
+        Read the state.
+
+        :return: stored state, or None if nothing is stored yet
+        """
+        if not self._path.exists():
+            return None
+        return self._path.read_text()
+
+    def write(self: Self, content: str) -> None:
+        """
+        Write the state.
+
+        :param content: state to store
+        :return: None
+        """
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._path.write_text(content)
+
+
+class GitNoteStateStorage:
+    """Stores the notification state in a git note on the last commit of the environment repository."""
+
+    def __init__(self: Self, git_util: GitUtil, notes_ref: str = 'release-notes-state', read_commit: str = 'HEAD') -> None:
+        """
+        Initialize the GitNoteStateStorage.
+
+        :param git_util: GitUtil for the environment repository
+        :param notes_ref: name of the notes ref
+        :param read_commit: commit whose note is read, for example HEAD~1 to read what the run of the previous commit
+            wrote. The note is always written to the last commit.
+        """
+        self._git_util = git_util
+        self._notes_ref = notes_ref
+        self._read_commit = read_commit
+
+    def read(self: Self, commit: Optional[str] = None) -> Optional[str]:
+        """
+        Read the state.
+
+        :param commit: Optionally read the note of this commit instead of the read commit
+        :return: stored state, or None if nothing is stored yet
+        """
+        return self._git_util.read_note(self._notes_ref, commit or self._read_commit)
+
+    def write(self: Self, content: str) -> None:
+        """
+        Write the state.
+
+        :param content: state to store
+        :return: None
+        """
+        self._git_util.write_note(self._notes_ref, content)
@@ -0,0 +1,91 @@
+"""Provides tests for the NotificationState."""
+import json
+import unittest
+from unittest.mock import MagicMock
+
+from typing_extensions import Self
+
+from diff_parser.repo_commit_change import RepoCommitChange
+from github_util.pull_request import PullRequest
+from notification_state.notification_state import NotificationState
+
+
+class TestNotificationState(unittest.TestCase):
+    """Provides tests for the NotificationState."""
+
+    def setUp(self: Self) -> None:
+        """Set up a change and an empty storage."""
+        self.storage = MagicMock()
+        self.storage.read.return_value = None
+        self.change = RepoCommitChange(repository='test-repo-1', old_commit='abc11', new_commit='abc12')
+        self.pull_requests = [PullRequest(title='Pull Request 1', number=1, url='https://foo.com/1')]
+
+    def test_notification_state_without_records(self: Self) -> None:
+        """Nothing should be recorded for a change which was never processed."""
+        state = NotificationState(self.storage, 'Dev')
+        self.assertIsNone(state.get_pull_requests(self.change))
+        self.assertFalse(state.is_notified(self.change))
+        self.assertFalse(state.is_tagged(self.change))
+
+    def test_notification_state_save_and_load(self: Self) -> None:
+        """The recorded work should be available after saving and loading the state."""
+        state = NotificationState(self.storage, 'Dev')
+        state.set_pull_requests(self.change, self.pull_requests)
+        state.set_notified(self.change)
+        state.set_tagged(self.change)
+        state.save()
+
+        content = self.storage.write.call_args.args[0]
+        self.assertEqual(
+            {
+                'Dev/test-repo-1/abc12': {
+                    'notified': True,
+                    'old_commit': 'abc11',
+                    'pull_requests': [{'number': 1, 'title': 'Pull Request 1', 'url': 'https://foo.com/1'}],
+                    'tagged': True
+                }
+            },
+            json.loads(content)
+        )
+
+        self.storage.read.return_value = content
+        state = NotificationState(self.storage, 'Dev')
+        self.assertEqual(self.pull_requests, state.get_pull_requests(self.change))
+        self.assertTrue(state.is_notified(self.change))
+        self.assertTrue(state.is_tagged(self.change))
+
+    def test_notification_state_with_other_environment(self: Self) -> None:
+        """Records should be kept separately for each environment."""
+        state = NotificationState(self.storage, 'Dev')
+        state.set_notified(self.change)
+        state.save()
+
+        self.storage.read.return_value = self.storage.write.call_args.args[0]
+        self.assertFalse(NotificationState(self.storage, 'QA').is_notified(self.change))
+
+    def test_notification_state_with_wider_range(self: Self) -> None:
+        """The pull requests resolved for a range should not be reused for a range starting at another commit."""
+        state = NotificationState(self.storage, 'Dev')
+        state.set_pull_requests(self.change, self.pull_requests)
+
+        wider = RepoCommitChange(repository='test-repo-1', old_commit='abc10', new_commit='abc12')
+        self.assertIsNone(state.get_pull_requests(wider))
+
+    def test_notification_state_with_environment_commit(self: Self) -> None:
+        """Only the records of the environment commit should be kept, so a later rollout of a commit is handled again."""
+        state = NotificationState(self.storage, 'QA', 'env0')
+        state.set_notified(self.change)
+        state.save()
+        self.storage.read.return_value = self.storage.write.call_args.args[0]
+        state = NotificationState(self.storage, 'Dev', 'env1')
+        state.set_notified(self.change)
+        state.set_tagged(self.change)
+        state.save()
+        self.storage.read.return_value = self.storage.write.call_args.args[0]
+
+        self.assertTrue(NotificationState(self.storage, 'Dev', 'env1').is_notified(self.change))
+        state = NotificationState(self.storage, 'Dev', 'env3')
+        self.assertFalse(state.is_notified(self.change))
+        self.assertFalse(state.is_tagged(self.change))
+        state.save()
+        self.assertEqual(['QA/test-repo-1/abc12'], list(json.loads(self.storage.write.call_args.args[0])))
@@ -0,0 +1,42 @@
+"""Provides tests for the state storage."""
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from typing_extensions import Self
+
+from notification_state.state_storage import FileStateStorage, GitNoteStateStorage
+
+
+class TestStateStorage(unittest.TestCase):
+    """Provides tests for the state storage."""
+
+    def test_file_state_storage(self: Self) -> None:
+        """The state should be written to and read from the file."""
+        with tempfile.TemporaryDirectory() as directory:
+            storage = FileStateStorage(str(Path(directory) / 'state' / 'dev.json'))
+            self.assertIsNone(storage.read())
+            storage.write('{}')
+            self.assertEqual('{}', storage.read())
+
+    def test_git_note_state_storage(self: Self) -> None:
+        """The state should be written to and read from the git note."""
+        git_util = MagicMock()
+        git_util.read_note.return_value = '{}'
+        storage = GitNoteStateStorage(git_util, notes_ref='test-ref')
+
+        self.assertEqual('{}', storage.read())
+        storage.write('{"foo": 1}')
+        git_util.read_note.assert_called_once_with('test-ref', 'HEAD')
+        git_util.write_note.assert_called_once_with('test-ref', '{"foo": 1}')
+
+    def test_git_note_state_storage_with_read_commit(self: Self) -> None:
+        """The note of the read commit should be read, and the note of the last commit written."""
+        git_util = MagicMock()
+        storage = GitNoteStateStorage(git_util, notes_ref='test-ref', read_commit='HEAD~1')
+
+        storage.read()
+        storage.write('{}')
+        git_util.read_note.assert_called_once_with('test-ref', 'HEAD~1')
+        git_util.write_note.assert_called_once_with('test-ref', '{}')
@@ -0,0 +1,104 @@
+"""Provides the interface of the sinks the notification message is delivered to."""
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from typing_extensions import Self
+
+# seconds to wait for a sink to accept the message, as the Slack WebhookClient does by default
+DEFAULT_TIMEOUT = 30.0
+# statuses of a sink which did not accept the message but may accept it when it is sent again
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class NotificationError(Exception):
+    """Raised when the notification message could not be delivered to a sink."""
+
+    def __init__(self: Self, message: str, delivered: Optional[list[str]] = None) -> None:
+        """
+        Initialize the NotificationError.
+
+        :param message: description of the failed deliveries
+        :param delivered: names of the sinks the message was delivered to nonetheless
+        """
+        super().__init__(message)
+        self.delivered = delivered or []
+
+
+class RejectedError(Exception):
+    """Raised when a sink responds to the message with an error status."""
+
+    def __init__(self: Self, message: str, status_code: int) -> None:
+        """
+        Initialize the RejectedError.
+
+        :param message: description of the response
+        :param status_code: HTTP status of the response
+        """
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class Notifier(ABC):
+    """
+    Provides the interface of the sinks the notification message is delivered to.
+
+    The message is added as blocks of Slack mrkdwn text, as rendered by MessageFormatter. Each sink converts the
+    blocks to its own format when the message is sent.
+    """
+
+    def __init__(self: Self, name: str) -> None:
+        """
+        Initialize the Notifier.
+
+        :param name: Name of the sink used when reporting the delivery
+        """
+        self.name = name
+        self._messages: list[str] = []
+
+    def add_message_block(self: Self, message: str, at_beginning: bool = False) -> None:
+        """
+        Add a message block to be sent.
+
+        :param message: text of the message
+        :param at_beginning: If true, add the message to the beginning (a header for example)
+        :return: None
+        """
+        if not message:
+            return
+
+        if at_beginning:
+            self._messages.insert(0, message)
+        else:
+            self._messages.append(message)
+
+    def has_messages(self: Self) -> bool:
+        """
+        Check if there are messages to send.
+
+        :return: True if there are messages, False otherwise
+        """
+        return len(self._messages) > 0
+
+    @abstractmethod
+    def send_message(self: Self) -> None:
+        """
+        Send the message blocks to the sink.
+
+        :raises Exception: if the message could not be delivered
+        :return: None
+        """
+
+    def is_retryable(self: Self, error: Exception) -> bool:
+        """
+        Check if the message can be sent again after an attempt failed, without risking a duplicate message.
+
+        Only failures before the sink accepted the message are retried: the connection could not be made, or the
+        sink rejected the message with a status which may pass. A timeout while waiting for the response is not
+        retried, as the sink may have accepted the message already.
+
+        :param error: error of the failed attempt
+        :return: True if the attempt can be retried
+        """
+        if isinstance(error, RejectedError):
+            return error.status_code in RETRY_STATUSES
+        return isinstance(error, ConnectionError)
@@ -0,0 +1,160 @@
+"""Delivers the notification message to several sinks concurrently."""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from typing_extensions import Self
+
+from notifier.notifier import DEFAULT_TIMEOUT, NotificationError, Notifier
+from notifier.teams_notifier import TeamsNotifier
+from notifier.webhook_notifier import WebhookNotifier
+from slack_notifier.slack_notifier import SlackNotifier
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class DeliveryResult:
+    """Represents the delivery of the message to one sink."""
+
+    name: str
+    success: bool
+    latency: float
+    attempts: int
+    error: Optional[str] = None
+
+
+class NotifierGroup(Notifier):
+    """
+    Delivers the notification message to several sinks concurrently.
+
+    Each message block is rendered once and added to every sink. When the message is sent, each sink is delivered
+    to in its own thread and retried on its own, so a slow or failing sink does not hold up the others. The sinks
+    time out through their own request timeouts.
+    """
+
+    def __init__(self: Self, notifiers: list[Notifier], retries: int = 2, retry_delay: float = 1.0,
+                 sleep: Callable[[float], None] = time.sleep, clock: Callable[[], float] = time.monotonic) -> None:
+        """
+        Initialize the NotifierGroup.
+
+        :param notifiers: sinks to deliver the message to
+        :param retries: number of times to retry a sink after a failed attempt
+        :param retry_delay: seconds to wait before the first retry, doubled for each further retry
+        :param sleep: Optionally inject a function to wait between retries
+        :param clock: Optionally inject a clock returning seconds, to measure the latency of each sink
+        """
+        super().__init__('group')
+        self.notifiers = notifiers
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.sleep = sleep
+        self.clock = clock
+        self.results: list[DeliveryResult] = []
+
+    def add_message_block(self: Self, message: str, at_beginning: bool = False) -> None:
+        """
+        Add a message block to be sent to every sink.
+
+        :param message: text of the message
+        :param at_beginning: If true, add the message to the beginning (a header for example)
+        :return: None
+        """
+        for notifier in self.notifiers:
+            notifier.add_message_block(message, at_beginning)
+
+    def has_messages(self: Self) -> bool:
+        """
+        Check if there are messages to send to any sink.
+
+        :return: True if there are messages, False otherwise
+        """
+        return any(notifier.has_messages() for notifier in self.notifiers)
+
+    def send_message(self: Self) -> None:
+        """
+        Send the message to every sink concurrently and report the latency and success of each.
+
+        :raises NotificationError: if the message could not be delivered to a sink after the retries, with the sinks
+            it was delivered to
+        :return: None
+        """
+        if not self.notifiers:
+            return
+
+        with ThreadPoolExecutor(max_workers=len(self.notifiers), thread_name_prefix='notifier') as executor:
+            self.results = list(executor.map(self._deliver, self.notifiers))
+
+        for result in self.results:
+            if result.success:
+                logger.info(f'delivered message to {result.name} in {result.latency:.2f}s '
+                            f'({result.attempts} attempts)')
+            else:
+                logger.error(f'failed to deliver message to {result.name} after {result.latency:.2f}s '
+                             f'({result.attempts} attempts): {result.error}')
+
+        failed = [result.name for result in self.results if not result.success]
+        if failed:
+            delivered = [result.name for result in self.results if result.success]
+            raise NotificationError(f'message could not be delivered to: {", ".join(failed)}', delivered=delivered)
+
+    def _deliver(self: Self, notifier: Notifier) -> DeliveryResult:
+        """
+        Send the message to one sink, retrying failed attempts with an exponential backoff.
+
+        Only attempts which failed before the sink accepted the message are retried, so a sink which accepted the
+        message but did not respond in time does not get it twice.
+
+        :param notifier: sink to deliver the message to
+        :return: result of the delivery
+        """
+        start = self.clock()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                notifier.send_message()
+            except Exception as exception:
+                error = f'{type(exception).__name__}: {exception}'
+                logger.warning(f'attempt {attempt} to deliver message to {notifier.name} failed: {error}')
+                if attempt > self.retries or not notifier.is_retryable(exception):
+                    return DeliveryResult(name=notifier.name, success=False, latency=self.clock() - start,
+                                          attempts=attempt, error=error)
+                self.sleep(self.retry_delay * 2 ** (attempt - 1))
+            else:
+                return DeliveryResult(name=notifier.name, success=True, latency=self.clock() - start, attempts=attempt)
+
+
+def _split(urls: Optional[str]) -> list[str]:
+    """
+    Split newline separated URLs.
+
+    :param urls: newline separated URLs
+    :return: list of URLs
+    """
+    return [url.strip() for url in (urls or '').splitlines() if url.strip()]
+
+
+def create_notifier(slack_webhooks: Optional[str], teams_webhooks: Optional[str] = None,
+                    webhook_urls: Optional[str] = None, timeout: float = DEFAULT_TIMEOUT,
+                    retries: int = 2) -> NotifierGroup:
+    """
+    Create a group of the sinks configured for the environment.
+
+    :param slack_webhooks: Slack webhook URLs, newline separated for several channels
+    :param teams_webhooks: Teams webhook URLs, newline separated
+    :param webhook_urls: generic webhook URLs, newline separated
+    :param timeout: timeout in seconds for the request to each sink
+    :param retries: number of times to retry a sink after a failed attempt
+    :return: group of the sinks
+    """
+    notifiers: list[Notifier] = []
+    for index, url in enumerate(_split(slack_webhooks), start=1):
+        notifiers.append(SlackNotifier(url, name=f'slack-{index}', timeout=timeout))
+    for index, url in enumerate(_split(teams_webhooks), start=1):
+        notifiers.append(TeamsNotifier(url, name=f'teams-{index}', timeout=timeout))
+    for index, url in enumerate(_split(webhook_urls), start=1):
+        notifiers.append(WebhookNotifier(url, name=f'webhook-{index}', timeout=timeout))
+    return NotifierGroup(notifiers, retries=retries)
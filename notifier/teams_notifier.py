@@ -0,0 +1,66 @@
+"""Provides functionality to send messages to Microsoft Teams."""
+import re
+from typing import Any, Optional
+
+import requests
+from typing_extensions import Self
+
+from notifier.notifier import DEFAULT_TIMEOUT
+from notifier.webhook_notifier import WebhookNotifier
+
+_SLACK_LINK = re.compile(r'(\*?)<([^|>]+)\|([^>]+)>\1')
+
+
+class TeamsNotifier(WebhookNotifier):
+    """
+    Provides functionality to send messages to Microsoft Teams.
+
+    The message is posted to a Teams incoming webhook or workflow as an Adaptive Card, with one text block for each
+    message block. The Slack mrkdwn links are converted to Markdown.
+    """
+
+    def __init__(self: Self, webhook_url: str, name: str = 'teams', timeout: float = DEFAULT_TIMEOUT,
+                 session: Optional[requests.Session] = None) -> None:
+        """
+        Initialize the TeamsNotifier.
+
+        :param webhook_url: Teams webhook URL to send messages
+        :param name: Name of the sink used when reporting the delivery
+        :param timeout: timeout in seconds for the request to the webhook
+        :param session: Optionally inject a requests session
+        """
+        super().__init__(webhook_url, name=name, timeout=timeout, session=session)
+
+    def get_payload(self: Self) -> dict[str, Any]:
+        """
+        Get the Adaptive Card posted to the webhook.
+
+        :return: payload
+        """
+        return {
+            'type': 'message',
+            'attachments': [
+                {
+                    'contentType': 'application/vnd.microsoft.card.adaptive',
+                    'content': {
+                        '$schema': 'http://adaptivecards.io/schemas/adaptive-card.json',
+                        'type': 'AdaptiveCard',
+                        'version': '1.4',
+                        'body': [
+                            {'type': 'TextBlock', 'text': self.to_markdown(message), 'wrap': True}
+                            for message in self._messages
+                        ]
+                    }
+                }
+            ]
+        }
+
+    @staticmethod
+    def to_markdown(message: str) -> str:
+        """
+        Convert the links of Slack mrkdwn, which may be bold, to Markdown.
+
+        :param message: Slack mrkdwn text
+        :return: Markdown text
+        """
+        return _SLACK_LINK.sub(r'\1\1[\3](\2)\1\1', message)
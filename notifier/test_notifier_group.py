@@ -0,0 +1,128 @@
+"""Provides tests for NotifierGroup."""
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+import requests
+from typing_extensions import Self
+
+from notifier.notifier import NotificationError, Notifier
+from notifier.notifier_group import create_notifier, NotifierGroup
+from notifier.teams_notifier import TeamsNotifier
+from notifier.webhook_notifier import WebhookNotifier
+from slack_notifier.slack_notifier import SlackNotifier
+
+
+class _RecordingNotifier(Notifier):
+    """Records the messages it sends, failing the first attempts if asked to."""
+
+    def __init__(self: Self, name: str, failures: int = 0, barrier: threading.Barrier = None) -> None:
+        """
+        Initialize the _RecordingNotifier.
+
+        :param name: Name of the sink
+        :param failures: number of attempts which fail before one succeeds
+        :param barrier: Optionally wait for the other sinks, to check that they are sent to concurrently
+        """
+        super().__init__(name)
+        self.failures = failures
+        self.barrier = barrier
+        self.sent: list[list[str]] = []
+
+    def send_message(self: Self) -> None:
+        """Record the message, or fail while there are failures left."""
+        if self.barrier:
+            self.barrier.wait(timeout=5)
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError('connection reset')
+        self.sent.append(list(self._messages))
+
+
+class TestNotifierGroup(unittest.TestCase):
+    """Provides tests for NotifierGroup."""
+
+    def test_send_message(self: Self) -> None:
+        """The message should be rendered once and delivered to every sink concurrently."""
+        barrier = threading.Barrier(3)
+        notifiers = [_RecordingNotifier(f'sink-{index}', barrier=barrier) for index in range(3)]
+        group = NotifierGroup(notifiers)
+
+        self.assertFalse(group.has_messages())
+        group.add_message_block('test message')
+        group.add_message_block('test header', at_beginning=True)
+        self.assertTrue(group.has_messages())
+        group.send_message()
+
+        for notifier in notifiers:
+            self.assertEqual([['test header', 'test message']], notifier.sent)
+        self.assertEqual(['sink-0', 'sink-1', 'sink-2'], [result.name for result in group.results])
+        self.assertTrue(all(result.success and result.attempts == 1 for result in group.results))
+
+    def test_send_message_with_retries(self: Self) -> None:
+        """A failing sink should be retried with a backoff without holding up the other sinks."""
+        sleep = MagicMock()
+        flaky = _RecordingNotifier('flaky', failures=2)
+        healthy = _RecordingNotifier('healthy')
+        group = NotifierGroup([flaky, healthy], retries=2, retry_delay=0.5, sleep=sleep)
+        group.add_message_block('test message')
+
+        with self.assertLogs('notifier.notifier_group', level='INFO') as logs:
+            group.send_message()
+
+        self.assertEqual([['test message']], flaky.sent)
+        self.assertEqual([['test message']], healthy.sent)
+        self.assertEqual([0.5, 1.0], [call.args[0] for call in sleep.call_args_list])
+        self.assertEqual([3, 1], [result.attempts for result in group.results])
+        self.assertTrue(any('delivered message to flaky' in line for line in logs.output))
+
+    def test_send_message_when_sink_fails(self: Self) -> None:
+        """An error should be raised after every sink was tried when a sink still fails after the retries."""
+        failing = _RecordingNotifier('failing', failures=5)
+        healthy = _RecordingNotifier('healthy')
+        group = NotifierGroup([failing, healthy], retries=1, sleep=MagicMock())
+        group.add_message_block('test message')
+
+        with self.assertLogs('notifier.notifier_group', level='ERROR'), \
+                self.assertRaisesRegex(NotificationError, 'failing') as error:
+            group.send_message()
+
+        self.assertEqual([['test message']], healthy.sent)
+        self.assertEqual([False, True], [result.success for result in group.results])
+        self.assertEqual(['healthy'], error.exception.delivered)
+        self.assertEqual('ConnectionError: connection reset', group.results[0].error)
+
+    def test_send_message_when_response_times_out(self: Self) -> None:
+        """A sink which timed out after the message was sent should not be retried, so it does not get it twice."""
+        session = MagicMock()
+        session.post.side_effect = requests.ReadTimeout('read timed out')
+        webhook_notifier = WebhookNotifier('https://example.com/hook', session=session)
+        group = NotifierGroup([webhook_notifier], retries=2, sleep=MagicMock())
+        group.add_message_block('test message')
+
+        with self.assertLogs('notifier.notifier_group', level='ERROR'), self.assertRaises(NotificationError):
+            group.send_message()
+
+        session.post.assert_called_once()
+        self.assertEqual(1, group.results[0].attempts)
+        group.sleep.assert_not_called()
+
+    def test_create_notifier(self: Self) -> None:
+        """The sinks should be created for each newline separated webhook URL."""
+        group = create_notifier(slack_webhooks='https://example.com/slack-1\nhttps://example.com/slack-2\n',
+                                teams_webhooks='https://example.com/teams',
+                                webhook_urls='', timeout=5, retries=3)
+
+        self.assertEqual([SlackNotifier, SlackNotifier, TeamsNotifier], [type(notifier) for notifier in group.notifiers])
+        self.assertEqual(['slack-1', 'slack-2', 'teams-1'], [notifier.name for notifier in group.notifiers])
+        self.assertEqual(3, group.retries)
+        self.assertEqual([], create_notifier(slack_webhooks=None).notifiers)
+        self.assertIsInstance(create_notifier('', webhook_urls='https://example.com/hook').notifiers[0], WebhookNotifier)
+
+    def test_create_notifier_with_default_timeout(self: Self) -> None:
+        """The sinks should time out after the default timeout when no timeout is configured."""
+        group = create_notifier(slack_webhooks='https://example.com/slack', teams_webhooks='https://example.com/teams',
+                                webhook_urls='https://example.com/hook')
+
+        self.assertEqual(30, group.notifiers[0]._webhook_client.timeout)
+        self.assertEqual([30, 30], [notifier.timeout for notifier in group.notifiers[1:]])
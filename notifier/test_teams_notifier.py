@@ -0,0 +1,43 @@
+"""Provides tests for TeamsNotifier."""
+import unittest
+from unittest.mock import MagicMock
+
+from typing_extensions import Self
+
+from github_util.pull_request import PullRequest
+from message_formatter.message_formatter import MessageFormatter
+from notifier.teams_notifier import TeamsNotifier
+
+
+class TestTeamsNotifier(unittest.TestCase):
+    """Provides tests for TeamsNotifier."""
+
+    def test_to_markdown(self: Self) -> None:
+        """The to_markdown function should convert the Slack links and bold text."""
+        summary = MessageFormatter.get_repo_pull_request_summary('test-repo', [
+            PullRequest(title='Fix *the* bug', number=1, url='https://github.com/org/test-repo/pull/1')
+        ])
+        self.assertEqual('test-repo\n \t • **[Fix *the* bug](https://github.com/org/test-repo/pull/1)** #1',
+                         TeamsNotifier.to_markdown(summary))
+        self.assertEqual('test-repo\n \t • **[Compare changes](https://example.com/compare)**',
+                         TeamsNotifier.to_markdown(MessageFormatter.get_repo_compare_summary('test-repo',
+                                                                                             'https://example.com/compare')))
+        self.assertEqual('_1 repository could not be resolved in time and link to the comparison instead_',
+                         TeamsNotifier.to_markdown(MessageFormatter.get_fallback_summary(1)))
+
+    def test_send_message(self: Self) -> None:
+        """The send_message function should post an Adaptive Card with a text block for each message block."""
+        session = MagicMock()
+        teams_notifier = TeamsNotifier('https://example.com/teams', session=session)
+        teams_notifier.add_message_block('test-repo\n \t • *<https://example.com/pull/1|Test PR>* #1')
+        teams_notifier.add_message_block('The dev environment has been updated', at_beginning=True)
+        teams_notifier.send_message()
+
+        payload = session.post.call_args.kwargs['json']
+        self.assertEqual('message', payload['type'])
+        self.assertEqual('application/vnd.microsoft.card.adaptive', payload['attachments'][0]['contentType'])
+        expected_texts = [
+            'The dev environment has been updated',
+            'test-repo\n \t • **[Test PR](https://example.com/pull/1)** #1'
+        ]
+        self.assertEqual(expected_texts, [block['text'] for block in payload['attachments'][0]['content']['body']])
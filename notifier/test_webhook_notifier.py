@@ -0,0 +1,58 @@
+"""Provides tests for WebhookNotifier."""
+import unittest
+from unittest.mock import MagicMock
+
+import requests
+from typing_extensions import Self
+
+from notifier.webhook_notifier import WebhookNotifier
+
+
+class TestWebhookNotifier(unittest.TestCase):
+    """Provides tests for WebhookNotifier."""
+
+    def test_send_message(self: Self) -> None:
+        """The send_message function should post the message blocks as JSON."""
+        session = MagicMock()
+        webhook_notifier = WebhookNotifier('https://example.com/hook', timeout=5, session=session)
+        webhook_notifier.add_message_block('test message')
+        webhook_notifier.add_message_block('test header', at_beginning=True)
+        webhook_notifier.send_message()
+
+        session.post.assert_called_once_with('https://example.com/hook', json={
+            'text': 'test header\n\ntest message',
+            'blocks': ['test header', 'test message']
+        }, timeout=5)
+        session.post.return_value.raise_for_status.assert_called_once()
+
+    def test_send_message_when_empty(self: Self) -> None:
+        """The send_message function should not post when there are no message blocks."""
+        session = MagicMock()
+        webhook_notifier = WebhookNotifier('https://example.com/hook', session=session)
+        webhook_notifier.add_message_block('')
+        webhook_notifier.send_message()
+
+        self.assertFalse(webhook_notifier.has_messages())
+        session.post.assert_not_called()
+
+    def test_send_message_when_rejected(self: Self) -> None:
+        """The send_message function should raise an error when the webhook rejects the message."""
+        session = MagicMock()
+        session.post.return_value.raise_for_status.side_effect = requests.HTTPError('500 Server Error')
+        webhook_notifier = WebhookNotifier('https://example.com/hook', session=session)
+        webhook_notifier.add_message_block('test message')
+
+        with self.assertRaises(requests.HTTPError):
+            webhook_notifier.send_message()
+
+    def test_is_retryable(self: Self) -> None:
+        """Only errors before the webhook accepted the message should be retryable, not a read timeout."""
+        webhook_notifier = WebhookNotifier('https://example.com/hook', session=MagicMock())
+        unavailable = MagicMock(status_code=503)
+        invalid = MagicMock(status_code=400)
+
+        self.assertTrue(webhook_notifier.is_retryable(requests.ConnectionError('connection refused')))
+        self.assertTrue(webhook_notifier.is_retryable(requests.ConnectTimeout('connect timed out')))
+        self.assertTrue(webhook_notifier.is_retryable(requests.HTTPError('503 Server Error', response=unavailable)))
+        self.assertFalse(webhook_notifier.is_retryable(requests.HTTPError('400 Client Error', response=invalid)))
+        self.assertFalse(webhook_notifier.is_retryable(requests.ReadTimeout('read timed out')))
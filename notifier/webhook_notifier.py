@@ -0,0 +1,72 @@
+"""Provides functionality to send messages to a generic webhook."""
+import logging
+from typing import Any, Optional
+
+import requests
+from typing_extensions import Self
+
+from notifier.notifier import DEFAULT_TIMEOUT, Notifier, RETRY_STATUSES
+
+logger = logging.getLogger(__name__)
+
+
+class WebhookNotifier(Notifier):
+    """
+    Provides functionality to send messages to a generic webhook.
+
+    The message blocks are posted as JSON, both joined into one text separated by blank lines and as a list of
+    blocks, so that chat tools reading the text and custom receivers reading the blocks can use the same hook.
+    """
+
+    def __init__(self: Self, webhook_url: str, name: str = 'webhook', timeout: float = DEFAULT_TIMEOUT,
+                 session: Optional[requests.Session] = None) -> None:
+        """
+        Initialize the WebhookNotifier.
+
+        :param webhook_url: Webhook URL to send messages
+        :param name: Name of the sink used when reporting the delivery
+        :param timeout: timeout in seconds for the request to the webhook
+        :param session: Optionally inject a requests session
+        """
+        super().__init__(name)
+        self.webhook_url = webhook_url
+        self.timeout = timeout
+        self.session = session or requests.Session()
+
+    def get_payload(self: Self) -> dict[str, Any]:
+        """
+        Get the JSON payload posted to the webhook.
+
+        :return: payload
+        """
+        return {
+            'text': '\n\n'.join(self._messages),
+            'blocks': list(self._messages)
+        }
+
+    def send_message(self: Self) -> None:
+        """
+        Post the message blocks to the webhook.
+
+        :raises requests.RequestException: if the webhook does not accept the message
+        :return: None
+        """
+        if not self.has_messages():
+            logger.info(f'not sending message to {self.name} because message is empty')
+            return
+
+        logger.info(f'sending message to {self.name}')
+        response = self.session.post(self.webhook_url, json=self.get_payload(), timeout=self.timeout)
+        logger.info(f'response from {self.name}: {response.status_code}')
+        response.raise_for_status()
+
+    def is_retryable(self: Self, error: Exception) -> bool:
+        """
+        Check if the message can be posted again after an attempt failed, without risking a duplicate message.
+
+        :param error: error of the failed attempt
+        :return: True if the webhook could not be connected to or rejected the message with a status which may pass
+        """
+        if isinstance(error, requests.HTTPError):
+            return error.response is not None and error.response.status_code in RETRY_STATUSES
+        return isinstance(error, requests.ConnectionError) or super().is_retryable(error)
@@ -0,0 +1,149 @@
+"""Provides functionality to profile the CPU time and memory allocations of a run."""
+import cProfile
+import logging
+import pstats
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable
+
+from typing_extensions import Self
+
+logger = logging.getLogger(__name__)
+
+_MAX_STACK_DEPTH = 128
+
+
+class Profiler:
+    """Provides functionality to profile the CPU time and memory allocations of a run."""
+
+    @staticmethod
+    def get_collapsed_stacks(stats: pstats.Stats) -> list[str]:
+        """
+        Convert profile statistics to collapsed stacks which can be rendered as a flame graph.
+
+        cProfile only records caller and callee pairs, so the time of a function called from several places is
+        split between its callers in proportion to the time spent in each call.
+
+        Example of a line: (main (main.py:20);get_repo (github_util.py:60) 1500)
+
+        :param stats: profile statistics
+        :return: lines of semicolon separated frames followed by the self time in microseconds
+        """
+        callees: dict[tuple, dict[tuple, float]] = {}
+        for function, (_, _, _, _, callers) in stats.stats.items():
+            for caller, (_, _, _, cumulative_time) in callers.items():
+                callees.setdefault(caller, {})[function] = cumulative_time
+
+        stacks: dict[str, float] = {}
+        roots = [function for function, (*_, callers) in stats.stats.items() if not callers]
+        for root in roots:
+            Profiler._collapse(stats, callees, root, [], 1.0, stacks)
+
+        return [f'{stack} {round(weight)}' for stack, weight in stacks.items() if round(weight) > 0]
+
+    @staticmethod
+    def _collapse(stats: pstats.Stats, callees: dict[tuple, dict[tuple, float]], function: tuple,
+                  stack: list[tuple], share: float, stacks: dict[str, float]) -> None:
+        """
+        Add the self time of a function and its callees to the collapsed stacks.
+
+        :param stats: profile statistics
+        :param callees: cumulative time of each callee for each caller
+        :param function: function to add
+        :param stack: callers of the function
+        :param share: share of the time of the function which was spent on this stack
+        :param stacks: self time in microseconds for each collapsed stack
+        :return: None
+        """
+        _, _, self_time, cumulative_time, _ = stats.stats[function]
+        stack = [*stack, function]
+        key = ';'.join(Profiler._get_frame_name(frame) for frame in stack)
+        stacks[key] = stacks.get(key, 0.0) + self_time * share * 1_000_000
+
+        if len(stack) >= _MAX_STACK_DEPTH:
+            return
+
+        for callee, callee_time in callees.get(function, {}).items():
+            callee_cumulative_time = stats.stats[callee][3]
+            if callee in stack or not callee_cumulative_time:
+                continue
+            callee_share = share * callee_time / callee_cumulative_time
+            if callee_share * callee_cumulative_time * 1_000_000 >= 1:
+                Profiler._collapse(stats, callees, callee, stack, callee_share, stacks)
+
+    @staticmethod
+    def _get_frame_name(function: tuple) -> str:
+        """
+        Get the name of a frame for the collapsed stacks.
+
+        :param function: file name, line number and function name
+        :return: frame name
+        """
+        file_name, line, name = function
+        if file_name == '~':
+            return name.replace(';', ',')
+        return f'{name} ({Path(file_name).name}:{line})'.replace(';', ',')
+
+    def __init__(self: Self, output_dir: str, name: str = 'main', top_allocations: int = 25) -> None:
+        """
+        Initialize the Profiler.
+
+        :param output_dir: directory to write the profiling artifacts to
+        :param name: prefix of the artifact file names
+        :param top_allocations: number of allocation sites to include in the summary
+        """
+        self._output_dir = Path(output_dir)
+        self._name = name
+        self._top_allocations = top_allocations
+
+    def run(self: Self, function: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Run a function under cProfile and tracemalloc and write the profiling artifacts.
+
+        The artifacts are written even if the function raises an exception.
+
+        :param function: function to profile
+        :param args: positional arguments for the function
+        :param kwargs: keyword arguments for the function
+        :return: return value of the function
+        """
+        logger.info(f'profiling {function.__name__}, writing artifacts to {self._output_dir}')
+        profile = cProfile.Profile()
+        tracemalloc.start(10)
+        try:
+            return profile.runcall(function, *args, **kwargs)
+        finally:
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            self._write_artifacts(profile, snapshot, peak)
+
+    def _write_artifacts(self: Self, profile: cProfile.Profile, snapshot: tracemalloc.Snapshot, peak: int) -> None:
+        """
+        Write the pstats file, the collapsed stacks and the allocation summary.
+
+        :param profile: finished profile
+        :param snapshot: tracemalloc snapshot taken at the end of the run
+        :param peak: peak traced memory in bytes
+        :return: None
+        """
+        self._output_dir.mkdir(parents=True, exist_ok=True)
+
+        pstats_file = self._output_dir / f'{self._name}.pstats'
+        profile.dump_stats(pstats_file)
+
+        collapsed_file = self._output_dir / f'{self._name}.collapsed'
+        collapsed_file.write_text('\n'.join(self.get_collapsed_stacks(pstats.Stats(profile))) + '\n')
+
+        allocations_file = self._output_dir / f'{self._name}-allocations.txt'
+        snapshot = snapshot.filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+        lines = [
+            f'peak traced memory: {peak / 1024:.1f} KiB',
+            f'top {self._top_allocations} allocation sites still in use at the end of the run:'
+        ]
+        for statistic in snapshot.statistics('lineno')[:self._top_allocations]:
+            frame = statistic.traceback[0]
+            lines.append(f'{statistic.size / 1024:10.1f} KiB {statistic.count:8} blocks  {frame.filename}:{frame.lineno}')
+        allocations_file.write_text('\n'.join(lines) + '\n')
+
+        logger.info(f'wrote profiling artifacts: {pstats_file}, {collapsed_file}, {allocations_file}')
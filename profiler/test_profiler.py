@@ -0,0 +1,77 @@
+"""Provides tests for the Profiler."""
+import pstats
+import tempfile
+import unittest
+from pathlib import Path
+
+from typing_extensions import Self
+
+from profiler.profiler import Profiler
+
+
+def _allocate(size: int) -> list[str]:
+    """
+    Allocate a list of strings.
+
+    :param size: number of strings
+    :return: list of strings
+    """
+    return [str(number) * 10 for number in range(size)]
+
+
+def _work(size: int) -> int:
+    """
+    Call a nested function which allocates memory.
+
+    :param size: number of strings
+    :return: total length of the strings
+    """
+    return sum(len(text) for text in _allocate(size))
+
+
+def _fail() -> None:
+    """Raise an error after allocating memory."""
+    _allocate(1000)
+    raise ValueError('failed')
+
+
+class TestProfiler(unittest.TestCase):
+    """Provides tests for the Profiler."""
+
+    def setUp(self: Self) -> None:
+        """Set up a temporary directory for the artifacts."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.output_dir = Path(self.directory.name) / 'profile'
+
+    def tearDown(self: Self) -> None:
+        """Remove the temporary directory."""
+        self.directory.cleanup()
+
+    def test_run(self: Self) -> None:
+        """The function result should be returned and every artifact should be written."""
+        self.assertEqual(sum(len(str(number) * 10) for number in range(20000)),
+                         Profiler(output_dir=str(self.output_dir)).run(_work, 20000))
+
+        stats = pstats.Stats(str(self.output_dir / 'main.pstats'))
+        self.assertIn('_work', [name for _, _, name in stats.stats])
+
+        collapsed = (self.output_dir / 'main.collapsed').read_text().splitlines()
+        self.assertTrue(collapsed)
+        for line in collapsed:
+            stack, weight = line.rsplit(' ', 1)
+            self.assertGreater(int(weight), 0)
+        self.assertTrue(any('_work (test_profiler.py:' in line and '_allocate (test_profiler.py:' in line
+                            for line in collapsed))
+
+        allocations = (self.output_dir / 'main-allocations.txt').read_text()
+        self.assertIn('peak traced memory', allocations)
+        self.assertIn('test_profiler.py', allocations)
+
+    def test_run_with_exception(self: Self) -> None:
+        """The artifacts should be written even if the function fails."""
+        with self.assertRaises(ValueError):
+            Profiler(output_dir=str(self.output_dir), name='failed').run(_fail)
+
+        self.assertTrue((self.output_dir / 'failed.pstats').exists())
+        self.assertTrue((self.output_dir / 'failed.collapsed').exists())
+        self.assertTrue((self.output_dir / 'failed-allocations.txt').exists())
@@ -0,0 +1 @@
+"""Package for reference_index."""
@@ -0,0 +1,166 @@
+"""Indexes the repository commits referenced by each file of an environment commit."""
+import json
+import logging
+from pathlib import Path
+from typing import Iterator, Optional
+
+from typing_extensions import Self
+
+from diff_parser.diff_parser import DiffParser
+from diff_parser.repo_commit_change import RepoCommitChange
+from git_util.git_util import GitUtil
+
+logger = logging.getLogger(__name__)
+
+
+class ReferenceIndex:
+    """
+    Indexes the repository commits referenced by each file of an environment commit.
+
+    Each file is stored with the hash of its object and the commit of each repository it references. An index is
+    built from the tree of a commit and a previous index, so only the files whose object changed are read and
+    parsed. The changes between two commits are found by comparing their indexes, without diffing any file.
+    """
+
+    @staticmethod
+    def loads(content: str) -> 'ReferenceIndex':
+        """
+        Load an index saved with dumps.
+
+        :param content: saved index
+        :return: ReferenceIndex
+        """
+        saved = json.loads(content)
+        index = ReferenceIndex(commit=saved['commit'], file_pattern=saved['file_pattern'])
+        for file_name, (object_hash, references) in saved['files'].items():
+            index.set_file(file_name, object_hash, references)
+        return index
+
+    @staticmethod
+    def build(git_util: GitUtil, commit: Optional[str], file_pattern: str,
+              previous: Optional['ReferenceIndex'] = None) -> 'ReferenceIndex':
+        """
+        Build the index of a commit, reusing the files of a previous index whose object did not change.
+
+        Submodules are indexed from their tree entry, which is the commit they point to.
+
+        :param git_util: GitUtil for the environment repository
+        :param commit: commit hash to index, None for an empty index (the parent of the first commit)
+        :param file_pattern: Regex pattern(s) to filter files, separated by newlines
+        :param previous: Optionally an index of another commit to reuse unchanged files from
+        :return: ReferenceIndex
+        """
+        index = ReferenceIndex(commit=commit or '', file_pattern=file_pattern)
+        if not commit:
+            return index
+
+        file_count = read_count = 0
+        for file_name, object_hash, is_submodule in git_util.get_tree_entries(commit, file_pattern):
+            if previous and previous.get_object_hash(file_name) == object_hash:
+                references = previous.get_references(file_name)
+            elif is_submodule:
+                references = {Path(file_name).name: object_hash}
+            else:
+                references = DiffParser.get_repo_commits(git_util.read_blob_lines(object_hash))
+                read_count += 1
+            index.set_file(file_name, object_hash, references)
+            file_count += 1
+
+        logger.info(f'indexed {file_count} files of commit {commit}, read {read_count} of them')
+        return index
+
+    def __init__(self: Self, commit: str = '', file_pattern: str = '') -> None:
+        """
+        Initialize an empty ReferenceIndex.
+
+        :param commit: hash of the environment commit the index describes
+        :param file_pattern: Regex pattern(s) the files were filtered with
+        """
+        self.commit = commit
+        self.file_pattern = file_pattern
+        self._files: dict[str, tuple[str, dict[str, str]]] = {}
+        self._deployments: dict[str, dict[str, str]] = {}
+
+    def set_file(self: Self, file_name: str, object_hash: str, references: dict[str, str]) -> None:
+        """
+        Add a file to the index.
+
+        :param file_name: path of the file
+        :param object_hash: hash of the object of the file
+        :param references: commit of each repository referenced by the file
+        :return: None
+        """
+        self._files[file_name] = (object_hash, references)
+        for repo_name, repo_commit in references.items():
+            self._deployments.setdefault(repo_name, {})[file_name] = repo_commit
+
+    def get_object_hash(self: Self, file_name: str) -> Optional[str]:
+        """
+        Get the hash of the object of a file.
+
+        :param file_name: path of the file
+        :return: object hash, None if the file is not indexed
+        """
+        return self._files[file_name][0] if file_name in self._files else None
+
+    def get_references(self: Self, file_name: str) -> dict[str, str]:
+        """
+        Get the commit of each repository referenced by a file.
+
+        :param file_name: path of the file
+        :return: commit of each repository
+        """
+        return self._files[file_name][1] if file_name in self._files else {}
+
+    def get_deployments(self: Self, repo_name: str) -> dict[str, str]:
+        """
+        Get where a repository is deployed, in constant time.
+
+        :param repo_name: name of the repository
+        :return: commit of the repository in each file referencing it
+        """
+        return self._deployments.get(repo_name, {})
+
+    def get_changes(self: Self, previous: 'ReferenceIndex') -> Iterator[tuple[str, RepoCommitChange]]:
+        """
+        Get the repositories whose commit changed since a previous index, with the file they changed in.
+
+        Only files whose object changed are compared. Like a parsed diff, references which were removed are not
+        changes. A reference which is not in the previous version of its file is compared with the files which were
+        removed, so the references of a renamed or moved file are only changes if their commit changed as well.
+
+        :param previous: index of the previous commit
+        :return: iterator of the file name and the change
+        """
+        moved: dict[str, list[str]] = {}
+        for file_name, (_, references) in previous._files.items():
+            if file_name not in self._files:
+                for repo_name, repo_commit in references.items():
+                    moved.setdefault(repo_name, []).append(repo_commit)
+
+        for file_name, (object_hash, references) in self._files.items():
+            if previous.get_object_hash(file_name) == object_hash:
+                continue
+            previous_references = previous.get_references(file_name)
+            for repo_name, repo_commit in references.items():
+                if repo_name not in previous_references and repo_commit in moved.get(repo_name, []):
+                    continue
+                old_commit = previous_references.get(repo_name, moved.get(repo_name, [''])[0])
+                if old_commit != repo_commit:
+                    change = RepoCommitChange(repository=repo_name, old_commit=old_commit, new_commit=repo_commit)
+                    logger.info(f'found change: repo:{repo_name} old-commit:{change.old_commit} '
+                                f'new-commit:{change.new_commit}')
+                    yield file_name, change
+
+    def dumps(self: Self) -> str:
+        """
+        Save the index as compact JSON.
+
+        :return: saved index
+        """
+        saved = {
+            'commit': self.commit,
+            'file_pattern': self.file_pattern,
+            'files': {file_name: [object_hash, references] for file_name, (object_hash, references) in self._files.items()}
+        }
+        return json.dumps(saved, separators=(',', ':'))
@@ -0,0 +1,126 @@
+"""Provides tests for ReferenceIndex."""
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from git import Repo
+from typing_extensions import Self
+
+from diff_parser.repo_commit_change import RepoCommitChange
+from git_util.git_util import GitUtil
+from reference_index.reference_index import ReferenceIndex
+
+_IDENTITY = {
+    'GIT_AUTHOR_NAME': 'test',
+    'GIT_AUTHOR_EMAIL': 'test@example.com',
+    'GIT_COMMITTER_NAME': 'test',
+    'GIT_COMMITTER_EMAIL': 'test@example.com'
+}
+
+
+class TestReferenceIndex(unittest.TestCase):
+    """Provides tests for ReferenceIndex."""
+
+    def setUp(self: Self) -> None:
+        """Create an environment repository with two commits."""
+        self._directory = tempfile.TemporaryDirectory()
+        self.repo = Repo.init(self._directory.name)
+        first_files = {
+            'dev.tfvars': 'a = "123.foo.com/test-repo-1:abc11"\nb = "123.foo.com/test-repo-2:abc21"\n',
+            'prod.tfvars': 'a = "123.foo.com/test-repo-1:abc10"\n',
+            'README.md': 'a = "123.foo.com/test-repo-3:abc31"\n'
+        }
+        self._commit(first_files, {'services/service-a': '1' * 40})
+        second_files = {
+            'dev.tfvars': 'a = "123.foo.com/test-repo-1:abc12"\nb = "123.foo.com/test-repo-2:abc21"\n'
+                          'c = "123.foo.com/test-repo-4:abc41"\n',
+            'README.md': 'a = "123.foo.com/test-repo-3:abc32"\n'
+        }
+        self._commit(second_files, {'services/service-a': '2' * 40})
+        self.git_util = GitUtil(self.repo)
+
+    def tearDown(self: Self) -> None:
+        """Remove the environment repository."""
+        self.repo.close()
+        self._directory.cleanup()
+
+    def _commit(self: Self, files: dict[str, str], submodules: dict[str, str]) -> None:
+        """
+        Commit files and submodules to the environment repository.
+
+        :param files: content of each file
+        :param submodules: commit of each submodule
+        """
+        for file_name, content in files.items():
+            (Path(self._directory.name) / file_name).write_text(content)
+            self.repo.git.add(file_name)
+        for path, commit in submodules.items():
+            self.repo.git.update_index('--add', '--cacheinfo', f'160000,{commit},{path}')
+        self.repo.git.commit('--message', 'update', env=_IDENTITY)
+
+    def test_get_changes(self: Self) -> None:
+        """The changes should be found by comparing indexes, only reading the files which changed."""
+        head, parent = self.git_util.get_last_commit_hashes()
+        pattern = '.*tfvars\nservices/.*'
+        parent_index = ReferenceIndex.build(self.git_util, parent, pattern)
+
+        with patch.object(self.git_util, 'read_blob_lines', wraps=self.git_util.read_blob_lines) as read_blob_lines:
+            index = ReferenceIndex.build(self.git_util, head, pattern, parent_index)
+        read_blob_lines.assert_called_once()
+
+        self.assertEqual(
+            [
+                ('dev.tfvars', RepoCommitChange(repository='test-repo-1', old_commit='abc11', new_commit='abc12')),
+                ('dev.tfvars', RepoCommitChange(repository='test-repo-4', old_commit='', new_commit='abc41')),
+                ('services/service-a', RepoCommitChange(repository='service-a', old_commit='1' * 40,
+                                                        new_commit='2' * 40))
+            ],
+            list(index.get_changes(parent_index))
+        )
+
+    def test_get_changes_with_renamed_files(self: Self) -> None:
+        """The references of renamed or moved files should only be changes when their commit changed."""
+        (Path(self._directory.name) / 'environments').mkdir()
+        self.repo.git.mv('prod.tfvars', 'environments/prod.tfvars')
+        self.repo.git.mv('dev.tfvars', 'dev-eu.tfvars')
+        files = {
+            'dev-eu.tfvars': 'a = "123.foo.com/test-repo-1:abc13"\nb = "123.foo.com/test-repo-2:abc21"\n'
+                             'c = "123.foo.com/test-repo-4:abc41"\n'
+        }
+        self._commit(files, {})
+        head, parent = self.git_util.get_last_commit_hashes()
+        parent_index = ReferenceIndex.build(self.git_util, parent, '.*tfvars')
+        index = ReferenceIndex.build(self.git_util, head, '.*tfvars', parent_index)
+
+        self.assertEqual(
+            [('dev-eu.tfvars', RepoCommitChange(repository='test-repo-1', old_commit='abc12', new_commit='abc13'))],
+            list(index.get_changes(parent_index))
+        )
+
+    def test_get_deployments(self: Self) -> None:
+        """Where a repository is deployed should be looked up from the index."""
+        index = ReferenceIndex.build(self.git_util, self.repo.head.commit.hexsha, '.*tfvars')
+
+        self.assertEqual({'dev.tfvars': 'abc12', 'prod.tfvars': 'abc10'}, index.get_deployments('test-repo-1'))
+        self.assertEqual({}, index.get_deployments('test-repo-3'))
+
+    def test_dumps_and_loads(self: Self) -> None:
+        """A saved index should load with the same commit, pattern and references."""
+        index = ReferenceIndex.build(self.git_util, self.repo.head.commit.hexsha, '.*tfvars')
+        loaded = ReferenceIndex.loads(index.dumps())
+
+        self.assertEqual(index.dumps(), loaded.dumps())
+        self.assertEqual(index.commit, loaded.commit)
+        self.assertEqual('.*tfvars', loaded.file_pattern)
+        self.assertEqual({'a': 'abc11'}, ReferenceIndex.loads(
+            '{"commit":"c1","file_pattern":"","files":{"dev.tfvars":["h1",{"a":"abc11"}]}}'
+        ).get_references('dev.tfvars'))
+
+    def test_build_without_commit(self: Self) -> None:
+        """The parent of the first commit should have an empty index, so every reference is a change."""
+        index = ReferenceIndex.build(self.git_util, self.repo.head.commit.hexsha, '.*prod.*')
+        self.assertEqual(
+            [('prod.tfvars', RepoCommitChange(repository='test-repo-1', old_commit='', new_commit='abc10'))],
+            list(index.get_changes(ReferenceIndex.build(self.git_util, None, '.*prod.*')))
+        )
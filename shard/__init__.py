@@ -0,0 +1 @@
+"""Package for shard."""
@@ -0,0 +1,47 @@
+"""Represents the part of the changes resolved by one of several parallel jobs."""
+import zlib
+from dataclasses import dataclass
+
+from typing_extensions import Self
+
+from diff_parser.repo_commit_change import RepoCommitChange
+
+
+@dataclass(frozen=True)
+class Shard:
+    """
+    Represents the part of the changes resolved by one of several parallel jobs.
+
+    Changes are assigned by a stable hash of the repository name, so every job agrees on the assignment without
+    coordinating, and the ranges and merge commits of a repository are only looked up by one job.
+    """
+
+    index: int = 0
+    count: int = 1
+
+    def __post_init__(self: Self) -> None:
+        """
+        Validate the shard.
+
+        :raises ValueError: if the index is not between 0 and count - 1
+        """
+        if self.count < 1 or not 0 <= self.index < self.count:
+            raise ValueError(f'shard index {self.index} must be between 0 and {self.count - 1}')
+
+    @property
+    def is_partial(self: Self) -> bool:
+        """
+        Check if the shard only covers part of the changes.
+
+        :return: True if there is more than one shard
+        """
+        return self.count > 1
+
+    def includes(self: Self, change: RepoCommitChange) -> bool:
+        """
+        Check if a change is resolved by this shard.
+
+        :param change: repository commit change
+        :return: True if the change belongs to this shard
+        """
+        return zlib.crc32(change.repository.encode()) % self.count == self.index
@@ -0,0 +1,32 @@
+"""Provides tests for the Shard."""
+import unittest
+
+from typing_extensions import Self
+
+from diff_parser.repo_commit_change import RepoCommitChange
+from shard.shard import Shard
+
+
+class TestShard(unittest.TestCase):
+    """Provides tests for the Shard."""
+
+    def test_includes(self: Self) -> None:
+        """Every change should belong to exactly one shard, and a repository always to the same shard."""
+        changes = [RepoCommitChange(repository=f'test-repo-{number}') for number in range(100)]
+        shards = [Shard(index=index, count=4) for index in range(4)]
+
+        for change in changes:
+            self.assertEqual(1, len([shard for shard in shards if shard.includes(change)]))
+        self.assertTrue(all(len([change for change in changes if shard.includes(change)]) > 10 for shard in shards))
+        self.assertEqual(shards[0].includes(RepoCommitChange(repository='test-repo-1', new_commit='abc')),
+                         shards[0].includes(RepoCommitChange(repository='test-repo-1', new_commit='def')))
+
+    def test_single_shard(self: Self) -> None:
+        """The default shard should include every change."""
+        self.assertFalse(Shard().is_partial)
+        self.assertTrue(Shard().includes(RepoCommitChange(repository='test-repo-1')))
+
+    def test_invalid_shard(self: Self) -> None:
+        """A shard index outside of the shard count should be rejected."""
+        with self.assertRaises(ValueError):
+            Shard(index=2, count=2)
@@ -1,27 +1,35 @@
 """Provides functionality to send messages to Slack."""
 import logging
+from typing import Optional
+from urllib.error import HTTPError, URLError
 
 from slack_sdk import WebhookClient
 from typing_extensions import Self
 
+from notifier.notifier import Notifier, RejectedError
+
 logger = logging.getLogger(__name__)
 
 
-class SlackNotifier:
+class SlackNotifier(Notifier):
     """Provides functionality to send messages to Slack."""
 
     _message_blocks = None
 
-    def __init__(self: Self, webhook_url: str, webhook_client: WebhookClient = None) -> None:
+    def __init__(self: Self, webhook_url: str, webhook_client: WebhookClient = None, name: str = 'slack',
+                 timeout: Optional[float] = None) -> None:
         """
         Initialize the SlackNotifier.
 
         :param webhook_url: Webhook URL to send messages
         :param webhook_client: Optionally inject a WebhookClient
+        :param name: Name of the sink used when reporting the delivery
+        :param timeout: timeout in seconds for the request to Slack, the WebhookClient default when not provided
         """
+        super().__init__(name)
         self._message_blocks = []
         if not webhook_client:
-            self._webhook_client = WebhookClient(webhook_url)
+            self._webhook_client = WebhookClient(webhook_url, timeout=timeout) if timeout else WebhookClient(webhook_url)
         else:
             self._webhook_client = webhook_client
 
@@ -65,6 +73,7 @@ class SlackNotifier:
         """
         Send a message to Slack using the message blocks.
 
+        :raises RejectedError: if Slack does not accept the message
         :return: None
         """
         if len(self._message_blocks) == 0:
@@ -78,4 +87,14 @@ class SlackNotifier:
         logger.info('sending message to Slack')
         response = self._webhook_client.send(text='fallback', blocks=self._message_blocks[:50])
         logger.info(f'response from Slack: {response.status_code} {response.body}')
-        assert response.status_code == 200
+        if response.status_code != 200:
+            raise RejectedError(f'Slack responded with {response.status_code}: {response.body}', response.status_code)
+
+    def is_retryable(self: Self, error: Exception) -> bool:
+        """
+        Check if the message can be sent to Slack again after an attempt failed, without risking a duplicate message.
+
+        :param error: error of the failed attempt
+        :return: True if Slack could not be connected to or rejected the message with a status which may pass
+        """
+        return (isinstance(error, URLError) and not isinstance(error, HTTPError)) or super().is_retryable(error)
@@ -1,9 +1,12 @@
 """Provides tests for SlackNotifier."""
+import socket
 import unittest
 from unittest.mock import MagicMock
+from urllib.error import URLError
 
 from typing_extensions import Self
 
+from notifier.notifier import RejectedError
 from slack_notifier.slack_notifier import SlackNotifier
 
 
@@ -127,3 +130,24 @@ class TestSlackNotifier(unittest.TestCase):
 
         webhook_client.send.assert_called_once()
         self.assertEqual(50, len(webhook_client.send.call_args[1]['blocks']))
+
+    def test_send_message_when_rejected(self: Self) -> None:
+        """The send_message function should raise an error which is only retryable for a status which may pass."""
+        webhook_client = MagicMock()
+        slack_notifier = SlackNotifier('https://example.com', webhook_client)
+        webhook_client.send.return_value.status_code = 503
+        webhook_client.send.return_value.body = 'service unavailable'
+        slack_notifier.add_message_block('test message')
+
+        with self.assertRaisesRegex(RejectedError, '503') as error:
+            slack_notifier.send_message()
+
+        self.assertTrue(slack_notifier.is_retryable(error.exception))
+        self.assertFalse(slack_notifier.is_retryable(RejectedError('invalid_blocks', 400)))
+
+    def test_is_retryable(self: Self) -> None:
+        """Only errors before Slack accepted the message should be retryable, not a timeout waiting for the response."""
+        slack_notifier = SlackNotifier('https://example.com')
+
+        self.assertTrue(slack_notifier.is_retryable(URLError(ConnectionRefusedError('connection refused'))))
+        self.assertFalse(slack_notifier.is_retryable(socket.timeout('The read operation timed out')))
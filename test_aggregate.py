@@ -0,0 +1,136 @@
+"""Provide tests for the aggregate script."""
+import tempfile
+import unittest
+from pathlib import Path
+from typing import Optional
+from unittest.mock import MagicMock
+
+from typing_extensions import Self
+
+import aggregate
+import main
+from artifact_writer.artifact_writer import ArtifactWriter
+from git_util.file_diff import FileDiff
+from github_util.pull_request import PullRequest
+from notification_state.notification_state import NotificationState
+from notification_state.state_storage import FileStateStorage
+from shard.shard import Shard
+from slack_notifier.slack_notifier import SlackNotifier
+
+
+class TestAggregate(unittest.TestCase):
+    """Provide tests for the aggregate script."""
+
+    def setUp(self: Self) -> None:
+        """Set up an environment commit changing several repositories."""
+        self.git_util = MagicMock()
+        self.git_util.get_file_diffs_from_last_commit.side_effect = lambda _: [
+            FileDiff(file_name='terraform/env/dev/dev-a.tfvars', unified_diff=[
+                line
+                for number in range(6)
+                for line in (f'-test_repo_{number} = "123.foo.com/test-repo-{number}:abc11"',
+                             f'+test_repo_{number} = "123.foo.com/test-repo-{number}:abc12"')
+            ])
+        ]
+        self.github_util = MagicMock()
+        self.github_util.get_pull_requests_between_refs.side_effect = lambda repo, *_: [
+            PullRequest(title=f'Pull Request {repo}', number=1, url=f'https://foo.com/{repo}/1')
+        ]
+        self.github_util.tag_commit.side_effect = lambda repo, *_: repo != 'test-repo-3'
+
+    def _run_main(self: Self, shard: Shard, slack_client: MagicMock, artifact_file: str = '',
+                  notification_state: Optional[NotificationState] = None) -> None:
+        """
+        Run the main function for a shard.
+
+        :param shard: shard to run
+        :param slack_client: mocked Slack webhook client
+        :param artifact_file: path of the artifact to write
+        :param notification_state: Optionally record the work done
+        :return: None
+        """
+        with ArtifactWriter(artifact_file=artifact_file) as writer:
+            main.main(git_util=self.git_util,
+                      slack_notifier=SlackNotifier('', slack_client),
+                      github_util=self.github_util,
+                      environment_name='Dev',
+                      file_pattern='.*dev.*.tfvars',
+                      tag_name='test-tag',
+                      artifact_writer=writer,
+                      shard=shard,
+                      notification_state=notification_state)
+
+    def test_aggregate(self: Self) -> None:
+        """The merged shards should send the same message as an unsharded run, and report every tag."""
+        unsharded_client = MagicMock()
+        unsharded_client.send.return_value.status_code = 200
+        self._run_main(Shard(), unsharded_client)
+
+        shard_client = MagicMock()
+        aggregate_client = MagicMock()
+        aggregate_client.send.return_value.status_code = 200
+        with tempfile.TemporaryDirectory() as directory:
+            for index in range(3):
+                self._run_main(Shard(index=index, count=3), shard_client, f'{directory}/shards/{index}.ndjson')
+            report_file = Path(directory) / 'report.json'
+
+            with ArtifactWriter(artifact_file=str(report_file)) as writer:
+                aggregate.aggregate(artifact_files=aggregate.get_shard_artifact_files(f'{directory}/shards'),
+                                    slack_notifier=SlackNotifier('', aggregate_client),
+                                    environment_name='Dev',
+                                    artifact_writer=writer)
+            report = list(ArtifactWriter.read_records(str(report_file)))
+
+        shard_client.send.assert_not_called()
+        self.assertEqual(unsharded_client.send.call_args, aggregate_client.send.call_args)
+        self.assertEqual([f'test-repo-{number}' for number in range(6)], [record['repository'] for record in report])
+        self.assertEqual([True, True, True, False, True, True], [record['tagged'] for record in report])
+        self.assertEqual(12, self.github_util.tag_commit.call_count)
+
+    def test_aggregate_with_notification_state(self: Self) -> None:
+        """A re-run of the shards and the aggregation should not send the message again."""
+        aggregate_client = MagicMock()
+        aggregate_client.send.return_value.status_code = 200
+        with tempfile.TemporaryDirectory() as directory:
+            storage = FileStateStorage(f'{directory}/state.json')
+            for _ in range(2):
+                for index in range(3):
+                    self._run_main(Shard(index=index, count=3), MagicMock(), f'{directory}/shards/{index}.ndjson',
+                                   NotificationState(storage, 'Dev'))
+                report_file = Path(directory) / 'report.json'
+                with ArtifactWriter(artifact_file=str(report_file)) as writer:
+                    aggregate.aggregate(artifact_files=aggregate.get_shard_artifact_files(f'{directory}/shards'),
+                                        slack_notifier=SlackNotifier('', aggregate_client),
+                                        environment_name='Dev',
+                                        artifact_writer=writer,
+                                        notification_state=NotificationState(storage, 'Dev'))
+            report = list(ArtifactWriter.read_records(str(report_file)))
+
+        aggregate_client.send.assert_called_once()
+        self.assertEqual([f'test-repo-{number}' for number in range(6)], [record['repository'] for record in report])
+        self.assertEqual(6, self.github_util.get_pull_requests_between_refs.call_count)
+
+    def test_get_shard_artifact_files(self: Self) -> None:
+        """Directories should be expanded to the artifact files they contain."""
+        with tempfile.TemporaryDirectory() as directory:
+            for name in ('shard-1/results.ndjson', 'shard-0/results.ndjson'):
+                (Path(directory) / name).parent.mkdir()
+                (Path(directory) / name).touch()
+
+            expected = [
+                f'{directory}/shard-0/results.ndjson',
+                f'{directory}/shard-1/results.ndjson',
+                f'{directory}/other.json'
+            ]
+            self.assertEqual(expected, aggregate.get_shard_artifact_files(f'{directory}\n\n{directory}/other.json\n'))
+
+    def test_main_with_shard_without_artifact_file(self: Self) -> None:
+        """A shard should fail before resolving or tagging anything when its results cannot be passed on."""
+        slack_client = MagicMock()
+
+        with self.assertRaisesRegex(ValueError, 'shard 1 of 3 needs an artifact file'):
+            self._run_main(Shard(index=1, count=3), slack_client)
+
+        self.github_util.get_pull_requests_between_refs.assert_not_called()
+        self.github_util.tag_commit.assert_not_called()
+        slack_client.send.assert_not_called()
@@ -0,0 +1,147 @@
+"""Provide tests for the backfill script."""
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from git import Repo
+from typing_extensions import Self
+
+import backfill
+from git_util.file_diff import FileDiff
+from git_util.git_util import GitUtil
+from github_util.pull_request import PullRequest
+
+
+class TestBackfill(unittest.TestCase):
+    """Provide tests for the backfill script."""
+
+    def test_backfill(self: Self) -> None:
+        """The backfill function should write the resolved changes of every commit to the output file."""
+        commit_1 = MagicMock(hexsha='env2')
+        commit_1.committed_datetime.isoformat.return_value = '2024-01-02T00:00:00+00:00'
+        commit_2 = MagicMock(hexsha='env1')
+        commit_2.committed_datetime.isoformat.return_value = '2024-01-01T00:00:00+00:00'
+
+        git_util = MagicMock()
+        git_util.get_commits.return_value = [commit_1, commit_2]
+        git_util.get_file_diffs_from_commit.side_effect = [
+            [
+                FileDiff(file_name='dev.tfvars', unified_diff=[
+                    '-test_repo_1 = "123.foo.com/test-repo-1:abc12"',
+                    '+test_repo_1 = "123.foo.com/test-repo-1:abc13"',
+                ])
+            ],
+            [
+                FileDiff(file_name='dev.tfvars', unified_diff=[
+                    '-test_repo_1 = "123.foo.com/test-repo-1:abc11"',
+                    '+test_repo_1 = "123.foo.com/test-repo-1:abc12"',
+                ])
+            ]
+        ]
+
+        github_util = MagicMock()
+        github_util.get_pull_requests_for_changes.return_value = [
+            [PullRequest(title='Pull Request 2', number=2, url='https://foo.com/2')],
+            [PullRequest(title='Pull Request 1', number=1, url='https://foo.com/1')]
+        ]
+
+        with tempfile.TemporaryDirectory() as directory:
+            output_file = Path(directory) / 'release-notes.json'
+            backfill.backfill(git_util=git_util,
+                              github_util=github_util,
+                              file_pattern='.*dev.*.tfvars',
+                              output_file=str(output_file),
+                              max_count=2)
+            results = json.loads(output_file.read_text())
+
+        git_util.get_commits.assert_called_once_with(max_count=2, since=None, until=None)
+        github_util.get_pull_requests_for_changes.assert_called_once()
+        expected = [
+            {
+                'commit': 'env2',
+                'committed_date': '2024-01-02T00:00:00+00:00',
+                'file_name': 'dev.tfvars',
+                'repository': 'test-repo-1',
+                'old_commit': 'abc12',
+                'new_commit': 'abc13',
+                'pull_requests': [{'title': 'Pull Request 2', 'number': 2, 'url': 'https://foo.com/2'}],
+                'tagged': None
+            },
+            {
+                'commit': 'env1',
+                'committed_date': '2024-01-01T00:00:00+00:00',
+                'file_name': 'dev.tfvars',
+                'repository': 'test-repo-1',
+                'old_commit': 'abc11',
+                'new_commit': 'abc12',
+                'pull_requests': [{'title': 'Pull Request 1', 'number': 1, 'url': 'https://foo.com/1'}],
+                'tagged': None
+            }
+        ]
+        self.assertEqual(expected, results)
+
+    def test_backfill_with_reference_index(self: Self) -> None:
+        """The changes of every commit should be found by comparing the indexes of consecutive commits."""
+        commit_1 = MagicMock(hexsha='env2', parents=[MagicMock(hexsha='env1')])
+        commit_1.committed_datetime.isoformat.return_value = '2024-01-02T00:00:00+00:00'
+        commit_2 = MagicMock(hexsha='env1', parents=[])
+        commit_2.committed_datetime.isoformat.return_value = '2024-01-01T00:00:00+00:00'
+
+        git_util = MagicMock()
+        git_util.get_commits.return_value = [commit_1, commit_2]
+        git_util.get_tree_entries.side_effect = lambda commit, _: [('dev.tfvars', f'blob-{commit}', False)]
+        git_util.read_blob_lines.side_effect = lambda object_hash: {
+            'blob-env1': ['test_repo_1 = "123.foo.com/test-repo-1:abc11"'],
+            'blob-env2': ['test_repo_1 = "123.foo.com/test-repo-1:abc12"']
+        }[object_hash]
+        github_util = MagicMock()
+        github_util.get_pull_requests_for_changes.return_value = [[]]
+
+        with tempfile.TemporaryDirectory() as directory:
+            output_file = Path(directory) / 'release-notes.json'
+            backfill.backfill(git_util=git_util,
+                              github_util=github_util,
+                              file_pattern='.*dev.*.tfvars',
+                              output_file=str(output_file),
+                              use_reference_index=True)
+            results = json.loads(output_file.read_text())
+
+        git_util.get_file_diffs_from_commit.assert_not_called()
+        self.assertEqual(2, git_util.get_tree_entries.call_count)
+        self.assertEqual(
+            [('env2', 'abc11', 'abc12')],
+            [(result['commit'], result['old_commit'], result['new_commit']) for result in results]
+        )
+
+    def test_backfill_with_both_modes(self: Self) -> None:
+        """The diffs and the reference index should find the same changes in the same history."""
+        identity = {
+            'GIT_AUTHOR_NAME': 'test',
+            'GIT_AUTHOR_EMAIL': 'test@example.com',
+            'GIT_COMMITTER_NAME': 'test',
+            'GIT_COMMITTER_EMAIL': 'test@example.com'
+        }
+        with tempfile.TemporaryDirectory() as directory:
+            repo = Repo.init(f'{directory}/repo')
+            for image_tag in ['abc11', 'abc12', 'abc13']:
+                Path(repo.working_dir, 'dev.tfvars').write_text(f'test_repo_1 = "123.foo.com/test-repo-1:{image_tag}"\n')
+                repo.git.add('dev.tfvars')
+                repo.git.commit('--message', f'deploy {image_tag}', env=identity)
+
+            results = {}
+            for use_reference_index in [False, True]:
+                github_util = MagicMock()
+                github_util.get_pull_requests_for_changes.side_effect = lambda changes: [[] for _ in changes]
+                output_file = Path(directory) / f'release-notes-{use_reference_index}.json'
+                backfill.backfill(git_util=GitUtil(repo),
+                                  github_util=github_util,
+                                  file_pattern='.*dev.*.tfvars',
+                                  output_file=str(output_file),
+                                  use_reference_index=use_reference_index)
+                written = json.loads(output_file.read_text())
+                results[use_reference_index] = [(result['old_commit'], result['new_commit']) for result in written]
+
+        self.assertEqual([('abc12', 'abc13'), ('abc11', 'abc12')], results[False])
+        self.assertEqual(results[False], results[True])
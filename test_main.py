@@ -1,12 +1,27 @@
 """Provide tests for example handler."""
+import tempfile
 import unittest
+from pathlib import Path
 from unittest.mock import MagicMock
 
+from requests import RequestException
 from typing_extensions import Self
 
 import main
+from diff_parser.repo_commit_change import RepoCommitChange
 from git_util.file_diff import FileDiff
+from github_util.cost_planner import ENDPOINT_COMMIT_PULLS, ENDPOINT_COMPARE, ENDPOINT_REPO, ENDPOINT_TAG_REF, \
+    ENDPOINT_WRITE_TAG_REF
+from github_util.deadline import DeadlineExceededError, RequestFailedError
+from github_util.github_util import GitHubUtil
 from github_util.pull_request import PullRequest
+from lease.lease import FileLeaseStorage, LEASE, Lease, NOTIFIED, SupersededError
+from notification_state.notification_state import NotificationState
+from notification_state.state_storage import FileStateStorage, GitNoteStateStorage
+from notifier.notifier import NotificationError
+from notifier.notifier_group import NotifierGroup
+from notifier.webhook_notifier import WebhookNotifier
+from reference_index.reference_index import ReferenceIndex
 from slack_notifier.slack_notifier import SlackNotifier
 
 
@@ -177,3 +192,388 @@ class TestMain(unittest.TestCase):
 
         self.assertFalse(slack_notifier.has_messages())
         slack_client.send.assert_not_called()
+
+    def test_main_with_artifact_writer(self: Self) -> None:
+        """Every resolved change should be written to the artifact with its tagging result."""
+        git_util = MagicMock()
+        git_util.get_file_diffs_from_last_commit.return_value = [
+            FileDiff(file_name='terraform/env/dev/dev-a.tfvars', unified_diff=[
+                '-test_repo_1 = "123.foo.com/test-repo-1:abc11"',
+                '+test_repo_1 = "123.foo.com/test-repo-1:abc12"'
+            ])
+        ]
+        pull_requests = [PullRequest(url='https://foo.com/test_repo_1', title='Pull Request 123', number=123)]
+        github_util = MagicMock()
+        github_util.get_pull_requests_between_refs.return_value = pull_requests
+        github_util.tag_commit.return_value = True
+        artifact_writer = MagicMock()
+        slack_client = MagicMock()
+        slack_client.send.return_value.status_code = 200
+
+        main.main(git_util=git_util,
+                  slack_notifier=SlackNotifier('', slack_client),
+                  github_util=github_util,
+                  environment_name='Dev',
+                  file_pattern='.*dev.*.tfvars',
+                  tag_name='test-tag',
+                  artifact_writer=artifact_writer)
+
+        artifact_writer.write_change.assert_called_once_with(
+            RepoCommitChange(repository='test-repo-1', old_commit='abc11', new_commit='abc12'),
+            pull_requests,
+            True,
+            file_name='terraform/env/dev/dev-a.tfvars'
+        )
+
+    def test_main_with_deadline_exceeded(self: Self) -> None:
+        """Repositories not resolved before the deadline should link to the comparison and still be tagged."""
+        git_util = MagicMock()
+        git_util.get_file_diffs_from_last_commit.return_value = [
+            FileDiff(file_name='terraform/env/dev/dev-a.tfvars', unified_diff=[
+                '-test_repo_1 = "123.foo.com/test-repo-1:abc11"',
+                '+test_repo_1 = "123.foo.com/test-repo-1:abc12"',
+                '-test_repo_2 = "123.foo.com/test-repo-2:abc21"',
+                '+test_repo_2 = "123.foo.com/test-repo-2:abc22"'
+            ])
+        ]
+        github_util = MagicMock()
+        github_util.get_pull_requests_between_refs.side_effect = [
+            [PullRequest(url='https://foo.com/test_repo_1', title='Pull Request 123', number=123)],
+            DeadlineExceededError()
+        ]
+        github_util.get_compare_url.return_value = 'https://github.com/org/test-repo-2/compare/abc21...abc22'
+        slack_client = MagicMock()
+        slack_client.send.return_value.status_code = 200
+
+        main.main(git_util=git_util,
+                  slack_notifier=SlackNotifier('', slack_client),
+                  github_util=github_util,
+                  environment_name='Dev',
+                  file_pattern='.*dev.*.tfvars',
+                  tag_name='test-tag')
+
+        github_util.get_compare_url.assert_called_once_with('test-repo-2', 'abc21', 'abc22')
+        self.assertEqual(
+            [
+                'The Dev environment has been updated',
+                'test-repo-1\n \t • *<https://foo.com/test_repo_1|Pull Request 123>* #123',
+                'test-repo-2\n \t • *<https://github.com/org/test-repo-2/compare/abc21...abc22|Compare changes>*',
+                '_1 repository could not be resolved in time and link to the comparison instead_'
+            ],
+            [block['text']['text'] for block in slack_client.send.call_args.kwargs['blocks']]
+        )
+        self.assertEqual(2, github_util.tag_commit.call_count)
+
+    def test_main_with_request_timeout(self: Self) -> None:
+        """Repositories whose requests timed out should link to the comparison and be counted in the note."""
+        git_util = MagicMock()
+        git_util.get_file_diffs_from_last_commit.return_value = [
+            FileDiff(file_name='terraform/env/dev/dev-a.tfvars', unified_diff=[
+                '+test_repo_1 = "123.foo.com/test-repo-1:abc12"',
+                '+test_repo_2 = "123.foo.com/test-repo-2:abc22"'
+            ])
+        ]
+        github_util = MagicMock()
+        github_util.get_pull_requests_between_refs.side_effect = [
+            RequestFailedError('read timed out'),
+            DeadlineExceededError()
+        ]
+        github_util.get_compare_url.side_effect = lambda repo, base, head: f'https://github.com/org/{repo}/compare'
+        slack_client = MagicMock()
+        slack_client.send.return_value.status_code = 200
+
+        main.main(git_util=git_util,
+                  slack_notifier=SlackNotifier('', slack_client),
+                  github_util=github_util,
+                  environment_name='Dev',
+                  file_pattern='.*dev.*.tfvars',
+                  tag_name='')
+
+        self.assertEqual(
+            [
+                'The Dev environment has been updated',
+                'test-repo-1\n \t • *<https://github.com/org/test-repo-1/compare|Compare changes>*',
+                'test-repo-2\n \t • *<https://github.com/org/test-repo-2/compare|Compare changes>*',
+                '_2 repositories could not be resolved in time and link to the comparison instead_'
+            ],
+            [block['text']['text'] for block in slack_client.send.call_args.kwargs['blocks']]
+        )
+
+    def test_main_with_shared_pull_requests(self: Self) -> None:
+        """Pull requests shared by several repositories should be listed once in a grouped block."""
+        git_util = MagicMock()
+        git_util.get_file_diffs_from_last_commit.return_value = [
+            FileDiff(file_name='terraform/env/dev/dev-a.tfvars', unified_diff=[
+                f'+{repo} = "123.foo.com/{repo}:abc12"' for repo in ('service-1', 'service-2', 'service-3')
+            ])
+        ]
+        shared = PullRequest(url='https://foo.com/base-image/45', title='Bump base image', number=45)
+        github_util = MagicMock()
+        github_util.get_pull_requests_between_refs.side_effect = [
+            [shared],
+            [shared],
+            [shared, PullRequest(url='https://foo.com/service-3/7', title='Fix service', number=7)]
+        ]
+        slack_client = MagicMock()
+        slack_client.send.return_value.status_code = 200
+
+        main.main(git_util=git_util,
+                  slack_notifier=SlackNotifier('', slack_client),
+                  github_util=github_util,
+                  environment_name='Dev',
+                  file_pattern='.*dev.*.tfvars',
+                  tag_name='')
+
+        self.assertEqual(
+            [
+                'The Dev environment has been updated',
+                '3 repositories\n \t • *<https://foo.com/base-image/45|Bump base image>* #45\nservice-1, service-2, service-3',
+                'service-3\n \t • *<https://foo.com/service-3/7|Fix service>* #7'
+            ],
+            [block['text']['text'] for block in slack_client.send.call_args.kwargs['blocks']]
+        )
+
+    def test_main_with_notification_state(self: Self) -> None:
+        """A re-run should not repeat any lookup, notification or tag done by a previous run."""
+        git_util = MagicMock()
+        git_util.get_file_diffs_from_last_commit.side_effect = lambda _: [
+            FileDiff(file_name='terraform/env/dev/dev-a.tfvars', unified_diff=[
+                '-test_repo_1 = "123.foo.com/test-repo-1:abc11"',
+                '+test_repo_1 = "123.foo.com/test-repo-1:abc12"'
+            ])
+        ]
+        github_util = MagicMock()
+        github_util.get_pull_requests_between_refs.return_value = [
+            PullRequest(url='https://foo.com/test_repo_1', title='Pull Request 123', number=123)
+        ]
+        github_util.tag_commit.return_value = True
+        slack_client = MagicMock()
+        slack_client.send.return_value.status_code = 200
+
+        with tempfile.TemporaryDirectory() as directory:
+            storage = FileStateStorage(str(Path(directory) / 'state.json'))
+            for _ in range(2):
+                main.main(git_util=git_util,
+                          slack_notifier=SlackNotifier('', slack_client),
+                          github_util=github_util,
+                          environment_name='Dev',
+                          file_pattern='.*dev.*.tfvars',
+                          tag_name='test-tag',
+                          notification_state=NotificationState(storage, 'Dev'))
+
+        github_util.get_pull_requests_between_refs.assert_called_once()
+        github_util.tag_commit.assert_called_once()
+        slack_client.send.assert_called_once()
+
+    def test_main_with_notification_state_after_partial_delivery(self: Self) -> None:
+        """A re-run after the message reached only some sinks should not send it again, and the run should fail."""
+        git_util = MagicMock()
+        git_util.get_file_diffs_from_last_commit.side_effect = lambda _: [
+            FileDiff(file_name='terraform/env/dev/dev-a.tfvars', unified_diff=[
+                '-test_repo_1 = "123.foo.com/test-repo-1:abc11"',
+                '+test_repo_1 = "123.foo.com/test-repo-1:abc12"'
+            ])
+        ]
+        github_util = MagicMock()
+        github_util.get_pull_requests_between_refs.return_value = []
+        github_util.tag_commit.return_value = True
+        slack_client = MagicMock()
+        slack_client.send.return_value.status_code = 200
+        session = MagicMock()
+        session.post.side_effect = RequestException('connection reset')
+
+        def create_group() -> NotifierGroup:
+            webhook_notifier = WebhookNotifier('https://example.com/hook', name='webhook-1', session=session)
+            return NotifierGroup([SlackNotifier('', slack_client, name='slack-1'), webhook_notifier], retries=0)
+
+        with tempfile.TemporaryDirectory() as directory:
+            storage = FileStateStorage(str(Path(directory) / 'state.json'))
+            arguments = {
+                'git_util': git_util,
+                'github_util': github_util,
+                'environment_name': 'Dev',
+                'file_pattern': '.*dev.*.tfvars',
+                'tag_name': 'test-tag'
+            }
+            with self.assertLogs('main', level='ERROR'), self.assertRaisesRegex(NotificationError, 'webhook-1'):
+                main.main(**arguments, slack_notifier=create_group(),
+                          notification_state=NotificationState(storage, 'Dev'))
+            main.main(**arguments, slack_notifier=create_group(),
+                      notification_state=NotificationState(storage, 'Dev'))
+
+        slack_client.send.assert_called_once()
+        session.post.assert_called_once()
+        github_util.tag_commit.assert_called_once()
+
+    def test_main_with_notification_state_after_failed_tagging(self: Self) -> None:
+        """A re-run after tagging failed should only retry the tagging."""
+        git_util = MagicMock()
+        git_util.get_file_diffs_from_last_commit.side_effect = lambda _: [
+            FileDiff(file_name='terraform/env/dev/dev-a.tfvars', unified_diff=[
+                '-test_repo_1 = "123.foo.com/test-repo-1:abc11"',
+                '+test_repo_1 = "123.foo.com/test-repo-1:abc12"'
+            ])
+        ]
+        github_util = MagicMock()
+        github_util.get_pull_requests_between_refs.return_value = []
+        github_util.tag_commit.side_effect = [RuntimeError('tagging failed'), True]
+        slack_client = MagicMock()
+        slack_client.send.return_value.status_code = 200
+
+        with tempfile.TemporaryDirectory() as directory:
+            storage = FileStateStorage(str(Path(directory) / 'state.json'))
+            arguments = {
+                'git_util': git_util,
+                'github_util': github_util,
+                'environment_name': 'Dev',
+                'file_pattern': '.*dev.*.tfvars',
+                'tag_name': 'test-tag'
+            }
+            with self.assertRaises(RuntimeError):
+                main.main(**arguments, slack_notifier=SlackNotifier('', slack_client),
+                          notification_state=NotificationState(storage, 'Dev'))
+            main.main(**arguments, slack_notifier=SlackNotifier('', slack_client),
+                      notification_state=NotificationState(storage, 'Dev'))
+
+        github_util.get_pull_requests_between_refs.assert_called_once()
+        self.assertEqual(2, github_util.tag_commit.call_count)
+        slack_client.send.assert_called_once()
+
+    def test_main_with_reference_index(self: Self) -> None:
+        """The changes should be found from the stored index of the parent commit, reading only changed files."""
+        git_util = MagicMock()
+        git_util.get_last_commit_hashes.return_value = ('env2', 'env1')
+        git_util.get_tree_entries.return_value = [('dev.tfvars', 'blob2', False), ('prod.tfvars', 'blob3', False)]
+        git_util.read_blob_lines.return_value = ['test_repo_1 = "123.foo.com/test-repo-1:abc12"']
+        parent_index = ReferenceIndex(commit='env1', file_pattern='.*tfvars')
+        parent_index.set_file('dev.tfvars', 'blob1', {'test-repo-1': 'abc11'})
+        parent_index.set_file('prod.tfvars', 'blob3', {'test-repo-1': 'abc10'})
+        github_util = MagicMock()
+        github_util.get_pull_requests_between_refs.return_value = []
+        slack_client = MagicMock()
+        slack_client.send.return_value.status_code = 200
+
+        with tempfile.TemporaryDirectory() as directory:
+            storage = FileStateStorage(str(Path(directory) / 'index.json'))
+            storage.write(parent_index.dumps())
+            main.main(git_util=git_util,
+                      slack_notifier=SlackNotifier('', slack_client),
+                      github_util=github_util,
+                      environment_name='Dev',
+                      file_pattern='.*tfvars',
+                      tag_name='',
+                      index_storage=storage)
+            index = ReferenceIndex.loads(storage.read())
+
+        git_util.get_file_diffs_from_last_commit.assert_not_called()
+        git_util.get_tree_entries.assert_called_once_with('env2', '.*tfvars')
+        git_util.read_blob_lines.assert_called_once_with('blob2')
+        github_util.get_pull_requests_between_refs.assert_called_once_with('test-repo-1', 'abc11', 'abc12')
+        self.assertEqual('env2', index.commit)
+        self.assertEqual({'dev.tfvars': 'abc12', 'prod.tfvars': 'abc10'}, index.get_deployments('test-repo-1'))
+
+    def test_get_changes_with_reference_index_note_since_base(self: Self) -> None:
+        """The index noted on the base commit should be used when the changes are found since an earlier commit."""
+        git_util = MagicMock()
+        git_util.get_last_commit_hashes.return_value = ('env3', 'env2')
+        git_util.get_tree_entries.return_value = [('dev.tfvars', 'blob2', False)]
+        git_util.read_blob_lines.return_value = ['test_repo_1 = "123.foo.com/test-repo-1:abc12"']
+        base_index = ReferenceIndex(commit='env1', file_pattern='.*tfvars')
+        base_index.set_file('dev.tfvars', 'blob1', {'test-repo-1': 'abc11'})
+        git_util.read_note.side_effect = lambda _, commit: base_index.dumps() if commit == 'env1' else None
+        storage = GitNoteStateStorage(git_util, notes_ref='release-notes-index', read_commit='HEAD~1')
+
+        changes = list(main._get_changes(git_util, '.*tfvars', storage, base='env1'))
+
+        change = RepoCommitChange(repository='test-repo-1', old_commit='abc11', new_commit='abc12')
+        self.assertEqual([('dev.tfvars', change)], changes)
+        git_util.read_note.assert_called_once_with('release-notes-index', 'env1')
+        git_util.get_tree_entries.assert_called_once_with('env3', '.*tfvars')
+        self.assertEqual('env3', ReferenceIndex.loads(git_util.write_note.call_args.args[1]).commit)
+
+    def test_main_with_lease(self: Self) -> None:
+        """A run should cover the changes since the last completed run, and a superseded run should not notify or tag."""
+        git_util = MagicMock()
+        git_util.is_ancestor.side_effect = lambda ancestor, descendant: ancestor <= descendant
+        git_util.get_file_diffs_since.return_value = [
+            FileDiff(file_name='terraform/env/dev/dev-a.tfvars', unified_diff=[
+                '-test_repo_1 = "123.foo.com/test-repo-1:abc11"',
+                '+test_repo_1 = "123.foo.com/test-repo-1:abc13"'
+            ])
+        ]
+        github_util = MagicMock()
+        github_util.get_pull_requests_between_refs.return_value = []
+        slack_client = MagicMock()
+        slack_client.send.return_value.status_code = 200
+        arguments = {
+            'git_util': git_util,
+            'slack_notifier': SlackNotifier('', slack_client),
+            'github_util': github_util,
+            'environment_name': 'Dev',
+            'file_pattern': '.*dev.*.tfvars',
+            'tag_name': 'test-tag'
+        }
+
+        with tempfile.TemporaryDirectory() as directory:
+            storage = FileLeaseStorage(str(Path(directory) / 'lease.json'))
+            Lease(storage, git_util, 'env1').set_notified()
+            superseded = Lease(storage, git_util, 'env2')
+            github_util.get_pull_requests_between_refs.side_effect = lambda *_: \
+                storage.compare_and_set(LEASE, 'env2', 'env3') and []
+            with self.assertRaises(SupersededError):
+                main.main(**arguments, lease=superseded)
+
+            slack_client.send.assert_not_called()
+            github_util.tag_commit.assert_not_called()
+
+            github_util.get_pull_requests_between_refs.side_effect = None
+            main.main(**arguments, lease=Lease(storage, git_util, 'env3'))
+            self.assertEqual('env3', storage.get(NOTIFIED))
+            self.assertFalse(storage.get(LEASE))
+
+        git_util.get_file_diffs_since.assert_called_with('env1', '.*dev.*.tfvars')
+        github_util.get_pull_requests_between_refs.assert_called_with('test-repo-1', 'abc11', 'abc13')
+        slack_client.send.assert_called_once()
+        github_util.tag_commit.assert_called_once_with('test-repo-1', 'abc13', 'test-tag')
+
+    def test_plan(self: Self) -> None:
+        """The plan should estimate the API calls of each endpoint without tagging or looking up pull requests."""
+        git_util = MagicMock()
+        git_util.get_file_diffs_from_last_commit.return_value = [
+            FileDiff(file_name='terraform/env/dev/dev-a.tfvars', unified_diff=[
+                '-test_repo_1 = "123.foo.com/test-repo-1:abc11"',
+                '+test_repo_1 = "123.foo.com/test-repo-1:abc12"',
+                '-test_repo_2 = "123.foo.com/test-repo-2:abc21"',
+                '+test_repo_2 = "123.foo.com/test-repo-2:abc22"'
+            ]),
+            FileDiff(file_name='terraform/env/dev/dev-b.tfvars', unified_diff=[
+                '-test_repo_1 = "123.foo.com/test-repo-1:abc11"',
+                '+test_repo_1 = "123.foo.com/test-repo-1:abc12"'
+            ])
+        ]
+        github_session = MagicMock()
+        github_session.get_rate_limit.return_value.core.remaining = 4
+        rest_client = MagicMock(request_count=0, rate_limit_remaining=None)
+
+        def compare(*_: str) -> tuple[str, list[str]]:
+            rest_client.request_count += 1
+            return 'ahead', ['m1', 'm2']
+
+        rest_client.compare.side_effect = compare
+        github_util = GitHubUtil(access_token='', organization_name='test-org', github_session=github_session,
+                                 rest_client=rest_client)
+
+        with self.assertLogs('main', level='WARNING'):
+            totals = main.plan(git_util=git_util, github_util=github_util, file_pattern='.*dev.*.tfvars',
+                               tag_name='test-tag')
+
+        expected = {
+            ENDPOINT_COMPARE: 2,
+            ENDPOINT_COMMIT_PULLS: 4,
+            ENDPOINT_REPO: 2,
+            ENDPOINT_TAG_REF: 2,
+            ENDPOINT_WRITE_TAG_REF: 2
+        }
+        self.assertEqual(expected, totals)
+        rest_client.get_commit_pull_requests.assert_not_called()
+        github_session.get_organization.return_value.get_repo.assert_not_called()